@@ -1,29 +1,86 @@
-import boto3
-import os
-from typing import Optional
+from typing import Optional, Dict, Iterable, List, Tuple
+from aws_utils.cache import TTLCache
+from aws_utils.clients import SharedClient
+
+DEFAULT_LOOKUP_TTL_SECONDS = 300
+GET_REST_APIS_PAGE_SIZE = 500
 
 
 class APIGatewayHandler:
-    def __init__(self) -> None:
+    api_gateway_client = SharedClient("apigateway")
+
+    def __init__(self, ttl_seconds: float = DEFAULT_LOOKUP_TTL_SECONDS) -> None:
+        """
+        Initializes the APIGatewayHandler with a cache of REST API names.
+
+        Args:
+            ttl_seconds (float): How long the index of REST APIs is cached.
         """
-        Initializes the APIGatewayHandler by creating an APIGateway client using AWS credentials
-        from environment variables.
+        self._index = TTLCache(ttl_seconds=ttl_seconds, max_entries=1)
+
+    def get_rest_api_index(
+        self, refresh: bool = False
+    ) -> Tuple[Dict[str, str], List[Tuple[str, str]]]:
         """
-        self.api_gateway_client = boto3.client(
-            "apigateway", region_name=os.environ["AWS_REGION"]
-        )
+        Returns an index of every REST API, built from one paginated sweep and cached.
+
+        Args:
+            refresh (bool): Whether to rebuild the index.
+
+        Returns:
+            Tuple[Dict[str, str], List[Tuple[str, str]]]: A mapping from lowercase
+            API name to API ID, keeping the first API of each name, and every
+            ``(lowercase name, ID)`` pair in the order API Gateway lists them.
+        """
+        index = None if refresh else self._index.get("rest_apis")
+        if index is None:
+            apis: List[Tuple[str, str]] = []
+            paginator = self.api_gateway_client.get_paginator("get_rest_apis")
+            for page in paginator.paginate(
+                PaginationConfig={"PageSize": GET_REST_APIS_PAGE_SIZE}
+            ):
+                apis.extend((api["name"].lower(), api["id"]) for api in page["items"])
+            by_name: Dict[str, str] = {}
+            for name, api_id in apis:
+                by_name.setdefault(name, api_id)
+            index = (by_name, apis)
+            self._index.set("rest_apis", index)
+        return index
 
     def search_api_by_name(self, api_name: str) -> Optional[str]:
         """
         Searches for an API by its name and returns its ID.
 
+        An API whose name matches exactly, ignoring case, is preferred. Otherwise
+        the first API whose name contains ``api_name`` is returned.
+
         Args:
             api_name (str): The name of the API to search for.
 
         Returns:
             Optional[str]: The ID of the matching API if found, otherwise None.
         """
-        response = self.api_gateway_client.get_rest_apis()
-        apis = response.get("items", [])
-        matching_apis = [api for api in apis if api_name.lower() in api["name"].lower()]
-        return matching_apis[0]["id"] if matching_apis else None
+        return self.search_apis_by_names([api_name])[api_name]
+
+    def search_apis_by_names(
+        self, api_names: Iterable[str]
+    ) -> Dict[str, Optional[str]]:
+        """
+        Searches for many APIs by name using one cached index of every REST API.
+
+        Args:
+            api_names (Iterable[str]): The names of the APIs to search for.
+
+        Returns:
+            Dict[str, Optional[str]]: The ID of the matching API for each name, or
+            None if no API matches.
+        """
+        by_name, apis = self.get_rest_api_index()
+        results: Dict[str, Optional[str]] = {}
+        for api_name in api_names:
+            search = api_name.lower()
+            api_id = by_name.get(search)
+            if api_id is None:
+                api_id = next((id_ for name, id_ in apis if search in name), None)
+            results[api_name] = api_id
+        return results
@@ -1,11 +1,58 @@
-import boto3
-import os
+import itertools
+import threading
 import time
-from typing import Dict
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+from aws_utils.athena_cache import AthenaResultCache
+from aws_utils.clients import SharedClient
+from aws_utils.retry import backoff_delays
+from aws_utils.s3 import S3Handler
+
+TERMINAL_STATES = ("SUCCEEDED", "FAILED", "CANCELLED")
+BATCH_GET_QUERY_EXECUTION_LIMIT = 50
+DEFAULT_MAX_CONCURRENT_QUERIES = 5
+MIN_POLL_INTERVAL = 0.1
+MAX_POLL_INTERVAL = 5.0
+GET_QUERY_RESULTS_PAGE_SIZE = 1000
+MAX_POLL_ATTEMPTS = 5
+TRANSIENT_ERROR_CODES = (
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "InternalServerException",
+    "ServiceUnavailableException",
+)
+
+ATHENA_TYPE_CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "boolean": lambda value: value == "true",
+    "tinyint": int,
+    "smallint": int,
+    "integer": int,
+    "int": int,
+    "bigint": int,
+    "float": float,
+    "real": float,
+    "double": float,
+    "decimal": Decimal,
+    "date": date.fromisoformat,
+    "timestamp": datetime.fromisoformat,
+}
 
 
 class AthenaHandler:
-    def __init__(self, database: str, workgroup: str, output_bucket: str):
+    athena_client = SharedClient("athena")
+
+    def __init__(
+        self,
+        database: str,
+        workgroup: str,
+        output_bucket: str,
+        max_concurrent_queries: int = DEFAULT_MAX_CONCURRENT_QUERIES,
+        cache: Optional[AthenaResultCache] = None,
+        result_reuse_max_age_minutes: Optional[int] = None,
+    ):
         """
         Initializes the AthenaHandler with the specified database, workgroup, and output bucket.
 
@@ -13,55 +60,539 @@ class AthenaHandler:
             database (str): The name of the Athena database to run queries against.
             workgroup (str): The name of the Athena workgroup to use for query execution.
             output_bucket (str): The S3 bucket where query results will be stored.
+            max_concurrent_queries (int): The maximum number of queries submitted with
+                ``submit_query`` that run at the same time. Keep this within the
+                workgroup's concurrency quota.
+            cache (Optional[AthenaResultCache]): A cache consulted by
+                ``run_query_and_get_results`` and ``submit_query`` before running a query.
+            result_reuse_max_age_minutes (Optional[int]): If set, Athena reuses the
+                results of an identical query run within this many minutes instead of
+                scanning the data again.
         """
         self.database = database
         self.workgroup = workgroup
         self.output_bucket = output_bucket
-        self.athena_client = boto3.client(
-            "athena", region_name=os.environ["AWS_REGION"]
-        )
+        self.max_concurrent_queries = max_concurrent_queries
+        self.cache = cache
+        self.result_reuse_max_age_minutes = result_reuse_max_age_minutes
+        self._executor: Optional[AthenaQueryExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._s3_handler: Optional[S3Handler] = None
 
-    def run_query_and_get_results(self, query: str) -> list[Dict[str, str]]:
+    @property
+    def s3_handler(self) -> S3Handler:
         """
-        Runs a query against the specified Athena database and retrieves the results.
+        The S3Handler used to stream results from the output location, created on
+        first use.
+        """
+        if self._s3_handler is None:
+            self._s3_handler = S3Handler()
+        return self._s3_handler
+
+    def start_query(self, query: str) -> str:
+        """
+        Starts a query without waiting for it to finish.
 
         Args:
             query (str): The SQL query to be executed.
 
         Returns:
-            list[Dict[str, str]]: A list of dictionaries representing the query results,
-            where each dictionary corresponds to a row and the keys are column names.
-
-        Raises:
-            Exception: If the query execution fails or is cancelled.
+            str: The query execution ID.
         """
-        query_id = self.athena_client.start_query_execution(
+        kwargs: Dict[str, Any] = {}
+        if self.result_reuse_max_age_minutes:
+            kwargs["ResultReuseConfiguration"] = {
+                "ResultReuseByAgeConfiguration": {
+                    "Enabled": True,
+                    "MaxAgeInMinutes": self.result_reuse_max_age_minutes,
+                }
+            }
+        return self.athena_client.start_query_execution(
             QueryString=query,
             QueryExecutionContext={"Database": self.database},
             ResultConfiguration={"OutputLocation": f"s3://{self.output_bucket}/"},
             WorkGroup=self.workgroup,
+            **kwargs,
         )["QueryExecutionId"]
 
-        while True:
+    def wait_for_query(self, query_id: str) -> str:
+        """
+        Waits for a query to finish, polling with exponential backoff and jitter.
+
+        Args:
+            query_id (str): The query execution ID.
+
+        Returns:
+            str: The final state of the query: SUCCEEDED, FAILED or CANCELLED.
+        """
+        for delay in backoff_delays(MIN_POLL_INTERVAL, MAX_POLL_INTERVAL):
             response = self.athena_client.get_query_execution(QueryExecutionId=query_id)
             status = response["QueryExecution"]["Status"]["State"]
-            if status in ["SUCCEEDED", "FAILED", "CANCELLED"]:
-                break
-            time.sleep(1)
+            if status in TERMINAL_STATES:
+                return status
+            time.sleep(delay)
 
-        if status == "SUCCEEDED":
-            results = self.athena_client.get_query_results(QueryExecutionId=query_id)
-            columns = [
-                col["Name"]
-                for col in results["ResultSet"]["ResultSetMetadata"]["ColumnInfo"]
-            ]
-            rows = results["ResultSet"]["Rows"][1:]
-            return [
-                {
+    def get_query_results(self, query_id: str) -> list[Dict[str, str]]:
+        """
+        Retrieves all the results of a finished query.
+
+        Args:
+            query_id (str): The query execution ID.
+
+        Returns:
+            list[Dict[str, str]]: A list of dictionaries representing the query results,
+            where each dictionary corresponds to a row and the keys are column names.
+        """
+        return list(self.iter_query_results(query_id))
+
+    def iter_query_results(
+        self, query_id: str, stream_large_results_from_s3: bool = True
+    ) -> Iterator[Dict[str, str]]:
+        """
+        Streams the results of a finished query, following ``NextToken`` so results
+        are never truncated.
+
+        Results that fit in a single page come from ``get_query_results``. Larger
+        results are streamed from the CSV file Athena wrote to the output location
+        instead of being paged through the API.
+
+        Args:
+            query_id (str): The query execution ID.
+            stream_large_results_from_s3 (bool): Whether to read results of more than
+                one page from the output location in S3.
+
+        Yields:
+            Dict[str, str]: Each row, keyed by column name.
+        """
+        pages = self._iter_result_pages(query_id)
+        column_info, rows, next_token = next(pages)
+        if next_token and stream_large_results_from_s3:
+            pages.close()
+            yield from self.iter_query_results_from_s3(query_id)
+            return
+
+        columns = [col["Name"] for col in column_info]
+        for _, rows, _ in itertools.chain([(column_info, rows, next_token)], pages):
+            for row in rows:
+                yield {
                     columns[i]: row["Data"][i].get("VarCharValue", "")
                     for i in range(len(columns))
                 }
-                for row in rows
-            ]
+
+    def iter_query_results_from_s3(self, query_id: str) -> Iterator[Dict[str, str]]:
+        """
+        Streams the results of a finished query from the CSV file Athena wrote to
+        the output location, without using the paginated results API.
+
+        Args:
+            query_id (str): The query execution ID.
+
+        Yields:
+            Dict[str, str]: Each row, keyed by column name.
+        """
+        rows = self._iter_csv_result_rows(query_id)
+        columns = next(rows, [])
+        for row in rows:
+            yield dict(zip(columns, row))
+
+    def get_query_results_columnar(self, query_id: str) -> Dict[str, list]:
+        """
+        Retrieves the results of a finished query as typed columns.
+
+        Values are converted according to the column types reported in ``ColumnInfo``
+        (eg. ``bigint`` to ``int``, ``double`` to ``float``, ``decimal`` to
+        ``Decimal``) and nulls become None. Large results are streamed from the
+        output location in S3.
+
+        Args:
+            query_id (str): The query execution ID.
+
+        Returns:
+            Dict[str, list]: A list of values per column, keyed by column name.
+        """
+        pages = self._iter_result_pages(query_id)
+        column_info, rows, next_token = next(pages)
+        names = [col["Name"] for col in column_info]
+        converters = [
+            ATHENA_TYPE_CONVERTERS.get(col["Type"].lower(), str) for col in column_info
+        ]
+        columns: Dict[str, list] = {name: [] for name in names}
+        column_lists = [columns[name] for name in names]
+
+        if next_token:
+            pages.close()
+            csv_rows = self._iter_csv_result_rows(query_id)
+            next(csv_rows, None)
+            for row in csv_rows:
+                for values, convert, value in zip(column_lists, converters, row):
+                    if value == "" and convert is not str:
+                        values.append(None)
+                    else:
+                        values.append(convert(value))
+            return columns
+
+        for _, rows, _ in itertools.chain([(column_info, rows, next_token)], pages):
+            for row in rows:
+                for values, convert, datum in zip(
+                    column_lists, converters, row["Data"]
+                ):
+                    value = datum.get("VarCharValue")
+                    values.append(None if value is None else convert(value))
+        return columns
+
+    def _cache_key(self, query: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.make_key(query, self.database, self.workgroup)
+
+    def _iter_result_pages(
+        self, query_id: str
+    ) -> Iterator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[str]]]:
+        kwargs: Dict[str, Any] = {
+            "QueryExecutionId": query_id,
+            "MaxResults": GET_QUERY_RESULTS_PAGE_SIZE,
+        }
+        first_page = True
+        while True:
+            results = self.athena_client.get_query_results(**kwargs)
+            rows = results["ResultSet"]["Rows"]
+            if first_page:
+                rows = rows[1:]
+                first_page = False
+            next_token = results.get("NextToken")
+            yield results["ResultSet"]["ResultSetMetadata"][
+                "ColumnInfo"
+            ], rows, next_token
+            if not next_token:
+                return
+            kwargs["NextToken"] = next_token
+
+    def _iter_csv_result_rows(self, query_id: str) -> Iterator[List[str]]:
+        response = self.athena_client.get_query_execution(QueryExecutionId=query_id)
+        location = response["QueryExecution"]["ResultConfiguration"]["OutputLocation"]
+        bucket_name, result_key = location.removeprefix("s3://").split("/", 1)
+        return self.s3_handler.iter_csv_rows(bucket_name, result_key, has_header=False)
+
+    def run_query_and_get_results(self, query: str) -> list[Dict[str, str]]:
+        """
+        Runs a query against the specified Athena database and retrieves the results.
+
+        Args:
+            query (str): The SQL query to be executed.
+
+        Returns:
+            list[Dict[str, str]]: A list of dictionaries representing the query results,
+            where each dictionary corresponds to a row and the keys are column names.
+
+        Raises:
+            Exception: If the query execution fails or is cancelled.
+        """
+        cache_key = self._cache_key(query)
+        if cache_key is not None:
+            rows = self.cache.get(cache_key)
+            if rows is not None:
+                return rows
+
+        query_id = self.start_query(query)
+        status = self.wait_for_query(query_id)
+
+        if status == "SUCCEEDED":
+            rows = self.get_query_results(query_id)
+            if cache_key is not None:
+                self.cache.set(cache_key, rows)
+            return rows
         else:
             raise Exception(f"Query failed with status: {status}")
+
+    def submit_query(self, query: str) -> Future:
+        """
+        Submits a query to run in the background.
+
+        Up to ``max_concurrent_queries`` queries run at once; further queries wait
+        until a slot frees up.
+
+        Args:
+            query (str): The SQL query to be executed.
+
+        Returns:
+            Future: A future resolving to the query results, in the format returned
+            by ``run_query_and_get_results``. Its ``query_id`` attribute is set once
+            the query has started.
+        """
+        cache_key = self._cache_key(query)
+        if cache_key is not None:
+            rows = self.cache.get(cache_key)
+            if rows is not None:
+                future: Future = Future()
+                future.query_id = None
+                future.set_result(rows)
+                return future
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = AthenaQueryExecutor(self, self.max_concurrent_queries)
+        future = self._executor.submit(query)
+        if cache_key is not None:
+
+            def cache_results(done: Future) -> None:
+                if not done.cancelled() and done.exception() is None:
+                    self.cache.set(cache_key, done.result())
+
+            future.add_done_callback(cache_results)
+        return future
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Shuts down the background executor used by ``submit_query``, if any.
+
+        A later ``submit_query`` starts a new executor.
+
+        Args:
+            wait (bool): Whether to wait for submitted queries to finish.
+        """
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "AthenaHandler":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def run_queries(self, queries: List[str]) -> List[list[Dict[str, str]]]:
+        """
+        Runs many queries concurrently and waits for all of them.
+
+        Args:
+            queries (List[str]): The SQL queries to be executed.
+
+        Returns:
+            List[list[Dict[str, str]]]: The results of each query, in the same order.
+
+        Raises:
+            Exception: If any query fails or is cancelled.
+        """
+        futures = [self.submit_query(query) for query in queries]
+        return [future.result() for future in futures]
+
+
+class AthenaQueryExecutor:
+    """
+    Runs Athena queries concurrently, tracking them all from one polling thread.
+
+    The status of every running query is checked with ``batch_get_query_execution``,
+    50 queries per call, and the polling interval backs off exponentially with
+    jitter while no query changes state. Throttling and other transient errors of a
+    status check are retried by later polls, up to ``MAX_POLL_ATTEMPTS`` times in a
+    row; other errors fail the queries of that call.
+    """
+
+    def __init__(
+        self,
+        handler: AthenaHandler,
+        max_concurrent_queries: int = DEFAULT_MAX_CONCURRENT_QUERIES,
+    ) -> None:
+        """
+        Args:
+            handler (AthenaHandler): The handler used to start queries and fetch results.
+            max_concurrent_queries (int): The maximum number of queries running at once.
+        """
+        self.handler = handler
+        self.max_concurrent_queries = max_concurrent_queries
+        self._pending: Deque[Tuple[str, Future]] = deque()
+        self._running: Dict[str, Future] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._poll_errors: Dict[str, int] = {}
+        self._results_executor = ThreadPoolExecutor(max_workers=max_concurrent_queries)
+
+    def __enter__(self) -> "AthenaQueryExecutor":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.shutdown()
+
+    def submit(self, query: str) -> Future:
+        """
+        Queues a query for execution.
+
+        Args:
+            query (str): The SQL query to be executed.
+
+        Returns:
+            Future: A future resolving to the query results.
+
+        Raises:
+            Exception: If the executor has been shut down.
+        """
+        future: Future = Future()
+        future.query_id = None
+        with self._condition:
+            if self._closed:
+                raise Exception("Cannot submit a query after shutdown")
+            self._pending.append((query, future))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        """
+        Stops accepting queries and releases the polling and result threads.
+
+        Without waiting, the result threads are released by the polling thread once
+        every submitted query has finished.
+
+        Args:
+            wait (bool): Whether to wait until every submitted query has finished
+                and its results have been fetched.
+            cancel_pending (bool): Whether to cancel the queries that have not
+                started yet. Queries already running in Athena are not cancelled.
+        """
+        with self._condition:
+            self._closed = True
+            if cancel_pending:
+                cancelled = [future for _, future in self._pending]
+                self._pending.clear()
+            else:
+                cancelled = []
+            thread = self._thread
+            self._condition.notify()
+        for future in cancelled:
+            future.cancel()
+        if thread is None:
+            self._results_executor.shutdown(wait=wait)
+        elif wait:
+            thread.join()
+            self._results_executor.shutdown()
+
+    def _run(self) -> None:
+        delays = backoff_delays(MIN_POLL_INTERVAL, MAX_POLL_INTERVAL)
+        while True:
+            with self._condition:
+                if not self._pending and not self._running:
+                    self._thread = None
+                    if self._closed:
+                        self._results_executor.shutdown(wait=False)
+                    return
+            try:
+                changed = self._start_pending()
+                changed = self._poll_running() or changed
+            except Exception as e:
+                self._fail_all(e)
+                continue
+            if changed:
+                delays = backoff_delays(MIN_POLL_INTERVAL, MAX_POLL_INTERVAL)
+            with self._condition:
+                self._condition.wait(timeout=next(delays))
+
+    def _start_pending(self) -> bool:
+        from botocore.exceptions import ClientError
+
+        started = False
+        while True:
+            with self._condition:
+                if (
+                    not self._pending
+                    or len(self._running) >= self.max_concurrent_queries
+                ):
+                    return started
+                query, future = self._pending.popleft()
+            if not future.running() and not future.set_running_or_notify_cancel():
+                continue
+            try:
+                query_id = self.handler.start_query(query)
+            except ClientError as e:
+                if (
+                    e.response.get("Error", {}).get("Code")
+                    != "TooManyRequestsException"
+                ):
+                    future.set_exception(e)
+                    continue
+                with self._condition:
+                    self._pending.appendleft((query, future))
+                return started
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            future.query_id = query_id
+            with self._condition:
+                self._running[query_id] = future
+            started = True
+
+    def _poll_running(self) -> bool:
+        from botocore.exceptions import ClientError
+
+        with self._condition:
+            query_ids = list(self._running)
+        changed = False
+        for i in range(0, len(query_ids), BATCH_GET_QUERY_EXECUTION_LIMIT):
+            chunk = query_ids[i : i + BATCH_GET_QUERY_EXECUTION_LIMIT]
+            try:
+                response = self.handler.athena_client.batch_get_query_execution(
+                    QueryExecutionIds=chunk
+                )
+            except ClientError as e:
+                changed = self._handle_poll_error(chunk, e) or changed
+                continue
+            for query_id in chunk:
+                self._poll_errors.pop(query_id, None)
+            for execution in response.get("QueryExecutions", []):
+                status = execution["Status"]
+                if status["State"] not in TERMINAL_STATES:
+                    continue
+                query_id = execution["QueryExecutionId"]
+                with self._condition:
+                    future = self._running.pop(query_id)
+                changed = True
+                if status["State"] == "SUCCEEDED":
+                    try:
+                        self._results_executor.submit(self._resolve, future, query_id)
+                    except RuntimeError:
+                        # The result threads are gone, eg. at interpreter exit.
+                        self._resolve(future, query_id)
+                else:
+                    reason = status.get("StateChangeReason", "")
+                    future.set_exception(
+                        Exception(
+                            f"Query failed with status: {status['State']} {reason}"
+                        )
+                    )
+        return changed
+
+    def _handle_poll_error(self, query_ids: List[str], error: Exception) -> bool:
+        code = error.response.get("Error", {}).get("Code")
+        attempts = max(self._poll_errors.get(query_id, 0) for query_id in query_ids)
+        if code in TRANSIENT_ERROR_CODES and attempts + 1 < MAX_POLL_ATTEMPTS:
+            for query_id in query_ids:
+                self._poll_errors[query_id] = attempts + 1
+            return False
+
+        with self._condition:
+            futures = [self._running.pop(query_id) for query_id in query_ids]
+        for query_id, future in zip(query_ids, futures):
+            self._poll_errors.pop(query_id, None)
+            future.set_exception(error)
+        return True
+
+    def _fail_all(self, error: Exception) -> None:
+        with self._condition:
+            futures = list(self._running.values()) + [f for _, f in self._pending]
+            self._running.clear()
+            self._pending.clear()
+        self._poll_errors.clear()
+        for future in futures:
+            if not future.done():
+                if not future.running():
+                    future.set_running_or_notify_cancel()
+                future.set_exception(error)
+
+    def _resolve(self, future: Future, query_id: str) -> None:
+        try:
+            future.set_result(self.handler.get_query_results(query_id))
+        except Exception as e:
+            future.set_exception(e)
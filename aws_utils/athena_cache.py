@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+from aws_utils.cache import TTLCache
+from aws_utils.s3 import S3Handler
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 128
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes SQL so that queries differing only in formatting share a cache key.
+
+    Comments are removed, runs of whitespace are collapsed, a trailing semicolon
+    is dropped and everything outside single-quoted string literals is lowercased.
+
+    Args:
+        query (str): The SQL query.
+
+    Returns:
+        str: The normalized query.
+    """
+    output: List[str] = []
+    pending_space = False
+    i = 0
+    length = len(query)
+    while i < length:
+        char = query[i]
+        if char.isspace() or query.startswith(("--", "/*"), i):
+            if query.startswith("--", i):
+                end = query.find("\n", i)
+                i = length if end == -1 else end
+            elif query.startswith("/*", i):
+                end = query.find("*/", i + 2)
+                i = length if end == -1 else end + 2
+            else:
+                i += 1
+            pending_space = True
+            continue
+
+        if pending_space and output:
+            output.append(" ")
+        pending_space = False
+        if char == "'":
+            end = i + 1
+            while end < length:
+                if query[end] == "'":
+                    if query.startswith("''", end):
+                        end += 2
+                        continue
+                    break
+                end += 1
+            output.append(query[i : end + 1])
+            i = end + 1
+        else:
+            output.append(char.lower())
+            i += 1
+
+    return "".join(output).rstrip("; ")
+
+
+class AthenaResultCache:
+    """
+    Cache of Athena query results keyed by normalized SQL, database and workgroup.
+
+    Results are kept in an in-memory LRU tier with a TTL, and optionally in a
+    shared tier on local disk or in S3 so that other processes can reuse them.
+    Rows are copied in and out of the cache, so callers may modify their results.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        cache_directory: Optional[str] = None,
+        s3_bucket: Optional[str] = None,
+        s3_prefix: str = "athena-cache/",
+    ) -> None:
+        """
+        Args:
+            ttl_seconds (float): How long cached results stay valid.
+            max_entries (int): The maximum number of results held in memory.
+            cache_directory (Optional[str]): A directory for an on-disk cache tier.
+            s3_bucket (Optional[str]): A bucket for an S3-backed cache tier.
+            s3_prefix (str): The key prefix of the S3-backed cache tier.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.cache_directory = cache_directory
+        self.s3_bucket = s3_bucket
+        self.s3_prefix = s3_prefix
+        self._memory = TTLCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self._s3_handler: Optional[S3Handler] = None
+        if cache_directory:
+            os.makedirs(cache_directory, exist_ok=True)
+
+    @property
+    def s3_handler(self) -> S3Handler:
+        """
+        The S3Handler used for the S3-backed tier, created on first use.
+        """
+        if self._s3_handler is None:
+            self._s3_handler = S3Handler()
+        return self._s3_handler
+
+    @staticmethod
+    def make_key(query: str, database: str, workgroup: str) -> str:
+        """
+        Builds the cache key of a query.
+
+        Args:
+            query (str): The SQL query.
+            database (str): The Athena database.
+            workgroup (str): The Athena workgroup.
+
+        Returns:
+            str: A hex digest identifying the query.
+        """
+        payload = json.dumps([normalize_query(query), database, workgroup])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Looks up cached results, checking memory first, then the disk tier and
+        then the S3 tier. Expired entries of a tier are skipped.
+
+        Args:
+            key (str): The cache key from ``make_key``.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: A copy of the cached rows, or None on a
+            miss.
+        """
+        rows = self._memory.get(key)
+        if rows is not None:
+            return _copy_rows(rows)
+
+        entry = self._read_shared(key)
+        if entry is None:
+            return None
+        self._memory.set(
+            key, entry["rows"], ttl_seconds=entry["expires_at"] - time.time()
+        )
+        return _copy_rows(entry["rows"])
+
+    def set(self, key: str, rows: List[Dict[str, Any]]) -> None:
+        """
+        Stores query results in every configured tier.
+
+        Args:
+            key (str): The cache key from ``make_key``.
+            rows (List[Dict[str, Any]]): The query results.
+        """
+        rows = _copy_rows(rows)
+        self._memory.set(key, rows)
+        entry = {"expires_at": time.time() + self.ttl_seconds, "rows": rows}
+        if self.cache_directory:
+            path = os.path.join(self.cache_directory, f"{key}.json")
+            temporary_path = f"{path}.{os.getpid()}.tmp"
+            with open(temporary_path, "w") as file:
+                json.dump(entry, file)
+            os.replace(temporary_path, path)
+        if self.s3_bucket:
+            self.s3_handler.upload_json_to_s3(
+                self.s3_bucket, f"{self.s3_prefix}{key}.json", entry
+            )
+
+    def clear(self) -> None:
+        """
+        Clears the in-memory tier. Shared tiers expire on their own.
+        """
+        self._memory.clear()
+
+    def _read_shared(self, key: str) -> Optional[Dict[str, Any]]:
+        from botocore.exceptions import ClientError
+
+        if self.cache_directory:
+            path = os.path.join(self.cache_directory, f"{key}.json")
+            try:
+                with open(path) as file:
+                    entry = json.load(file)
+            except (OSError, ValueError):
+                entry = None
+            if _is_fresh(entry):
+                return entry
+        if self.s3_bucket:
+            try:
+                entry = self.s3_handler.load_json_from_s3(
+                    self.s3_bucket, f"{self.s3_prefix}{key}.json"
+                )
+            except (ClientError, ValueError):
+                entry = None
+            if _is_fresh(entry):
+                return entry
+        return None
+
+
+def _is_fresh(entry: Any) -> bool:
+    return (
+        isinstance(entry, dict)
+        and isinstance(entry.get("expires_at"), (int, float))
+        and entry["expires_at"] > time.time()
+        and isinstance(entry.get("rows"), list)
+    )
+
+
+def _copy_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [dict(row) for row in rows]
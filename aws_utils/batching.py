@@ -0,0 +1,151 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+from aws_utils.retry import backoff_delays
+
+MAX_BATCH_ENTRIES = 10
+MAX_BATCH_BYTES = 256 * 1024
+DEFAULT_BATCH_WORKERS = 8
+DEFAULT_MAX_ATTEMPTS = 5
+
+T = TypeVar("T")
+
+# A failed entry reported by a batch call: its index in the batch, the error
+# details and whether sending it again may succeed.
+BatchFailure = Tuple[int, Dict[str, Any], bool]
+
+
+def pack_batches(
+    entries: Iterable[T],
+    entry_size: Callable[[T], int],
+    max_entries: int = MAX_BATCH_ENTRIES,
+    max_bytes: int = MAX_BATCH_BYTES,
+    group_key: Optional[Callable[[T], Hashable]] = None,
+) -> Iterator[List[T]]:
+    """
+    Groups entries into batches that respect an entry count and a payload size limit.
+
+    Args:
+        entries (Iterable[T]): The entries to group, in order.
+        entry_size (Callable[[T], int]): Returns the size of an entry in bytes.
+        max_entries (int): The maximum number of entries per batch.
+        max_bytes (int): The maximum total size of a batch in bytes.
+        group_key (Optional[Callable[[T], Hashable]]): If given, consecutive entries
+            with different keys are never put in the same batch.
+
+    Yields:
+        List[T]: Each batch of entries.
+
+    Raises:
+        ValueError: If a single entry is larger than ``max_bytes``.
+    """
+    batch: List[T] = []
+    batch_bytes = 0
+    batch_group: Hashable = None
+    for entry in entries:
+        size = entry_size(entry)
+        if size > max_bytes:
+            raise ValueError(
+                f"Entry of {size} bytes exceeds the {max_bytes} byte limit"
+            )
+        group = group_key(entry) if group_key else None
+        if batch and (
+            len(batch) >= max_entries
+            or batch_bytes + size > max_bytes
+            or group != batch_group
+        ):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(entry)
+        batch_bytes += size
+        batch_group = group
+    if batch:
+        yield batch
+
+
+def send_in_batches(
+    entries: Iterable[T],
+    entry_size: Callable[[T], int],
+    send_batch: Callable[[List[T]], List[BatchFailure]],
+    max_workers: int = DEFAULT_BATCH_WORKERS,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    max_entries: int = MAX_BATCH_ENTRIES,
+    max_bytes: int = MAX_BATCH_BYTES,
+    group_key: Optional[Callable[[T], Hashable]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Packs entries into batches and sends them concurrently.
+
+    Only the entries a batch call reports as failed are sent again, with
+    exponential backoff and jitter. If the call itself raises, the whole batch
+    is retried.
+
+    Args:
+        entries (Iterable[T]): The entries to send.
+        entry_size (Callable[[T], int]): Returns the size of an entry in bytes.
+        send_batch (Callable[[List[T]], List[BatchFailure]]): Sends one batch and
+            returns its failed entries.
+        max_workers (int): The maximum number of batches sent concurrently.
+        max_attempts (int): The maximum number of times an entry is sent.
+        max_entries (int): The maximum number of entries per batch.
+        max_bytes (int): The maximum total size of a batch in bytes.
+        group_key (Optional[Callable[[T], Hashable]]): If given, consecutive entries
+            with different keys are never put in the same batch.
+
+    Returns:
+        List[Dict[str, Any]]: One dictionary per entry that could not be sent, with
+        the ``Entry`` and the error details of its last attempt.
+    """
+
+    def send_with_retries(batch: List[T]) -> List[Dict[str, Any]]:
+        delays = backoff_delays()
+        failed: List[Dict[str, Any]] = []
+        for attempt in range(1, max_attempts + 1):
+            try:
+                failures = send_batch(batch)
+            except Exception as e:
+                error = {"Code": type(e).__name__, "Message": str(e)}
+                failures = [(index, error, True) for index in range(len(batch))]
+
+            retry = []
+            for index, error, retryable in failures:
+                if retryable and attempt < max_attempts:
+                    retry.append(batch[index])
+                else:
+                    failed.append({"Entry": batch[index], **error})
+            if not retry:
+                break
+            batch = retry
+            time.sleep(next(delays))
+        return failed
+
+    failed: List[Dict[str, Any]] = []
+    # Batches are packed lazily and only a bounded number is in flight, so a large
+    # or endless generator of entries is never held in memory.
+    max_in_flight = max_workers * 2
+    in_flight: Set[Future] = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for batch in pack_batches(
+            entries, entry_size, max_entries, max_bytes, group_key
+        ):
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    failed.extend(future.result())
+            in_flight.add(executor.submit(send_with_retries, batch))
+        for future in in_flight:
+            failed.extend(future.result())
+    return failed
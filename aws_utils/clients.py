@@ -0,0 +1,157 @@
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+DEFAULT_TCP_KEEPALIVE = True
+DEFAULT_RETRIES = {"max_attempts": 10, "mode": "standard"}
+
+ClientKey = Tuple[str, Optional[str], Tuple[Any, ...]]
+
+_clients: Dict[ClientKey, Any] = {}
+_lock = threading.Lock()
+_session: Any = None
+_credentials_session: Any = None
+# boto3 and botocore are only imported once the first client is created.
+_config_options: Dict[str, Any] = {
+    "max_pool_connections": DEFAULT_MAX_POOL_CONNECTIONS,
+    "tcp_keepalive": DEFAULT_TCP_KEEPALIVE,
+    "retries": DEFAULT_RETRIES,
+}
+
+
+def configure_clients(
+    max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS,
+    tcp_keepalive: bool = DEFAULT_TCP_KEEPALIVE,
+    retries: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Sets the botocore configuration of shared clients and discards existing ones.
+
+    Args:
+        max_pool_connections (int): The maximum number of pooled connections per client.
+        tcp_keepalive (bool): Whether to enable TCP keep-alive on connections.
+        retries (Optional[Dict[str, Any]]): The botocore retry configuration.
+    """
+    global _config_options
+    with _lock:
+        _config_options = {
+            "max_pool_connections": max_pool_connections,
+            "tcp_keepalive": tcp_keepalive,
+            "retries": DEFAULT_RETRIES if retries is None else retries,
+        }
+        _clients.clear()
+
+
+def set_credentials_session(session: Any) -> None:
+    """
+    Makes shared clients take their credentials from a boto3 session, such as one
+    with refreshable credentials, instead of from the environment.
+
+    Args:
+        session (Any): The boto3 session, or None to use the environment again.
+    """
+    global _credentials_session
+    with _lock:
+        _credentials_session = session
+        _clients.clear()
+
+
+def get_client(service_name: str, region_name: Optional[str] = None) -> Any:
+    """
+    Returns the shared client of a service, creating it on first use.
+
+    Clients are keyed by service, region and the credentials in the environment,
+    so a client is replaced automatically when ``iam.get_aws_credentials``
+    rotates the environment credentials. If a session was set with
+    ``set_credentials_session``, clients use its credentials instead. Clients are
+    thread-safe and shared by every handler in the process.
+
+    Args:
+        service_name (str): The AWS service name, such as ``"s3"``.
+        region_name (Optional[str]): The region. Defaults to ``AWS_REGION``.
+
+    Returns:
+        Any: The boto3 client.
+    """
+    region_name = region_name or os.environ.get("AWS_REGION")
+    credentials_session = _credentials_session
+    if credentials_session is not None:
+        credentials: Tuple[Any, ...] = (credentials_session,)
+    else:
+        credentials = (
+            os.environ.get("AWS_ACCESS_KEY_ID"),
+            os.environ.get("AWS_SECRET_ACCESS_KEY"),
+            os.environ.get("AWS_SESSION_TOKEN"),
+        )
+    key = (service_name, region_name, credentials)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            from botocore.config import Config
+
+            # Clients for credentials that have since rotated are dropped.
+            for stale_key in [
+                k for k in _clients if k[:2] == key[:2] and k[2] != credentials
+            ]:
+                del _clients[stale_key]
+            # boto3 sessions are not thread-safe, so clients are created under the lock.
+            if credentials_session is not None:
+                client = credentials_session.client(
+                    service_name,
+                    region_name=region_name,
+                    config=Config(**_config_options),
+                )
+            else:
+                client = _get_session().client(
+                    service_name,
+                    region_name=region_name,
+                    aws_access_key_id=credentials[0],
+                    aws_secret_access_key=credentials[1],
+                    aws_session_token=credentials[2],
+                    config=Config(**_config_options),
+                )
+            _clients[key] = client
+    return client
+
+
+def clear_clients() -> None:
+    """
+    Discards every shared client, so the next access creates new ones.
+    """
+    with _lock:
+        _clients.clear()
+
+
+class SharedClient:
+    """
+    Class attribute that resolves to the shared client of a service on each access.
+
+    Assigning the attribute on an instance overrides it for that instance only.
+    """
+
+    def __init__(self, service_name: str) -> None:
+        """
+        Args:
+            service_name (str): The AWS service name, such as ``"s3"``.
+        """
+        self.service_name = service_name
+
+    def __get__(self, instance: Any, owner: Any = None) -> Any:
+        if instance is None:
+            return self
+        return get_client(self.service_name)
+
+
+def _get_session() -> Any:
+    # A single session shares the loaded service models between all clients.
+    global _session
+    if _session is None:
+        import boto3
+
+        _session = boto3.Session()
+    return _session
@@ -1,14 +1,69 @@
-import boto3
-import os
 import json
 import logging
-from typing import Any, Dict, Tuple, Optional, List
-from jsonschema import validate, ValidationError
+import threading
+from typing import Any, Callable, Dict, Iterable, Tuple, Optional, List
+from aws_utils.batching import DEFAULT_BATCH_WORKERS, BatchFailure, send_in_batches
+from aws_utils.cache import TTLCache
+from aws_utils.clients import SharedClient
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_FLUSH_THRESHOLD = 100
+SCHEMA_REGISTRY_NAME = "GlobalEventSchemaRegistry"
+DEFAULT_SCHEMA_TTL_SECONDS = 300
+# put_events entry errors worth retrying; others, such as MalformedDetail, are final.
+RETRYABLE_ERROR_CODES = ("ThrottlingException", "InternalFailure")
+
+# Schemas and compiled validators are shared by every handler in the process, so
+# warm Lambda invocations skip the registry round-trip and the schema compilation.
+# Latest schemas expire after a TTL; a specific schema version never changes.
+_LATEST_SCHEMAS = TTLCache(ttl_seconds=DEFAULT_SCHEMA_TTL_SECONDS, max_entries=128)
+_SCHEMA_VERSIONS = TTLCache(ttl_seconds=None, max_entries=128)
+_VALIDATORS = TTLCache(ttl_seconds=None, max_entries=128)
+
+# Returns the error message of an invalid instance, or None if it is valid.
+Validator = Callable[[Any], Optional[str]]
+
 
 class EventsHandler:
+    eventbridge_client = SharedClient("events")
+    schemas_client = SharedClient("schemas")
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_BATCH_WORKERS,
+        flush_threshold: int = DEFAULT_FLUSH_THRESHOLD,
+        schema_ttl_seconds: float = DEFAULT_SCHEMA_TTL_SECONDS,
+        fast_validation: bool = True,
+    ) -> None:
+        """
+        Initializes the EventsHandler. The EventBridge and Schemas clients are
+        shared by every handler.
+
+        Args:
+            max_workers (int): The maximum number of put_events calls sent concurrently.
+            flush_threshold (int): The number of entries queued by ``add_event``
+                that triggers an automatic flush.
+            schema_ttl_seconds (float): How long the latest version of a schema is
+                cached before the registry is checked for a new version.
+            fast_validation (bool): Whether to compile schemas with fastjsonschema
+                when it is installed.
+        """
+        self.max_workers = max_workers
+        self.flush_threshold = flush_threshold
+        self.schema_ttl_seconds = schema_ttl_seconds
+        self.fast_validation = fast_validation
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "EventsHandler":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        failed = self.flush()
+        if failed and exc_type is None:
+            raise Exception(f"Failed to publish events: {failed}")
+
     def publish_event(
         self, event_bus_name: str, event_source: str, detail_type: str, detail: Any
     ) -> Tuple[Dict[str, Any], List[Dict[str, str]]]:
@@ -25,46 +80,190 @@ class EventsHandler:
             Tuple[Dict[str, Any], List[Dict[str, str]]]: A tuple containing the response from the
             put_events call and the list of entries that were published.
         """
-        eventbridge_client = boto3.client(
-            "events", region_name=os.environ["AWS_REGION"]
+        entries = [_build_entry(event_bus_name, event_source, detail_type, detail)]
+        response = self.eventbridge_client.put_events(Entries=entries)
+        return response, entries
+
+    def publish_events(
+        self,
+        event_bus_name: str,
+        event_source: str,
+        detail_type: str,
+        details: Iterable[Any],
+    ) -> List[Dict[str, Any]]:
+        """
+        Publishes many events of the same type to the specified event bus.
+
+        Args:
+            event_bus_name (str): The name of the event bus to publish the events to.
+            event_source (str): The source of the events.
+            detail_type (str): The event name.
+            details (Iterable[Any]): The details of the events, each serialized to JSON.
+
+        Returns:
+            List[Dict[str, Any]]: The entries that could not be published, each with
+            the ``ErrorCode`` and ``ErrorMessage`` of its last attempt.
+        """
+        return self.put_events(
+            _build_entry(event_bus_name, event_source, detail_type, detail)
+            for detail in details
         )
 
-        entries = [
-            {
-                "Source": event_source,
-                "DetailType": detail_type,
-                "Detail": json.dumps(detail),
-                "EventBusName": event_bus_name,
-            }
-        ]
+    def put_events(self, entries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Sends put_events entries in groups of up to 10 entries and 256 KB. A group
+        only holds consecutive entries for the same event bus, so entries ordered
+        by bus are published in per-bus calls.
 
-        response = eventbridge_client.put_events(Entries=entries)
-        return response, entries
+        Groups are sent concurrently, and only the entries that a put_events
+        response reports as throttled or as an internal failure are sent again,
+        with backoff.
+
+        Args:
+            entries (Iterable[Dict[str, Any]]): The put_events entries to send.
+
+        Returns:
+            List[Dict[str, Any]]: The entries that could not be published, each with
+            the ``ErrorCode`` and ``ErrorMessage`` of its last attempt.
+        """
+
+        def put_batch(batch: List[Dict[str, Any]]) -> List[BatchFailure]:
+            response = self.eventbridge_client.put_events(Entries=batch)
+            if not response["FailedEntryCount"]:
+                return []
+            return [
+                (index, result, result["ErrorCode"] in RETRYABLE_ERROR_CODES)
+                for index, result in enumerate(response["Entries"])
+                if "ErrorCode" in result
+            ]
+
+        return send_in_batches(
+            entries,
+            _entry_size,
+            put_batch,
+            max_workers=self.max_workers,
+            group_key=lambda entry: entry.get("EventBusName"),
+        )
+
+    def add_event(
+        self, event_bus_name: str, event_source: str, detail_type: str, detail: Any
+    ) -> List[Dict[str, Any]]:
+        """
+        Queues an event to be published by the next flush. The queue is flushed
+        automatically once it holds ``flush_threshold`` entries.
+
+        Args:
+            event_bus_name (str): The name of the event bus to publish the event to.
+            event_source (str): The source of the event.
+            detail_type (str): The event name.
+            detail (Any): The detail of the event, which will be serialized to JSON.
+
+        Returns:
+            List[Dict[str, Any]]: The entries that failed if a flush was triggered,
+            otherwise an empty list.
+        """
+        entry = _build_entry(event_bus_name, event_source, detail_type, detail)
+        with self._lock:
+            self._pending.append(entry)
+            if len(self._pending) < self.flush_threshold:
+                return []
+        return self.flush()
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """
+        Publishes every event queued by ``add_event``.
+
+        Returns:
+            List[Dict[str, Any]]: The entries that could not be published, each with
+            the ``ErrorCode`` and ``ErrorMessage`` of its last attempt.
+        """
+        with self._lock:
+            entries = self._pending
+            self._pending = []
+        if not entries:
+            return []
+        return self.put_events(entries)
 
-    def get_schema(self, event_name: str) -> Optional[Dict[str, Any]]:
+    def get_schema(
+        self,
+        event_name: str,
+        schema_version: Optional[str] = None,
+        refresh: bool = False,
+    ) -> Optional[Dict[str, Any]]:
         """
         Retrieves the schema for a specified event from the schema registry.
 
+        Schemas are cached for the lifetime of the process. The latest version is
+        looked up again once ``schema_ttl_seconds`` have passed, and the cached
+        schema is kept if its version has not changed.
+
         Args:
             event_name (str): The name of the event whose schema is to be retrieved.
+            schema_version (Optional[str]): A specific version of the schema. The
+                latest version is used if not given.
+            refresh (bool): Whether to bypass the cache.
 
         Returns:
             Optional[Dict[str, Any]]: The schema of the event as a dictionary, or None if an error occurs.
         """
-        session = boto3.Session(region_name=os.environ["AWS_REGION"])
-        schemas_client = session.client("schemas")
-        try:
-            response = schemas_client.describe_schema(
-                RegistryName="GlobalEventSchemaRegistry", SchemaName=event_name
-            )
-            schema_json = json.loads(response["Content"])
-            logger.info(f"Schema: {schema_json}")
-            return schema_json
+        if not refresh:
+            if schema_version is None:
+                schema_json = _LATEST_SCHEMAS.get((SCHEMA_REGISTRY_NAME, event_name))
+            else:
+                schema_json = _SCHEMA_VERSIONS.get(
+                    (SCHEMA_REGISTRY_NAME, event_name, schema_version)
+                )
+            if schema_json is not None:
+                return schema_json
 
+        kwargs = {"RegistryName": SCHEMA_REGISTRY_NAME, "SchemaName": event_name}
+        if schema_version is not None:
+            kwargs["SchemaVersion"] = schema_version
+        try:
+            response = self.schemas_client.describe_schema(**kwargs)
         except Exception as e:
             logger.error(f"Error retrieving schema: {e}")
             return None
 
+        version_key = (SCHEMA_REGISTRY_NAME, event_name, response["SchemaVersion"])
+        schema_json = _SCHEMA_VERSIONS.get(version_key)
+        if schema_json is None:
+            schema_json = json.loads(response["Content"])
+            _SCHEMA_VERSIONS.set(version_key, schema_json)
+            logger.info(f"Schema: {schema_json}")
+        if schema_version is None:
+            _LATEST_SCHEMAS.set(
+                (SCHEMA_REGISTRY_NAME, event_name),
+                schema_json,
+                ttl_seconds=self.schema_ttl_seconds,
+            )
+        return schema_json
+
+    def get_validator(self, event_schema: Dict[str, Any]) -> Validator:
+        """
+        Returns a compiled validator for a schema, compiling it only once per process.
+
+        The schema is compiled with fastjsonschema when it is installed and
+        ``fast_validation`` is set, and with jsonschema otherwise.
+
+        Args:
+            event_schema (Dict[str, Any]): The schema to compile.
+
+        Returns:
+            Validator: Returns the error message of an invalid instance, or None.
+        """
+        # Schemas from get_schema are shared objects, so identity is a cheap key.
+        # The entry holds the schema itself so its id cannot be reused.
+        key = (id(event_schema), self.fast_validation)
+        entry = _VALIDATORS.get(key)
+        if entry is None or entry[0] is not event_schema:
+            entry = (
+                event_schema,
+                _compile_validator(event_schema, self.fast_validation),
+            )
+            _VALIDATORS.set(key, entry)
+        return entry[1]
+
     def validate_event(self, event_detail: Any, event_schema: Dict[str, Any]) -> bool:
         """
         Validates the provided event detail against the specified schema.
@@ -74,18 +273,91 @@ class EventsHandler:
             event_schema (Dict[str, Any]): The schema against which the event detail will be validated.
 
         Returns:
-            bool: True if the event detail is valid according to the schema, False otherwise.
+            bool: True if the event detail is valid according to the schema.
 
-        Logs:
-            Info: Indicates if the event detail is valid.
-            Error: Logs any validation errors encountered during the process.
+        Raises:
+            Exception: If the event detail is not valid.
         """
-        try:
-            validate(instance=event_detail, schema=event_schema)
-            logger.info("Event detail is valid.")
-            return True
-        except ValidationError as e:
-            logger.error(f"Event detail validation error: {e.message}")
+        error = self.get_validator(event_schema)(event_detail)
+        if error is not None:
+            logger.error(f"Event detail validation error: {error}")
             raise Exception(
                 f"Event is not valid: {event_detail} \n Schema: {event_schema}"
             )
+        logger.info("Event detail is valid.")
+        return True
+
+    def validate_events(
+        self, event_details: Iterable[Any], event_schema: Dict[str, Any]
+    ) -> List[Optional[str]]:
+        """
+        Validates many event details against the same schema.
+
+        Args:
+            event_details (Iterable[Any]): The event details to be validated.
+            event_schema (Dict[str, Any]): The schema against which they are validated.
+
+        Returns:
+            List[Optional[str]]: For each event detail, the validation error message,
+            or None if it is valid.
+        """
+        validator = self.get_validator(event_schema)
+        return [validator(event_detail) for event_detail in event_details]
+
+
+def _compile_validator(schema: Dict[str, Any], fast: bool) -> Validator:
+    # Validation libraries are imported on first use to keep imports fast.
+    try:
+        import fastjsonschema
+    except ImportError:
+        fastjsonschema = None
+
+    if fast and fastjsonschema is not None:
+        try:
+            fast_validate = fastjsonschema.compile(schema)
+        except fastjsonschema.JsonSchemaDefinitionException as e:
+            logger.warning(f"Falling back to jsonschema: {e}")
+        else:
+
+            def validate_fast(instance: Any) -> Optional[str]:
+                try:
+                    fast_validate(instance)
+                except fastjsonschema.JsonSchemaValueException as e:
+                    return e.message
+                return None
+
+            return validate_fast
+
+    from jsonschema.exceptions import best_match
+    from jsonschema.validators import validator_for
+
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    validator = validator_class(schema)
+
+    def validate(instance: Any) -> Optional[str]:
+        error = best_match(validator.iter_errors(instance))
+        return None if error is None else error.message
+
+    return validate
+
+
+def _build_entry(
+    event_bus_name: str, event_source: str, detail_type: str, detail: Any
+) -> Dict[str, Any]:
+    return {
+        "Source": event_source,
+        "DetailType": detail_type,
+        "Detail": json.dumps(detail),
+        "EventBusName": event_bus_name,
+    }
+
+
+def _entry_size(entry: Dict[str, Any]) -> int:
+    # Follows the PutEvents entry size calculation, which ignores EventBusName.
+    size = 14 if "Time" in entry else 0
+    for field in ("Source", "DetailType", "Detail"):
+        size += len(entry.get(field, "").encode("utf-8"))
+    for resource in entry.get("Resources", []):
+        size += len(resource.encode("utf-8"))
+    return size
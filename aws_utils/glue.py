@@ -1,16 +1,62 @@
-import boto3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, List, Optional, Set, Tuple
+from aws_utils.clients import SharedClient
+from aws_utils.parquet import get_parquet_num_rows, list_data_files
+from aws_utils.s3 import S3Handler
+
+BATCH_CREATE_PARTITION_LIMIT = 100
+BATCH_DELETE_PARTITION_LIMIT = 25
+MAX_PARTITION_SEGMENTS = 10
+DEFAULT_GLUE_WORKERS = 8
 
 
 class GlueHandler:
+    glue_client = SharedClient("glue")
+
     def __init__(self) -> None:
         """
-        Initializes the GlueHandler by creating a Glue client using AWS credentials
-        from environment variables.
+        Initializes the GlueHandler. The Glue client is shared by every handler.
+        """
+        self._tables: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._known_partitions: Dict[Tuple[str, str], Set[Tuple[str, ...]]] = {}
+        self._lock = threading.Lock()
+        self._s3_handler: Optional[S3Handler] = None
+
+    @property
+    def s3_handler(self) -> S3Handler:
+        """
+        The S3Handler used to inspect partition data, created on first use.
         """
-        self.glue_client = boto3.client("glue", region_name=os.environ["AWS_REGION"])
+        if self._s3_handler is None:
+            self._s3_handler = S3Handler()
+        return self._s3_handler
+
+    def get_table(
+        self, database_name: str, table_name: str, refresh: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Retrieves a Glue table definition, caching it for later calls.
+
+        Args:
+            database_name (str): The name of the Glue database.
+            table_name (str): The name of the Glue table.
+            refresh (bool): Whether to bypass the cache and fetch the table again.
+
+        Returns:
+            Dict[str, Any]: The table definition, as returned by ``get_table``.
+        """
+        cache_key = (database_name, table_name)
+        if refresh or cache_key not in self._tables:
+            response = self.glue_client.get_table(
+                DatabaseName=database_name,
+                Name=table_name,
+                CatalogId=os.environ["AWS_ACCOUNT_ID"],
+            )
+            self._tables[cache_key] = response["Table"]
+        return self._tables[cache_key]
 
     def build_partition_location(
         self,
@@ -43,6 +89,7 @@ class GlueHandler:
         table_name: str,
         bucket_name: str,
         partition_values: Dict[str, Any],
+        compute_statistics: bool = False,
     ) -> None:
         """
         Adds a new partition to a Glue table.
@@ -52,28 +99,389 @@ class GlueHandler:
             table_name (str): The name of the Glue table.
             bucket_name (str): The name of the S3 bucket.
             partition_values (Dict[str, Any]): A dictionary of partition values.
+            compute_statistics (bool): Whether to record the real object count, size
+                and record count of the partition data instead of placeholders.
 
         Raises:
             Exception: If there is an error while creating the partition.
         """
-        current_time = datetime.now().isoformat() + "Z"
+        table = self.get_table(database_name, table_name)
+        partition_input = self._build_partition_input(
+            table, database_name, table_name, bucket_name, partition_values
+        )
+        if compute_statistics:
+            self._apply_partition_statistics(partition_input)
 
-        response = self.glue_client.get_table(
+        self.glue_client.create_partition(
             DatabaseName=database_name,
-            Name=table_name,
-            CatalogId=os.environ["AWS_ACCOUNT_ID"],
+            TableName=table_name,
+            PartitionInput=partition_input,
+        )
+        self._remember_partitions(
+            database_name, table_name, [partition_input["Values"]]
+        )
+
+    def add_partitions_to_glue(
+        self,
+        database_name: str,
+        table_name: str,
+        bucket_name: str,
+        partitions: List[Dict[str, Any]],
+        max_workers: int = DEFAULT_GLUE_WORKERS,
+        compute_statistics: bool = False,
+        skip_known: bool = True,
+    ) -> Dict[str, List[Any]]:
+        """
+        Adds many partitions to a Glue table using concurrent ``batch_create_partition``
+        calls of up to 100 partitions each.
+
+        The table definition is fetched once, and partitions already known to this
+        handler are skipped before any request is made. Partitions that already exist
+        in the catalog are reported as skipped rather than failed.
+
+        Args:
+            database_name (str): The name of the Glue database.
+            table_name (str): The name of the Glue table.
+            bucket_name (str): The name of the S3 bucket.
+            partitions (List[Dict[str, Any]]): The partition values of each partition.
+            max_workers (int): The maximum number of concurrent batch requests.
+            compute_statistics (bool): Whether to record the real object count, size
+                and record count of each new partition instead of placeholders.
+            skip_known (bool): Whether to skip partitions known to this handler. Pass
+                False when the partitions were just found missing from the catalog,
+                since they may have been deleted by another process.
+
+        Returns:
+            Dict[str, List[Any]]: A dictionary with the keys:
+                - created: The values of each partition that was created.
+                - skipped: The values of each partition that already existed.
+                - failed: A dictionary per failed partition with its ``Values``,
+                  ``ErrorCode`` and ``ErrorMessage``.
+        """
+        table = self.get_table(database_name, table_name)
+        known: Set[Tuple[str, ...]] = set()
+        if skip_known:
+            with self._lock:
+                known = set(self._known_partitions.get((database_name, table_name), ()))
+
+        result: Dict[str, List[Any]] = {"created": [], "skipped": [], "failed": []}
+        partition_inputs = []
+        seen: Set[Tuple[str, ...]] = set()
+        for partition_values in partitions:
+            partition_input = self._build_partition_input(
+                table, database_name, table_name, bucket_name, partition_values
+            )
+            values = tuple(partition_input["Values"])
+            if values in known or values in seen:
+                result["skipped"].append(list(values))
+                continue
+            seen.add(values)
+            partition_inputs.append(partition_input)
+
+        batches = [
+            partition_inputs[i : i + BATCH_CREATE_PARTITION_LIMIT]
+            for i in range(0, len(partition_inputs), BATCH_CREATE_PARTITION_LIMIT)
+        ]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            if compute_statistics:
+                list(executor.map(self._apply_partition_statistics, partition_inputs))
+            responses = executor.map(
+                lambda batch: self._batch_create_partitions(
+                    database_name, table_name, batch
+                ),
+                batches,
+            )
+            for batch, errors in zip(batches, responses):
+                failed = {}
+                for error in errors:
+                    failed[tuple(error["PartitionValues"])] = error["ErrorDetail"]
+                for partition_input in batch:
+                    values = partition_input["Values"]
+                    error = failed.get(tuple(values))
+                    if error is None:
+                        result["created"].append(values)
+                    elif error.get("ErrorCode") == "AlreadyExistsException":
+                        result["skipped"].append(values)
+                    else:
+                        result["failed"].append(
+                            {
+                                "Values": values,
+                                "ErrorCode": error.get("ErrorCode"),
+                                "ErrorMessage": error.get("ErrorMessage"),
+                            }
+                        )
+
+        self._remember_partitions(
+            database_name, table_name, result["created"] + result["skipped"]
         )
-        paths = [
-            column["Name"]
-            for column in response["Table"]["StorageDescriptor"]["Columns"]
+        return result
+
+    def get_partition_values(
+        self,
+        database_name: str,
+        table_name: str,
+        expression: Optional[str] = None,
+        segments: int = MAX_PARTITION_SEGMENTS,
+    ) -> Set[Tuple[str, ...]]:
+        """
+        Retrieves the values of every partition of a Glue table.
+
+        The partitions are read with up to 10 parallel segment scans of
+        ``get_partitions``, each paginated and without the column schema of the
+        partitions, which is most of the response size.
+
+        Args:
+            database_name (str): The name of the Glue database.
+            table_name (str): The name of the Glue table.
+            expression (Optional[str]): A partition filter expression, such as
+                ``"year >= '2024'"``.
+            segments (int): The number of segments scanned in parallel, from 1 to 10.
+
+        Returns:
+            Set[Tuple[str, ...]]: The values of each partition, in partition key order.
+        """
+        segments = max(1, min(segments, MAX_PARTITION_SEGMENTS))
+        paginator = self.glue_client.get_paginator("get_partitions")
+
+        def scan_segment(segment_number: int) -> List[Tuple[str, ...]]:
+            parameters: Dict[str, Any] = {
+                "CatalogId": os.environ["AWS_ACCOUNT_ID"],
+                "DatabaseName": database_name,
+                "TableName": table_name,
+                "ExcludeColumnSchema": True,
+                "Segment": {
+                    "SegmentNumber": segment_number,
+                    "TotalSegments": segments,
+                },
+            }
+            if expression:
+                parameters["Expression"] = expression
+            return [
+                tuple(partition["Values"])
+                for page in paginator.paginate(**parameters)
+                for partition in page["Partitions"]
+            ]
+
+        with ThreadPoolExecutor(max_workers=segments) as executor:
+            partitions = {
+                values
+                for segment in executor.map(scan_segment, range(segments))
+                for values in segment
+            }
+        if expression:
+            self._remember_partitions(database_name, table_name, list(partitions))
+        else:
+            # A full scan is authoritative, so partitions deleted elsewhere are pruned.
+            with self._lock:
+                self._known_partitions[(database_name, table_name)] = set(partitions)
+        return partitions
+
+    def forget_partitions(self, database_name: str, table_name: str) -> None:
+        """
+        Drops the partitions remembered for a Glue table, eg. after it was deleted.
+
+        Args:
+            database_name (str): The name of the Glue database.
+            table_name (str): The name of the Glue table.
+        """
+        with self._lock:
+            self._known_partitions.pop((database_name, table_name), None)
+
+    def delete_partitions_from_glue(
+        self,
+        database_name: str,
+        table_name: str,
+        partitions: List[List[str]],
+        max_workers: int = DEFAULT_GLUE_WORKERS,
+    ) -> Dict[str, List[Any]]:
+        """
+        Deletes many partitions from a Glue table using concurrent
+        ``batch_delete_partition`` calls of up to 25 partitions each.
+
+        Partitions that no longer exist in the catalog are reported as deleted.
+
+        Args:
+            database_name (str): The name of the Glue database.
+            table_name (str): The name of the Glue table.
+            partitions (List[List[str]]): The values of each partition to delete.
+            max_workers (int): The maximum number of concurrent batch requests.
+
+        Returns:
+            Dict[str, List[Any]]: A dictionary with the keys:
+                - deleted: The values of each partition that was deleted.
+                - failed: A dictionary per failed partition with its ``Values``,
+                  ``ErrorCode`` and ``ErrorMessage``.
+        """
+        values_list = [list(values) for values in partitions]
+        batches = [
+            values_list[i : i + BATCH_DELETE_PARTITION_LIMIT]
+            for i in range(0, len(values_list), BATCH_DELETE_PARTITION_LIMIT)
         ]
+        result: Dict[str, List[Any]] = {"deleted": [], "failed": []}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            responses = executor.map(
+                lambda batch: self._batch_delete_partitions(
+                    database_name, table_name, batch
+                ),
+                batches,
+            )
+            for batch, errors in zip(batches, responses):
+                failed = {}
+                for error in errors:
+                    failed[tuple(error["PartitionValues"])] = error["ErrorDetail"]
+                for values in batch:
+                    error = failed.get(tuple(values))
+                    if (
+                        error is None
+                        or error.get("ErrorCode") == "EntityNotFoundException"
+                    ):
+                        result["deleted"].append(values)
+                    else:
+                        result["failed"].append(
+                            {
+                                "Values": values,
+                                "ErrorCode": error.get("ErrorCode"),
+                                "ErrorMessage": error.get("ErrorMessage"),
+                            }
+                        )
+
+        with self._lock:
+            known = self._known_partitions.get((database_name, table_name), set())
+            known.difference_update(tuple(values) for values in result["deleted"])
+        return result
+
+    def get_partition_statistics(
+        self,
+        bucket_name: str,
+        prefix: str,
+        max_workers: int = DEFAULT_GLUE_WORKERS,
+    ) -> Dict[str, str]:
+        """
+        Computes the statistics of the Parquet data under a partition prefix.
+
+        Sizes come from listing the prefix, and record counts from the Parquet footers,
+        which are read with ranged GETs rather than downloading the objects.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            prefix (str): The S3 prefix of the partition.
+            max_workers (int): The maximum number of concurrent footer reads.
+
+        Returns:
+            Dict[str, str]: The ``sizeKey``, ``objectCount``, ``recordCount`` and
+            ``averageRecordSize`` partition parameters. The record count and average
+            record size are left out if any data file is not a Parquet file.
+        """
+        objects = list_data_files(self.s3_handler.list_objects(bucket_name, prefix))
+        s3_client = self.s3_handler.s3_client
+
+        def count_rows(obj: Dict[str, Any]) -> Optional[int]:
+            try:
+                return get_parquet_num_rows(s3_client, bucket_name, obj["Key"])
+            except ValueError:
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            row_counts = list(executor.map(count_rows, objects))
+        size = sum(obj["Size"] for obj in objects)
+        statistics = {"sizeKey": str(size), "objectCount": str(len(objects))}
+        if None in row_counts:
+            # Record counts of files in other formats are unknown, so a partial
+            # count would be misleading.
+            return statistics
+        record_count = sum(row_counts)
+        statistics["recordCount"] = str(record_count)
+        statistics["averageRecordSize"] = str(
+            size // record_count if record_count else 0
+        )
+        return statistics
+
+    def _apply_partition_statistics(self, partition_input: Dict[str, Any]) -> None:
+        location = partition_input["StorageDescriptor"]["Location"]
+        bucket_name, prefix = location.removeprefix("s3://").split("/", 1)
+        statistics = self.get_partition_statistics(bucket_name, prefix)
+        parameters = partition_input["StorageDescriptor"]["Parameters"]
+        # Placeholders are dropped rather than kept for statistics that are unknown.
+        for name in ("sizeKey", "objectCount", "recordCount", "averageRecordSize"):
+            parameters.pop(name, None)
+        parameters.update(statistics)
+
+    def _batch_create_partitions(
+        self,
+        database_name: str,
+        table_name: str,
+        partition_inputs: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        try:
+            response = self.glue_client.batch_create_partition(
+                DatabaseName=database_name,
+                TableName=table_name,
+                PartitionInputList=partition_inputs,
+            )
+        except Exception as e:
+            return [
+                {
+                    "PartitionValues": partition_input["Values"],
+                    "ErrorDetail": {
+                        "ErrorCode": type(e).__name__,
+                        "ErrorMessage": str(e),
+                    },
+                }
+                for partition_input in partition_inputs
+            ]
+        return response.get("Errors", [])
+
+    def _batch_delete_partitions(
+        self,
+        database_name: str,
+        table_name: str,
+        partitions: List[List[str]],
+    ) -> List[Dict[str, Any]]:
+        try:
+            response = self.glue_client.batch_delete_partition(
+                DatabaseName=database_name,
+                TableName=table_name,
+                PartitionsToDelete=[{"Values": values} for values in partitions],
+            )
+        except Exception as e:
+            return [
+                {
+                    "PartitionValues": values,
+                    "ErrorDetail": {
+                        "ErrorCode": type(e).__name__,
+                        "ErrorMessage": str(e),
+                    },
+                }
+                for values in partitions
+            ]
+        return response.get("Errors", [])
+
+    def _remember_partitions(
+        self, database_name: str, table_name: str, partitions: List[List[str]]
+    ) -> None:
+        with self._lock:
+            known = self._known_partitions.setdefault(
+                (database_name, table_name), set()
+            )
+            known.update(tuple(values) for values in partitions)
+
+    def _build_partition_input(
+        self,
+        table: Dict[str, Any],
+        database_name: str,
+        table_name: str,
+        bucket_name: str,
+        partition_values: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        current_time = datetime.now().isoformat() + "Z"
+        paths = [column["Name"] for column in table["StorageDescriptor"]["Columns"]]
 
         partition_location = self.build_partition_location(
             bucket_name, database_name, table_name, partition_values
         )
 
-        partition_input = {
-            "Values": list(partition_values.values()),
+        return {
+            "Values": [str(value) for value in partition_values.values()],
             "LastAccessTime": current_time,
             "StorageDescriptor": {
                 "Columns": [],
@@ -102,15 +510,6 @@ class GlueHandler:
             "Parameters": {},
         }
 
-        try:
-            self.glue_client.create_partition(
-                DatabaseName=database_name,
-                TableName=table_name,
-                PartitionInput=partition_input,
-            )
-        except Exception as e:
-            raise e
-
     def get_all_databases(self) -> List[str]:
         """
         Retrieves a list of all databases in the Glue catalog.
@@ -123,3 +522,21 @@ class GlueHandler:
         for page in paginator.paginate(CatalogId=os.environ["AWS_ACCOUNT_ID"]):
             databases.extend([db["Name"] for db in page["DatabaseList"]])
         return databases
+
+    def get_tables(self, database_name: str) -> List[Dict[str, Any]]:
+        """
+        Retrieves the definitions of every table in a Glue database.
+
+        Args:
+            database_name (str): The name of the Glue database.
+
+        Returns:
+            List[Dict[str, Any]]: The table definitions, as returned by ``get_tables``.
+        """
+        tables = []
+        paginator = self.glue_client.get_paginator("get_tables")
+        for page in paginator.paginate(
+            CatalogId=os.environ["AWS_ACCOUNT_ID"], DatabaseName=database_name
+        ):
+            tables.extend(page["TableList"])
+        return tables
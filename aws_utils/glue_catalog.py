@@ -0,0 +1,338 @@
+import gzip
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from aws_utils.glue import DEFAULT_GLUE_WORKERS, GlueHandler
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+DEFAULT_PARTITION_SEGMENTS = 4
+
+
+class CatalogSnapshot:
+    """
+    An in-memory copy of the Glue catalog, crawled concurrently and saved to a
+    compact gzipped JSON file.
+
+    Lookups such as ``get_columns`` or ``get_location`` are served from memory,
+    so loading a saved snapshot answers them without any API call. A refresh lists
+    the tables of every database in parallel and only rebuilds tables whose
+    ``UpdateTime`` changed. Partitions are crawled again on every refresh.
+    """
+
+    def __init__(
+        self,
+        glue_handler: Optional[GlueHandler] = None,
+        include_partitions: bool = False,
+        max_workers: int = DEFAULT_GLUE_WORKERS,
+        partition_segments: int = DEFAULT_PARTITION_SEGMENTS,
+    ) -> None:
+        """
+        Args:
+            glue_handler (Optional[GlueHandler]): The GlueHandler used to crawl.
+            include_partitions (bool): Whether to also crawl the partition values of
+                each partitioned table.
+            max_workers (int): The maximum number of databases or tables crawled
+                concurrently.
+            partition_segments (int): The number of segments scanned in parallel
+                when crawling the partitions of a table.
+        """
+        self.glue_handler = glue_handler or GlueHandler()
+        self.include_partitions = include_partitions
+        self.max_workers = max_workers
+        self.partition_segments = partition_segments
+        self.databases: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.crawled_at: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: str, **kwargs: Any) -> "CatalogSnapshot":
+        """
+        Loads a snapshot saved with ``save``.
+
+        Args:
+            path (str): The path of the snapshot file.
+            **kwargs: Further arguments of the snapshot, used by later refreshes.
+
+        Returns:
+            CatalogSnapshot: The snapshot.
+
+        Raises:
+            ValueError: If the file was written by an incompatible version.
+        """
+        with gzip.open(path, "rt") as file:
+            data = json.load(file)
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported catalog snapshot version in {path}")
+        snapshot = cls(**kwargs)
+        snapshot.databases = data["databases"]
+        snapshot.crawled_at = data["crawled_at"]
+        return snapshot
+
+    @classmethod
+    def load_or_crawl(
+        cls, path: str, refresh: bool = False, **kwargs: Any
+    ) -> "CatalogSnapshot":
+        """
+        Loads a saved snapshot, crawling the catalog and saving it if there is none.
+
+        Args:
+            path (str): The path of the snapshot file.
+            refresh (bool): Whether to refresh and save a loaded snapshot.
+            **kwargs: Further arguments of the snapshot.
+
+        Returns:
+            CatalogSnapshot: The snapshot.
+        """
+        try:
+            snapshot = cls.load(path, **kwargs)
+        except (OSError, ValueError):
+            snapshot = cls(**kwargs)
+            refresh = True
+        if refresh:
+            snapshot.refresh()
+            snapshot.save(path)
+        return snapshot
+
+    def save(self, path: str) -> None:
+        """
+        Saves the snapshot to a gzipped JSON file, replacing it atomically.
+
+        Args:
+            path (str): The path of the snapshot file.
+        """
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "crawled_at": self.crawled_at,
+            "databases": self.databases,
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(temporary_path, "wt") as file:
+            json.dump(data, file, separators=(",", ":"))
+        os.replace(temporary_path, path)
+
+    def refresh(
+        self, database_names: Optional[List[str]] = None, full: bool = False
+    ) -> Dict[str, int]:
+        """
+        Brings the snapshot up to date with the catalog.
+
+        The tables of each database are listed concurrently. Tables whose
+        ``UpdateTime`` is unchanged keep their snapshot, and tables or databases
+        that no longer exist are removed. With ``include_partitions``, the partitions
+        of every partitioned table are crawled again and replace the previous ones,
+        since adding or deleting partitions does not change ``UpdateTime``.
+
+        Args:
+            database_names (Optional[List[str]]): The databases to refresh. Defaults
+                to every database in the catalog.
+            full (bool): Whether to rebuild every table, ignoring ``UpdateTime``.
+
+        Returns:
+            Dict[str, int]: The number of ``added``, ``updated``, ``removed`` and
+            ``unchanged`` tables.
+        """
+        crawled_at = datetime.now(timezone.utc).isoformat()
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        if database_names is None:
+            database_names = self.glue_handler.get_all_databases()
+            for database_name in set(self.databases) - set(database_names):
+                removed = self.databases.pop(database_name)
+                counts["removed"] += len(removed)
+                for table_name in removed:
+                    self.glue_handler.forget_partitions(database_name, table_name)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            listings = dict(
+                zip(
+                    database_names,
+                    executor.map(self.glue_handler.get_tables, database_names),
+                )
+            )
+
+        for database_name, tables in listings.items():
+            previous = self.databases.get(database_name, {})
+            current: Dict[str, Dict[str, Any]] = {}
+            for table in tables:
+                record = previous.get(table["Name"])
+                update_time = _format_time(
+                    table.get("UpdateTime") or table.get("CreateTime")
+                )
+                if full or record is None or record["update_time"] != update_time:
+                    counts["updated" if record is not None else "added"] += 1
+                    record = _compact_table(table, update_time)
+                else:
+                    counts["unchanged"] += 1
+                current[table["Name"]] = record
+            for table_name in set(previous) - set(current):
+                counts["removed"] += 1
+                self.glue_handler.forget_partitions(database_name, table_name)
+            self.databases[database_name] = current
+
+        if self.include_partitions:
+            partitioned = [
+                (database_name, table_name, record)
+                for database_name in database_names
+                for table_name, record in self.databases[database_name].items()
+                if record["partition_keys"]
+            ]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(
+                    executor.map(
+                        lambda entry: self._crawl_partitions(*entry), partitioned
+                    )
+                )
+
+        self.crawled_at = crawled_at
+        logger.info(f"Refreshed catalog snapshot: {counts}")
+        return counts
+
+    def list_databases(self) -> List[str]:
+        """
+        Returns the names of the databases in the snapshot.
+
+        Returns:
+            List[str]: The database names.
+        """
+        return list(self.databases)
+
+    def list_tables(self, database_name: str) -> List[str]:
+        """
+        Returns the names of the tables of a database in the snapshot.
+
+        Args:
+            database_name (str): The name of the Glue database.
+
+        Returns:
+            List[str]: The table names.
+
+        Raises:
+            ValueError: If the database is not in the snapshot.
+        """
+        if database_name not in self.databases:
+            raise ValueError(f"Database {database_name} is not in the catalog snapshot")
+        return list(self.databases[database_name])
+
+    def get_table(self, database_name: str, table_name: str) -> Dict[str, Any]:
+        """
+        Returns the compact snapshot of a table.
+
+        Args:
+            database_name (str): The name of the Glue database.
+            table_name (str): The name of the Glue table.
+
+        Returns:
+            Dict[str, Any]: The ``update_time``, ``table_type``, ``location``,
+            ``columns``, ``partition_keys``, ``parameters`` and, if crawled,
+            ``partitions`` of the table.
+
+        Raises:
+            ValueError: If the table is not in the snapshot.
+        """
+        table = self.databases.get(database_name, {}).get(table_name)
+        if table is None:
+            raise ValueError(
+                f"Table {database_name}.{table_name} is not in the catalog snapshot"
+            )
+        return table
+
+    def get_columns(self, database_name: str, table_name: str) -> List[Dict[str, str]]:
+        """
+        Returns the data columns of a table.
+
+        Args:
+            database_name (str): The name of the Glue database.
+            table_name (str): The name of the Glue table.
+
+        Returns:
+            List[Dict[str, str]]: The ``Name`` and ``Type`` of each column.
+        """
+        columns = self.get_table(database_name, table_name)["columns"]
+        return [{"Name": name, "Type": type_} for name, type_ in columns]
+
+    def get_partition_keys(
+        self, database_name: str, table_name: str
+    ) -> List[Dict[str, str]]:
+        """
+        Returns the partition keys of a table.
+
+        Args:
+            database_name (str): The name of the Glue database.
+            table_name (str): The name of the Glue table.
+
+        Returns:
+            List[Dict[str, str]]: The ``Name`` and ``Type`` of each partition key.
+        """
+        keys = self.get_table(database_name, table_name)["partition_keys"]
+        return [{"Name": name, "Type": type_} for name, type_ in keys]
+
+    def get_location(self, database_name: str, table_name: str) -> Optional[str]:
+        """
+        Returns the S3 location of a table.
+
+        Args:
+            database_name (str): The name of the Glue database.
+            table_name (str): The name of the Glue table.
+
+        Returns:
+            Optional[str]: The location, or None if the table has none.
+        """
+        return self.get_table(database_name, table_name)["location"]
+
+    def get_partitions(self, database_name: str, table_name: str) -> List[List[str]]:
+        """
+        Returns the partition values of a table.
+
+        Args:
+            database_name (str): The name of the Glue database.
+            table_name (str): The name of the Glue table.
+
+        Returns:
+            List[List[str]]: The values of each partition, in partition key order.
+
+        Raises:
+            ValueError: If the snapshot was crawled without partitions.
+        """
+        table = self.get_table(database_name, table_name)
+        if "partitions" not in table:
+            raise ValueError(
+                f"Partitions of {database_name}.{table_name} were not crawled"
+            )
+        return table["partitions"]
+
+    def _crawl_partitions(
+        self, database_name: str, table_name: str, record: Dict[str, Any]
+    ) -> None:
+        partitions = self.glue_handler.get_partition_values(
+            database_name, table_name, segments=self.partition_segments
+        )
+        record["partitions"] = [list(values) for values in sorted(partitions)]
+
+
+def _compact_table(table: Dict[str, Any], update_time: Optional[str]) -> Dict[str, Any]:
+    storage = table.get("StorageDescriptor", {})
+    return {
+        "update_time": update_time,
+        "table_type": table.get("TableType"),
+        "location": storage.get("Location"),
+        "columns": [
+            [column["Name"], column.get("Type")]
+            for column in storage.get("Columns", [])
+        ],
+        "partition_keys": [
+            [key["Name"], key.get("Type")] for key in table.get("PartitionKeys", [])
+        ],
+        "parameters": table.get("Parameters", {}),
+    }
+
+
+def _format_time(value: Any) -> Optional[str]:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return None if value is None else str(value)
@@ -1,38 +1,279 @@
-import boto3
+import json
+import logging
+import threading
 import time
 import os
-from typing import Literal, Dict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Literal, Dict, Optional, Tuple
+from aws_utils import clients
+
+logger = logging.getLogger(__name__)
+
+AWS_REGION = "eu-west-2"
+CREDENTIALS_CACHE_DIRECTORY = os.path.join(
+    os.path.expanduser("~"), ".aws", "aws-utils", "credentials"
+)
+DEFAULT_DURATION_SECONDS = 3600
+# botocore starts refreshing credentials 15 minutes before they expire, so cached
+# credentials are only reused while they have longer than that left.
+DEFAULT_REFRESH_MARGIN_SECONDS = 20 * 60
+
+_providers: Dict[Tuple[str, str, str], "AssumedRoleCredentialProvider"] = {}
+_providers_lock = threading.Lock()
 
 
 def get_aws_credentials(variables: Dict[str, str]) -> None:
+    """
+    Assumes the admin role of a stage and exports its credentials to the environment.
+
+    Credentials are cached in memory and on disk, so repeated calls only contact
+    STS when the cached credentials are about to expire. Long-running jobs should
+    use ``use_assumed_role`` instead, which refreshes credentials automatically.
+
+    Args:
+        variables (Dict[str, str]): The STAGE and the admin access keys.
+    """
+    provider = get_credential_provider(variables)
+    credentials = provider.fetch_credentials()
+    os.environ["AWS_ACCESS_KEY_ID"] = credentials["access_key"]
+    os.environ["AWS_SECRET_ACCESS_KEY"] = credentials["secret_key"]
+    os.environ["AWS_SESSION_TOKEN"] = credentials["token"]
+    os.environ["AWS_REGION"] = AWS_REGION
+    os.environ["AWS_ACCOUNT_ID"] = provider.aws_account_id
+
+
+def use_assumed_role(variables: Dict[str, str]) -> "AssumedRoleCredentialProvider":
+    """
+    Makes every shared client use refreshable credentials of the admin role of a stage.
+
+    The credentials are not written to the environment. botocore refreshes them
+    shortly before they expire, so clients keep working through multi-hour jobs.
+
+    Args:
+        variables (Dict[str, str]): The STAGE and the admin access keys.
+
+    Returns:
+        AssumedRoleCredentialProvider: The provider backing the shared clients.
+    """
+    provider = get_credential_provider(variables)
+    clients.set_credentials_session(provider.get_session())
+    os.environ["AWS_REGION"] = AWS_REGION
+    os.environ["AWS_ACCOUNT_ID"] = provider.aws_account_id
+    return provider
+
+
+def get_credential_provider(
+    variables: Dict[str, str],
+) -> "AssumedRoleCredentialProvider":
+    """
+    Returns the credential provider for the admin role of a stage, shared per process
+    by every caller with the same admin access key.
+
+    Args:
+        variables (Dict[str, str]): The STAGE and the admin access keys.
+
+    Returns:
+        AssumedRoleCredentialProvider: The provider for the stage and role.
+    """
     stage = variables["STAGE"]
-    aws_access_key_id = variables["AWS_ACCESS_KEY_ID_ADMIN"]
-    aws_secret_access_key = variables["AWS_SECRET_ACCESS_KEY_ADMIN"]
-
-    aws_account_id = get_aws_account_id(stage)
-    role = get_iam_role(stage)
-    aws_region = "eu-west-2"
-    role_arn = f"arn:aws:iam::{aws_account_id}:role/{role}"
-
-    session_name = f"MySession-{int(time.time())}"
-
-    sts_client = boto3.client(
-        "sts",
-        aws_access_key_id=aws_access_key_id,
-        aws_secret_access_key=aws_secret_access_key,
-    )
-
-    response = sts_client.assume_role(
-        RoleArn=role_arn,
-        RoleSessionName=session_name,
-    )
-
-    credentials = response["Credentials"]
-    os.environ["AWS_ACCESS_KEY_ID"] = credentials["AccessKeyId"]
-    os.environ["AWS_SECRET_ACCESS_KEY"] = credentials["SecretAccessKey"]
-    os.environ["AWS_SESSION_TOKEN"] = credentials["SessionToken"]
-    os.environ["AWS_REGION"] = aws_region
-    os.environ["AWS_ACCOUNT_ID"] = aws_account_id
+    key = (stage, get_iam_role(stage), variables["AWS_ACCESS_KEY_ID_ADMIN"])
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            provider = AssumedRoleCredentialProvider(
+                stage,
+                variables["AWS_ACCESS_KEY_ID_ADMIN"],
+                variables["AWS_SECRET_ACCESS_KEY_ADMIN"],
+            )
+            _providers[key] = provider
+    return provider
+
+
+class AssumedRoleCredentialProvider:
+    """
+    Assumes the admin role of a stage and caches the credentials until shortly
+    before they expire.
+
+    Credentials are cached in memory and in a file shared by every process of the
+    user, so concurrent scripts reuse one set of credentials instead of each
+    calling STS. The file is specific to the admin access key that assumed the
+    role, and a file that cannot be read is ignored.
+    """
+
+    def __init__(
+        self,
+        stage: Literal["dev", "prod"],
+        aws_access_key_id: str,
+        aws_secret_access_key: str,
+        cache_directory: Optional[str] = CREDENTIALS_CACHE_DIRECTORY,
+        duration_seconds: int = DEFAULT_DURATION_SECONDS,
+        refresh_margin_seconds: float = DEFAULT_REFRESH_MARGIN_SECONDS,
+    ) -> None:
+        """
+        Args:
+            stage (Literal["dev", "prod"]): The stage whose admin role is assumed.
+            aws_access_key_id (str): The admin access key ID used to call STS.
+            aws_secret_access_key (str): The admin secret access key used to call STS.
+            cache_directory (Optional[str]): The directory of the shared cache file,
+                or None to cache in memory only.
+            duration_seconds (int): How long assumed credentials are valid.
+            refresh_margin_seconds (float): How long before expiry cached
+                credentials stop being reused.
+        """
+        self.stage = stage
+        self.role = get_iam_role(stage)
+        self.aws_account_id = get_aws_account_id(stage)
+        self.role_arn = f"arn:aws:iam::{self.aws_account_id}:role/{self.role}"
+        self.aws_access_key_id = aws_access_key_id
+        self.aws_secret_access_key = aws_secret_access_key
+        self.cache_directory = cache_directory
+        self.duration_seconds = duration_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._credentials: Optional[Dict[str, str]] = None
+        self._session: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache_path(self) -> Optional[str]:
+        """
+        The path of the shared cache file, or None if disk caching is disabled.
+        """
+        if not self.cache_directory:
+            return None
+        return os.path.join(
+            self.cache_directory,
+            f"{self.stage}-{self.role}-{self.aws_access_key_id}.json",
+        )
+
+    def fetch_credentials(self) -> Dict[str, str]:
+        """
+        Returns credentials that are valid for at least the refresh margin, from the
+        memory cache, the shared cache file or STS, in that order.
+
+        Returns:
+            Dict[str, str]: The ``access_key``, ``secret_key``, ``token`` and
+            ``expiry_time`` of the credentials, as expected by botocore.
+        """
+        with self._lock:
+            return self._fetch()
+
+    def get_session(self) -> Any:
+        """
+        Returns a boto3 session whose credentials refresh automatically.
+
+        The provider is registered first in the credential chain of the session.
+        botocore refreshes the credentials on the first request made within 15
+        minutes of their expiry, and the provider then returns new credentials, since
+        cached ones are only reused while they have longer than the refresh margin
+        left. Idle sessions are therefore not refreshed in the background, but no
+        request is ever signed with credentials about to expire.
+
+        Returns:
+            Any: The boto3 session.
+        """
+        with self._lock:
+            if self._session is None:
+                import boto3
+                import botocore.session
+
+                botocore_session = botocore.session.Session()
+                botocore_session.get_component("credential_provider").insert_before(
+                    "env", _AssumedRoleCredentialSource(self)
+                )
+                self._session = boto3.Session(
+                    botocore_session=botocore_session, region_name=AWS_REGION
+                )
+            return self._session
+
+    def _fetch(self) -> Dict[str, str]:
+        if self._is_fresh(self._credentials):
+            return self._credentials
+        credentials = self._read_cache()
+        if not self._is_fresh(credentials):
+            credentials = self._assume_role()
+            self._write_cache(credentials)
+        self._credentials = credentials
+        return credentials
+
+    def _is_fresh(self, credentials: Optional[Dict[str, str]]) -> bool:
+        if credentials is None:
+            return False
+        margin = timedelta(seconds=self.refresh_margin_seconds)
+        try:
+            expiry_time = datetime.fromisoformat(credentials["expiry_time"])
+            return expiry_time - margin > datetime.now(timezone.utc)
+        except (KeyError, TypeError, ValueError):
+            # A truncated or edited cache file is treated as stale.
+            return False
+
+    def _assume_role(self) -> Dict[str, str]:
+        import boto3
+
+        sts_client = boto3.client(
+            "sts",
+            aws_access_key_id=self.aws_access_key_id,
+            aws_secret_access_key=self.aws_secret_access_key,
+        )
+        response = sts_client.assume_role(
+            RoleArn=self.role_arn,
+            RoleSessionName=f"MySession-{int(time.time())}",
+            DurationSeconds=self.duration_seconds,
+        )
+        credentials = response["Credentials"]
+        logger.info(f"Assumed {self.role_arn} until {credentials['Expiration']}")
+        return {
+            "access_key": credentials["AccessKeyId"],
+            "secret_key": credentials["SecretAccessKey"],
+            "token": credentials["SessionToken"],
+            "expiry_time": credentials["Expiration"].isoformat(),
+        }
+
+    def _read_cache(self) -> Optional[Dict[str, str]]:
+        if self.cache_path is None:
+            return None
+        try:
+            with open(self.cache_path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, credentials: Dict[str, str]) -> None:
+        if self.cache_path is None:
+            return
+        # Written to a private temporary file and renamed, so other processes
+        # never read a partial file.
+        temporary_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_directory, mode=0o700, exist_ok=True)
+            descriptor = os.open(
+                temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+            )
+            with os.fdopen(descriptor, "w") as file:
+                json.dump(credentials, file)
+            os.replace(temporary_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not cache credentials: {e}")
+
+
+class _AssumedRoleCredentialSource:
+    """
+    botocore credential provider backed by an ``AssumedRoleCredentialProvider``.
+    """
+
+    METHOD = "aws-utils-assume-role"
+    CANONICAL_NAME = "AwsUtilsAssumeRole"
+
+    def __init__(self, provider: AssumedRoleCredentialProvider) -> None:
+        self.provider = provider
+
+    def load(self) -> Any:
+        from botocore.credentials import RefreshableCredentials
+
+        return RefreshableCredentials.create_from_metadata(
+            metadata=self.provider.fetch_credentials(),
+            refresh_using=self.provider.fetch_credentials,
+            method=self.METHOD,
+        )
 
 
 def get_iam_role(stage: Literal["dev", "prod"]) -> str:
@@ -1,11 +1,57 @@
-from datetime import datetime
-import pytz
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import json
+import logging
+import os
+import threading
+import time
 import uuid
-from typing import List, Dict, Any
+from zoneinfo import ZoneInfo
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from aws_utils.retry import call_with_retries
 from aws_utils.s3 import S3Handler
 
+logger = logging.getLogger(__name__)
+
+LOG_TIMEZONE = "Europe/London"
+LOG_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+LOG_TIMESTAMP_LENGTH = 19
+SEGMENTS_DIRECTORY = "segments"
+DEFAULT_LOG_WORKERS = 16
+MAX_BATCH_SPAN_SECONDS = 60
+
 
 class LogsHandler:
+    def __init__(
+        self,
+        s3_handler: Optional[S3Handler] = None,
+        max_workers: int = DEFAULT_LOG_WORKERS,
+        writer: Optional["BufferedLogWriter"] = None,
+    ) -> None:
+        """
+        Initializes the LogsHandler.
+
+        Args:
+            s3_handler (Optional[S3Handler]): The S3Handler to use. One is created on
+                first use if not given, and reused for every call.
+            max_workers (int): The maximum number of log objects fetched concurrently.
+            writer (Optional[BufferedLogWriter]): If given, ``log_action`` buffers
+                entries in this writer instead of writing one object per action.
+        """
+        self._s3_handler = s3_handler
+        self.max_workers = max_workers
+        self.writer = writer
+
+    @property
+    def s3_handler(self) -> S3Handler:
+        """
+        The S3Handler shared by every call on this handler.
+        """
+        if self._s3_handler is None:
+            self._s3_handler = S3Handler()
+        return self._s3_handler
+
     def log_action(
         self, bucket_name: str, project_name: str, action: str, user: str
     ) -> None:
@@ -18,9 +64,7 @@ class LogsHandler:
             action (str): A description of the action being logged.
             user (str): The identifier of the user who performed the action.
         """
-        timestamp = datetime.now(pytz.timezone("Europe/London")).strftime(
-            "%Y-%m-%dT%H:%M:%S"
-        )
+        timestamp = datetime.now(ZoneInfo(LOG_TIMEZONE)).strftime(LOG_TIMESTAMP_FORMAT)
         log_entry = {
             "log_id": str(uuid.uuid4()),
             "timestamp": timestamp,
@@ -28,41 +72,382 @@ class LogsHandler:
             "user": user,
         }
 
-        log_file_name = f"logs/{project_name}/{timestamp}.json"
+        if self.writer is not None:
+            self.writer.add(bucket_name, project_name, log_entry)
+            return
+
+        log_file_name = f"logs/{project_name}/{timestamp}_{log_entry['log_id']}.json"
 
-        s3_handler = S3Handler()
-        s3_handler.upload_json_to_s3(
+        self.s3_handler.upload_json_to_s3(
             bucket_name=bucket_name,
             json_key=log_file_name,
             json_data=log_entry,
         )
 
-    def get_logs(self, bucket_name: str, project_name: str) -> List[Dict[str, Any]]:
+    def get_logs(
+        self,
+        bucket_name: str,
+        project_name: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Retrieves logs from an S3 bucket for a specified project.
 
+        Only keys inside the requested time range are listed, using the timestamp
+        in the key names, and log objects are fetched concurrently. Compacted log
+        segments written by ``compact_logs`` are read transparently.
+
         Args:
             bucket_name (str): The name of the S3 bucket from which to retrieve log entries.
             project_name (str): The name of the project whose logs are to be retrieved.
+            start_time (Optional[datetime]): Only return logs at or after this time.
+            end_time (Optional[datetime]): Only return logs at or before this time.
+                Naive datetimes are taken as local time of the host, like
+                ``datetime.now()``.
 
         Returns:
             List[Dict[str, Any]]: A list of log entries for the specified project,
-            where each entry is represented as a dictionary.
+            where each entry is represented as a dictionary, ordered by timestamp.
         """
-        s3_handler = S3Handler()
-        log_prefix = f"logs/{project_name}/"
-        logs = s3_handler.list_objects(bucket_name=bucket_name, prefix=log_prefix)
+        start = _format_timestamp(start_time) if start_time else None
+        end = _format_timestamp(end_time) if end_time else None
+        # Batched log objects are named after their first entry, so look back far
+        # enough to include batches that started before the range.
+        list_start = (
+            _format_timestamp(start_time - timedelta(seconds=MAX_BATCH_SPAN_SECONDS))
+            if start_time
+            else None
+        )
 
-        if not logs:
+        segment_keys = self._list_segment_keys(bucket_name, project_name, start, end)
+        log_keys = [
+            key
+            for key, _ in self._iter_log_keys(
+                bucket_name, project_name, list_start, end
+            )
+        ]
+        if not segment_keys and not log_keys:
             return []
 
         log_data: List[Dict[str, Any]] = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for entries in executor.map(
+                lambda key: self._load_log_object(bucket_name, key),
+                segment_keys + log_keys,
+            ):
+                log_data.extend(
+                    entry
+                    for entry in entries
+                    if (start is None or entry["timestamp"] >= start)
+                    and (end is None or entry["timestamp"] <= end)
+                )
+
+        log_data.sort(key=lambda entry: entry["timestamp"])
+        return log_data
 
-        for log in logs:
-            log_key = log["Key"]
-            log_object = s3_handler.load_json_from_s3(
-                bucket_name=bucket_name, json_key=log_key
+    def compact_logs(
+        self,
+        bucket_name: str,
+        project_name: str,
+        before: Optional[datetime] = None,
+    ) -> int:
+        """
+        Merges individual log objects into one JSON-lines segment per day.
+
+        Each segment is written to ``logs/{project}/segments/{YYYY-MM-DD}.jsonl``,
+        merged with any existing segment for that day, and the merged objects are
+        then deleted. ``get_logs`` reads segments transparently.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket holding the logs.
+            project_name (str): The name of the project whose logs are compacted.
+            before (Optional[datetime]): Only compact logs from days before this time.
+                Defaults to the start of the current day, so today's logs, which are
+                still being written, are left alone. A naive datetime is taken as
+                local time of the host.
+
+        Returns:
+            int: The number of log objects that were compacted.
+        """
+        if before is None:
+            before = datetime.now(ZoneInfo(LOG_TIMEZONE))
+        cutoff = _format_timestamp(before)[:10]
+
+        keys_by_day: Dict[str, List[str]] = {}
+        for key, timestamp in self._iter_log_keys(bucket_name, project_name):
+            if timestamp[:10] >= cutoff:
+                break
+            keys_by_day.setdefault(timestamp[:10], []).append(key)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(
+                executor.map(
+                    lambda item: self._compact_day(
+                        bucket_name, project_name, item[0], item[1]
+                    ),
+                    keys_by_day.items(),
+                )
             )
-            log_data.append(log_object)
+        return sum(len(keys) for keys in keys_by_day.values())
 
-        return log_data
+    def _compact_day(
+        self, bucket_name: str, project_name: str, day: str, log_keys: List[str]
+    ) -> None:
+        segment_key = _segment_key(project_name, day)
+        existing = self.s3_handler.list_objects(bucket_name, segment_key)
+        entries: List[Dict[str, Any]] = []
+        if any(obj["Key"] == segment_key for obj in existing):
+            entries.extend(self._load_log_object(bucket_name, segment_key))
+        for key in log_keys:
+            entries.extend(self._load_log_object(bucket_name, key))
+        entries.sort(key=lambda entry: entry["timestamp"])
+
+        self.s3_handler.upload_stream_to_s3(
+            bucket_name,
+            segment_key,
+            (json.dumps(entry) + "\n" for entry in entries),
+            content_type="application/x-ndjson",
+        )
+        self.s3_handler.delete_objects(bucket_name, log_keys)
+
+    def _iter_log_keys(
+        self,
+        bucket_name: str,
+        project_name: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Iterator[Tuple[str, str]]:
+        log_prefix = f"logs/{project_name}/"
+        list_prefix = log_prefix
+        if start and end:
+            list_prefix += os.path.commonprefix([start, end])
+        start_after = log_prefix + start if start else None
+
+        for log in self.s3_handler.iter_objects(
+            bucket_name, list_prefix, start_after=start_after
+        ):
+            name = log["Key"][len(log_prefix) :]
+            if name.startswith(f"{SEGMENTS_DIRECTORY}/"):
+                continue
+            timestamp = name[:LOG_TIMESTAMP_LENGTH]
+            if end is not None and timestamp > end:
+                break
+            yield log["Key"], timestamp
+
+    def _list_segment_keys(
+        self,
+        bucket_name: str,
+        project_name: str,
+        start: Optional[str],
+        end: Optional[str],
+    ) -> List[str]:
+        segment_prefix = _segments_prefix(project_name)
+        segment_keys = []
+        for segment in self.s3_handler.iter_objects(bucket_name, segment_prefix):
+            day = segment["Key"][len(segment_prefix) :][:10]
+            if (start is None or day >= start[:10]) and (
+                end is None or day <= end[:10]
+            ):
+                segment_keys.append(segment["Key"])
+        return segment_keys
+
+    def _load_log_object(self, bucket_name: str, key: str) -> List[Dict[str, Any]]:
+        if key.endswith(".jsonl"):
+            return list(self.s3_handler.iter_jsonl_records(bucket_name, key))
+        return [
+            self.s3_handler.load_json_from_s3(bucket_name=bucket_name, json_key=key)
+        ]
+
+
+class BufferedLogWriter:
+    """
+    Buffers log entries in memory and writes them to S3 in batches.
+
+    Each batch is written as one JSON-lines object named
+    ``logs/{project}/{first timestamp}_{uuid}.jsonl``, which ``LogsHandler.get_logs``
+    reads like any other log object. A buffer is flushed when it reaches
+    ``max_entries`` entries or ``max_bytes`` bytes, or when its oldest entry is
+    ``max_age_seconds`` old. Flushes run on a background thread, failed writes are
+    retried with backoff, and any remaining entries are flushed at interpreter exit.
+
+    ``get_logs`` finds a batch by its first timestamp, looking back at most
+    ``MAX_BATCH_SPAN_SECONDS`` before the requested range, so a batch never spans
+    more than ``max_age_seconds``. If the background thread is late, eg. behind a
+    slow or retried write, an entry added to an expired buffer starts a new batch.
+    """
+
+    def __init__(
+        self,
+        s3_handler: Optional[S3Handler] = None,
+        max_entries: int = 500,
+        max_bytes: int = 1024 * 1024,
+        max_age_seconds: float = 5.0,
+        max_attempts: int = 5,
+    ) -> None:
+        """
+        Args:
+            s3_handler (Optional[S3Handler]): The S3Handler to write with.
+            max_entries (int): The number of buffered entries that triggers a flush.
+            max_bytes (int): The serialized size of a buffer that triggers a flush.
+            max_age_seconds (float): The age of the oldest buffered entry that
+                triggers a flush.
+            max_attempts (int): The number of attempts to write a batch before it is
+                dropped and the error logged.
+
+        Raises:
+            ValueError: If ``max_age_seconds`` exceeds the batch span ``get_logs``
+                looks back over.
+        """
+        if max_age_seconds > MAX_BATCH_SPAN_SECONDS:
+            raise ValueError(
+                f"max_age_seconds must be at most {MAX_BATCH_SPAN_SECONDS} seconds"
+            )
+        self._s3_handler = s3_handler
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.max_attempts = max_attempts
+
+        self._buffers: Dict[Tuple[str, str], List[str]] = {}
+        self._sizes: Dict[Tuple[str, str], int] = {}
+        self._first_added: Dict[Tuple[str, str], float] = {}
+        self._sealed: List[Tuple[Tuple[str, str], List[str]]] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def s3_handler(self) -> S3Handler:
+        """
+        The S3Handler used to write batches, created on first use.
+        """
+        if self._s3_handler is None:
+            self._s3_handler = S3Handler()
+        return self._s3_handler
+
+    def add(
+        self, bucket_name: str, project_name: str, log_entry: Dict[str, Any]
+    ) -> None:
+        """
+        Adds a log entry to the buffer of its bucket and project.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket the entry is written to.
+            project_name (str): The name of the project the entry belongs to.
+            log_entry (Dict[str, Any]): The log entry, with a ``timestamp`` field
+                of the current time.
+        """
+        line = json.dumps(log_entry) + "\n"
+        key = (bucket_name, project_name)
+        with self._condition:
+            if self._closed:
+                raise ValueError("BufferedLogWriter is closed")
+            if (
+                key in self._buffers
+                and time.monotonic() - self._first_added[key] >= self.max_age_seconds
+            ):
+                self._sealed.append((key, self._pop_buffer(key)))
+                self._condition.notify()
+            buffer = self._buffers.setdefault(key, [])
+            if not buffer:
+                self._first_added[key] = time.monotonic()
+            buffer.append(line)
+            self._sizes[key] = self._sizes.get(key, 0) + len(line)
+            if len(buffer) >= self.max_entries or self._sizes[key] >= self.max_bytes:
+                self._condition.notify()
+
+    def flush(self) -> None:
+        """
+        Writes every buffered entry to S3 immediately.
+        """
+        with self._condition:
+            batches = self._take_batches(force=True)
+        self._write_batches(batches)
+
+    def close(self) -> None:
+        """
+        Flushes every buffered entry and stops the background thread.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if self._closed:
+                    return
+                self._condition.wait(timeout=self._next_deadline())
+                batches = self._take_batches(force=False)
+            self._write_batches(batches)
+
+    def _next_deadline(self) -> float:
+        if self._sealed:
+            return 0.0
+        if not self._first_added:
+            return self.max_age_seconds
+        if any(
+            len(buffer) >= self.max_entries or self._sizes[key] >= self.max_bytes
+            for key, buffer in self._buffers.items()
+        ):
+            return 0.0
+        oldest = min(self._first_added.values())
+        return max(0.0, oldest + self.max_age_seconds - time.monotonic())
+
+    def _take_batches(self, force: bool) -> List[Tuple[Tuple[str, str], List[str]]]:
+        now = time.monotonic()
+        batches, self._sealed = self._sealed, []
+        for key in list(self._buffers):
+            buffer = self._buffers[key]
+            if (
+                force
+                or len(buffer) >= self.max_entries
+                or self._sizes[key] >= self.max_bytes
+                or now - self._first_added[key] >= self.max_age_seconds
+            ):
+                batches.append((key, self._pop_buffer(key)))
+        return batches
+
+    def _pop_buffer(self, key: Tuple[str, str]) -> List[str]:
+        del self._sizes[key]
+        del self._first_added[key]
+        return self._buffers.pop(key)
+
+    def _write_batches(self, batches: List[Tuple[Tuple[str, str], List[str]]]) -> None:
+        for (bucket_name, project_name), lines in batches:
+            timestamp = json.loads(lines[0])["timestamp"]
+            object_key = f"logs/{project_name}/{timestamp}_{uuid.uuid4()}.jsonl"
+            body = "".join(lines).encode("utf-8")
+            try:
+                call_with_retries(
+                    lambda: self.s3_handler.upload_generic_file_to_s3(
+                        bucket_name, object_key, body
+                    ),
+                    max_attempts=self.max_attempts,
+                )
+            except Exception as e:
+                logger.error(
+                    f"Dropped {len(lines)} log entries for {project_name}: {e}"
+                )
+
+
+def _format_timestamp(value: datetime) -> str:
+    # Naive datetimes are taken as local time of the host, as by
+    # ``datetime.astimezone``, and converted to the timezone of the log keys.
+    return value.astimezone(ZoneInfo(LOG_TIMEZONE)).strftime(LOG_TIMESTAMP_FORMAT)
+
+
+def _segments_prefix(project_name: str) -> str:
+    return f"logs/{project_name}/{SEGMENTS_DIRECTORY}/"
+
+
+def _segment_key(project_name: str, day: str) -> str:
+    return f"{_segments_prefix(project_name)}{day}.jsonl"
@@ -0,0 +1,237 @@
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+PARQUET_MAGIC = b"PAR1"
+FOOTER_READ_SIZE = 64 * 1024
+
+# Field ids of the Parquet FileMetaData thrift struct.
+FILE_METADATA_SCHEMA = 2
+FILE_METADATA_NUM_ROWS = 3
+FILE_METADATA_ROW_GROUPS = 4
+
+_STOP = 0
+_BOOLEAN_TRUE = 1
+_BOOLEAN_FALSE = 2
+_BYTE = 3
+_I16 = 4
+_I32 = 5
+_I64 = 6
+_DOUBLE = 7
+_BINARY = 8
+_LIST = 9
+_SET = 10
+_MAP = 11
+_STRUCT = 12
+
+
+class _CompactReader:
+    """
+    Minimal decoder for the Thrift compact protocol used by Parquet footers.
+
+    Structs are decoded into dictionaries keyed by thrift field id, which is
+    enough to read row counts and column chunk locations without a dependency
+    on a Parquet library.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.position = 0
+
+    def read_struct(self) -> Dict[int, Any]:
+        fields: Dict[int, Any] = {}
+        field_id = 0
+        while True:
+            header = self._read_byte()
+            field_type = header & 0x0F
+            if field_type == _STOP:
+                return fields
+            delta = header >> 4
+            field_id = field_id + delta if delta else self._read_zigzag()
+            fields[field_id] = self._read_value(field_type)
+
+    def _read_value(self, value_type: int) -> Any:
+        if value_type == _BOOLEAN_TRUE:
+            return True
+        if value_type == _BOOLEAN_FALSE:
+            return False
+        if value_type == _BYTE:
+            return struct.unpack("b", bytes([self._read_byte()]))[0]
+        if value_type in (_I16, _I32, _I64):
+            return self._read_zigzag()
+        if value_type == _DOUBLE:
+            value = struct.unpack_from("<d", self.data, self.position)[0]
+            self.position += 8
+            return value
+        if value_type == _BINARY:
+            length = self._read_varint()
+            value = self.data[self.position : self.position + length]
+            self.position += length
+            return value
+        if value_type in (_LIST, _SET):
+            header = self._read_byte()
+            size = header >> 4
+            if size == 15:
+                size = self._read_varint()
+            return [self._read_element(header & 0x0F) for _ in range(size)]
+        if value_type == _MAP:
+            size = self._read_varint()
+            if size == 0:
+                return {}
+            types = self._read_byte()
+            return {
+                self._read_element(types >> 4): self._read_element(types & 0x0F)
+                for _ in range(size)
+            }
+        if value_type == _STRUCT:
+            return self.read_struct()
+        raise ValueError(f"Unsupported thrift compact type: {value_type}")
+
+    def _read_element(self, element_type: int) -> Any:
+        if element_type in (_BOOLEAN_TRUE, _BOOLEAN_FALSE):
+            return self._read_byte() == _BOOLEAN_TRUE
+        return self._read_value(element_type)
+
+    def _read_byte(self) -> int:
+        value = self.data[self.position]
+        self.position += 1
+        return value
+
+    def _read_varint(self) -> int:
+        result = 0
+        shift = 0
+        while True:
+            byte = self._read_byte()
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return result
+            shift += 7
+
+    def _read_zigzag(self) -> int:
+        value = self._read_varint()
+        return (value >> 1) ^ -(value & 1)
+
+
+def parse_file_metadata(footer: bytes) -> Dict[int, Any]:
+    """
+    Decodes a serialized Parquet FileMetaData struct.
+
+    Args:
+        footer (bytes): The thrift-encoded footer, without the length and magic bytes.
+
+    Returns:
+        Dict[int, Any]: The decoded struct, keyed by thrift field id.
+    """
+    return _CompactReader(footer).read_struct()
+
+
+def read_parquet_footer(
+    s3_client: Any, bucket_name: str, object_key: str
+) -> Tuple[Dict[int, Any], int]:
+    """
+    Reads the footer of a Parquet file in S3 with ranged GETs, never the full object.
+
+    Args:
+        s3_client: The boto3 S3 client.
+        bucket_name (str): The name of the S3 bucket.
+        object_key (str): The key of the Parquet file.
+
+    Returns:
+        Tuple[Dict[int, Any], int]: The decoded FileMetaData and the size of the file.
+
+    Raises:
+        ValueError: If the object is not a Parquet file.
+    """
+    tail, file_size, _ = read_parquet_tail(s3_client, bucket_name, object_key)
+    footer_length = int.from_bytes(tail[-8:-4], "little")
+    footer = tail[len(tail) - footer_length - 8 : -8]
+    return parse_file_metadata(footer), file_size
+
+
+def read_parquet_tail(
+    s3_client: Any, bucket_name: str, object_key: str
+) -> Tuple[bytes, int, Optional[str]]:
+    """
+    Reads the end of a Parquet file in S3, up to and including its whole footer.
+
+    The last 64 KiB are fetched with a suffix range, which covers the footer of most
+    files in a single request and also reveals the object size.
+
+    Args:
+        s3_client: The boto3 S3 client.
+        bucket_name (str): The name of the S3 bucket.
+        object_key (str): The key of the Parquet file.
+
+    Returns:
+        Tuple[bytes, int, Optional[str]]: The last bytes of the file, the size of
+        the file and its ETag.
+
+    Raises:
+        ValueError: If the object is not a Parquet file.
+    """
+    response = s3_client.get_object(
+        Bucket=bucket_name, Key=object_key, Range=f"bytes=-{FOOTER_READ_SIZE}"
+    )
+    tail = response["Body"].read()
+    etag = response.get("ETag")
+    content_range = response.get("ContentRange")
+    file_size = int(content_range.rsplit("/", 1)[1]) if content_range else len(tail)
+
+    if len(tail) < 8 or tail[-4:] != PARQUET_MAGIC:
+        raise ValueError(f"{object_key} is not a Parquet file")
+
+    footer_length = int.from_bytes(tail[-8:-4], "little")
+    if footer_length + 8 > len(tail):
+        start = file_size - footer_length - 8
+        kwargs: Dict[str, Any] = {
+            "Bucket": bucket_name,
+            "Key": object_key,
+            "Range": f"bytes={start}-{file_size - len(tail) - 1}",
+        }
+        if etag:
+            kwargs["IfMatch"] = etag
+        tail = s3_client.get_object(**kwargs)["Body"].read() + tail
+    return tail, file_size, etag
+
+
+def get_parquet_num_rows(s3_client: Any, bucket_name: str, object_key: str) -> int:
+    """
+    Returns the number of rows in a Parquet file in S3 by reading only its footer.
+
+    Args:
+        s3_client: The boto3 S3 client.
+        bucket_name (str): The name of the S3 bucket.
+        object_key (str): The key of the Parquet file.
+
+    Returns:
+        int: The number of rows in the file.
+    """
+    metadata, _ = read_parquet_footer(s3_client, bucket_name, object_key)
+    return metadata.get(FILE_METADATA_NUM_ROWS, 0)
+
+
+def is_data_file(object_key: str) -> bool:
+    """
+    Whether an S3 key is a data file, as opposed to a directory marker or a hidden
+    file such as ``_SUCCESS`` that Athena and Glue ignore.
+
+    Args:
+        object_key (str): The S3 object key.
+
+    Returns:
+        bool: True if the key is a data file.
+    """
+    file_name = object_key.rsplit("/", 1)[-1]
+    return bool(file_name) and not file_name.startswith(("_", "."))
+
+
+def list_data_files(objects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Filters S3 object summaries down to non-empty data files.
+
+    Args:
+        objects (List[Dict[str, Any]]): The object summaries from a listing.
+
+    Returns:
+        List[Dict[str, Any]]: The summaries of the data files.
+    """
+    return [obj for obj in objects if obj["Size"] > 0 and is_data_file(obj["Key"])]
@@ -0,0 +1,369 @@
+import importlib.util
+import io
+import threading
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from aws_utils.parquet import read_parquet_tail
+from aws_utils.s3_transfer import S3TransferManager
+
+# Column chunks separated by less than this are fetched with a single request.
+COALESCE_GAP_SIZE = 1024 * 1024
+FILTER_OPERATORS = ("==", "=", "!=", "<", "<=", ">", ">=", "in", "not in")
+
+# A (column, operator, value) condition. A list of conditions must all hold.
+ParquetFilter = Tuple[str, str, Any]
+
+
+def _import_pyarrow() -> Tuple[Any, Any]:
+    # pyarrow is optional and slow to import, so it is only imported on first use.
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Reading and writing Parquet tables requires pyarrow, "
+            "install it with `pip install aws-utils[parquet]`"
+        ) from e
+    return pyarrow, pyarrow.parquet
+
+
+class S3ParquetFile(io.RawIOBase):
+    """
+    Read-only, seekable file over a Parquet object in S3, for use with pyarrow.
+
+    The footer is read with a single suffix range when the file is opened, and the
+    column chunks to be decoded are fetched up front by ``prefetch`` with concurrent,
+    coalesced ranged GETs. Reads outside the fetched ranges fall back to a ranged
+    GET of their own. Every request is pinned to the ETag of the first one, so a
+    concurrent overwrite cannot produce a torn read.
+    """
+
+    def __init__(
+        self, transfer: S3TransferManager, bucket_name: str, object_key: str
+    ) -> None:
+        """
+        Args:
+            transfer (S3TransferManager): The transfer manager used for ranged GETs.
+            bucket_name (str): The name of the S3 bucket.
+            object_key (str): The key of the Parquet file.
+
+        Raises:
+            ValueError: If the object is not a Parquet file.
+        """
+        super().__init__()
+        self.transfer = transfer
+        self.bucket_name = bucket_name
+        self.object_key = object_key
+        tail, self.size, self.etag = read_parquet_tail(
+            transfer.s3_client, bucket_name, object_key
+        )
+        self._starts: List[int] = [self.size - len(tail)]
+        self._blocks: List[bytes] = [tail]
+        self._position = 0
+        self._lock = threading.Lock()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._position = max(0, offset)
+        return self._position
+
+    def prefetch(self, ranges: Iterable[Tuple[int, int]]) -> None:
+        """
+        Fetches byte ranges concurrently, merging ranges that are close together.
+
+        Args:
+            ranges (Iterable[Tuple[int, int]]): The start and exclusive end of each
+                range to fetch.
+        """
+        merged: List[List[int]] = []
+        for start, end in sorted(ranges):
+            if merged and start - merged[-1][1] <= COALESCE_GAP_SIZE:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        # Large ranges are split into parts, so they are also fetched in parallel.
+        part_size = self.transfer.part_size
+        parts = [
+            (offset, min(offset + part_size, end))
+            for start, end in merged
+            for offset in range(start, end, part_size)
+        ]
+        with ThreadPoolExecutor(max_workers=self.transfer.max_concurrency) as executor:
+            blocks = executor.map(lambda part: self._get_range(*part), parts)
+            for (start, _), block in zip(parts, blocks):
+                self._add_block(start, block)
+
+    def read(self, size: int = -1) -> bytes:
+        with self._lock:
+            if size is None or size < 0:
+                size = self.size - self._position
+            end = min(self._position + size, self.size)
+            pieces = []
+            while self._position < end:
+                piece = self._read_cached(self._position, end)
+                if piece is None:
+                    piece = self._get_range(self._position, end)
+                    self._add_block(self._position, piece)
+                pieces.append(piece)
+                self._position += len(piece)
+            return b"".join(pieces)
+
+    def readinto(self, buffer: Any) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def _read_cached(self, start: int, end: int) -> Optional[bytes]:
+        index = bisect_right(self._starts, start) - 1
+        if index < 0:
+            return None
+        block_start = self._starts[index]
+        block = self._blocks[index]
+        if start >= block_start + len(block):
+            return None
+        return block[start - block_start : end - block_start]
+
+    def _add_block(self, start: int, block: bytes) -> None:
+        index = bisect_right(self._starts, start)
+        self._starts.insert(index, start)
+        self._blocks.insert(index, block)
+
+    def _get_range(self, start: int, end: int) -> bytes:
+        return self.transfer.get_range(
+            self.bucket_name, self.object_key, start, end - 1, self.etag
+        )
+
+
+class ParquetS3Writer:
+    """
+    Writes a Parquet file to S3 one row group at a time.
+
+    Each written table or batch is encoded as it arrives and streamed into a
+    multipart upload, so memory use is bounded by a row group and the upload
+    buffers rather than by the size of the file. The upload is aborted if the
+    writer is left because of an exception.
+    """
+
+    def __init__(
+        self,
+        transfer: S3TransferManager,
+        bucket_name: str,
+        object_key: str,
+        schema: Any,
+        **writer_options: Any,
+    ) -> None:
+        """
+        Args:
+            transfer (S3TransferManager): The transfer manager used for the upload.
+            bucket_name (str): The name of the S3 bucket.
+            object_key (str): The key of the Parquet file.
+            schema (pyarrow.Schema): The schema of the file.
+            **writer_options: Further arguments of ``pyarrow.parquet.ParquetWriter``,
+                eg. ``compression``.
+        """
+        _, pq = _import_pyarrow()
+        self._sink = transfer.open_writer(
+            bucket_name, object_key, ContentType="application/octet-stream"
+        )
+        self._writer = pq.ParquetWriter(self._sink, schema, **writer_options)
+
+    def __enter__(self) -> "ParquetS3Writer":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, data: Any, row_group_size: Optional[int] = None) -> None:
+        """
+        Writes a table or record batch as one or more row groups.
+
+        Args:
+            data (Union[pyarrow.Table, pyarrow.RecordBatch]): The rows to write.
+            row_group_size (Optional[int]): The maximum number of rows per row group.
+        """
+        self._writer.write(data, row_group_size=row_group_size)
+
+    def close(self) -> None:
+        """
+        Writes the footer and completes the upload.
+        """
+        self._writer.close()
+        self._sink.close()
+
+    def abort(self) -> None:
+        """
+        Aborts the upload and discards any data written so far.
+        """
+        try:
+            self._writer.close()
+        finally:
+            self._sink.abort()
+
+
+def read_parquet_table(
+    transfer: S3TransferManager,
+    bucket_name: str,
+    object_key: str,
+    columns: Optional[Sequence[str]] = None,
+    row_groups: Optional[Sequence[int]] = None,
+    filters: Optional[List[ParquetFilter]] = None,
+) -> Any:
+    """
+    Reads selected columns and row groups of a Parquet file in S3 as an Arrow table.
+
+    Only the footer and the column chunks that are decoded are downloaded. Row
+    groups whose statistics show that no row can match the filters are skipped
+    entirely, and the remaining rows are then filtered exactly.
+
+    Args:
+        transfer (S3TransferManager): The transfer manager used for ranged GETs.
+        bucket_name (str): The name of the S3 bucket.
+        object_key (str): The key of the Parquet file.
+        columns (Optional[Sequence[str]]): The top-level columns to read. Defaults to
+            every column.
+        row_groups (Optional[Sequence[int]]): The row groups to read. Defaults to
+            every row group.
+        filters (Optional[List[ParquetFilter]]): Conditions such as
+            ``("year", ">=", 2024)`` that every returned row satisfies.
+
+    Returns:
+        pyarrow.Table: The selected rows and columns.
+
+    Raises:
+        ValueError: If a filter uses an unsupported operator.
+    """
+    _, pq = _import_pyarrow()
+    filters = filters or []
+    for _, operator, _ in filters:
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {operator}")
+
+    source = S3ParquetFile(transfer, bucket_name, object_key)
+    parquet_file = pq.ParquetFile(source)
+    metadata = parquet_file.metadata
+    if row_groups is None:
+        row_groups = range(metadata.num_row_groups)
+    if filters:
+        column_indexes = {
+            metadata.schema.column(i).path: i for i in range(metadata.num_columns)
+        }
+        row_groups = [
+            i
+            for i in row_groups
+            if _row_group_may_match(metadata.row_group(i), column_indexes, filters)
+        ]
+
+    read_columns = None
+    if columns is not None:
+        read_columns = list(dict.fromkeys([*columns, *(f[0] for f in filters)]))
+    source.prefetch(_column_chunk_ranges(metadata, row_groups, read_columns))
+
+    table = parquet_file.read_row_groups(list(row_groups), columns=read_columns)
+    if filters:
+        table = table.filter(pq.filters_to_expression(filters))
+    if columns is not None:
+        table = table.select(list(columns))
+    return table
+
+
+def read_parquet_columns(
+    transfer: S3TransferManager,
+    bucket_name: str,
+    object_key: str,
+    columns: Optional[Sequence[str]] = None,
+    row_groups: Optional[Sequence[int]] = None,
+    filters: Optional[List[ParquetFilter]] = None,
+) -> Dict[str, Any]:
+    """
+    Reads selected columns of a Parquet file in S3 as NumPy arrays. Requires NumPy.
+
+    Args:
+        transfer (S3TransferManager): The transfer manager used for ranged GETs.
+        bucket_name (str): The name of the S3 bucket.
+        object_key (str): The key of the Parquet file.
+        columns (Optional[Sequence[str]]): See ``read_parquet_table``.
+        row_groups (Optional[Sequence[int]]): See ``read_parquet_table``.
+        filters (Optional[List[ParquetFilter]]): See ``read_parquet_table``.
+
+    Returns:
+        Dict[str, numpy.ndarray]: The values of each column.
+    """
+    if importlib.util.find_spec("numpy") is None:
+        raise ImportError(
+            "Reading Parquet columns as arrays requires numpy, "
+            "install it with `pip install aws-utils[parquet]`"
+        )
+    table = read_parquet_table(
+        transfer, bucket_name, object_key, columns, row_groups, filters
+    )
+    return {name: table.column(name).to_numpy() for name in table.column_names}
+
+
+def _column_chunk_ranges(
+    metadata: Any, row_groups: Iterable[int], columns: Optional[List[str]]
+) -> List[Tuple[int, int]]:
+    ranges = []
+    for i in row_groups:
+        row_group = metadata.row_group(i)
+        for j in range(row_group.num_columns):
+            chunk = row_group.column(j)
+            if (
+                columns is not None
+                and chunk.path_in_schema.split(".")[0] not in columns
+            ):
+                continue
+            start = chunk.data_page_offset
+            if chunk.has_dictionary_page and chunk.dictionary_page_offset:
+                start = min(start, chunk.dictionary_page_offset)
+            ranges.append((start, start + chunk.total_compressed_size))
+    return ranges
+
+
+def _row_group_may_match(
+    row_group: Any, column_indexes: Dict[str, int], filters: List[ParquetFilter]
+) -> bool:
+    for column, operator, value in filters:
+        index = column_indexes.get(column)
+        if index is None:
+            continue
+        statistics = row_group.column(index).statistics
+        if statistics is None or not statistics.has_min_max:
+            continue
+        low, high = statistics.min, statistics.max
+        try:
+            if operator in ("==", "="):
+                may_match = low <= value <= high
+            elif operator == "in":
+                may_match = any(low <= item <= high for item in value)
+            elif operator == "<":
+                may_match = low < value
+            elif operator == "<=":
+                may_match = low <= value
+            elif operator == ">":
+                may_match = high > value
+            elif operator == ">=":
+                may_match = high >= value
+            else:
+                may_match = True
+        except TypeError:
+            # Statistics that cannot be compared with the value never prune.
+            may_match = True
+        if not may_match:
+            return False
+    return True
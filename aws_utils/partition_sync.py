@@ -0,0 +1,290 @@
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+from aws_utils.glue import DEFAULT_GLUE_WORKERS, MAX_PARTITION_SEGMENTS, GlueHandler
+from aws_utils.partitions import PartitionReader
+from aws_utils.s3 import DEFAULT_LIST_WORKERS
+
+logger = logging.getLogger(__name__)
+
+INTEGER_TYPES = {"tinyint", "smallint", "int", "integer", "bigint"}
+
+PartitionValues = Tuple[str, ...]
+
+
+class PartitionSync:
+    """
+    Reconciles the partitions of a Glue table with the partition prefixes in S3,
+    replacing ``MSCK REPAIR TABLE`` and per-file ``add_partition_to_glue`` calls.
+
+    S3 is listed level by level with concurrent delimiter listings, and the catalog
+    is read with parallel segment scans, so neither side is read object by object.
+    Partitions found in S3 but not in the catalog are missing, and partitions in
+    the catalog without a prefix in S3 are stale.
+
+    With a checkpoint file, later runs only reconcile partitions whose leading key
+    is at least the largest value seen by the last successful run, which suits
+    tables that grow by date. A run with ``full=True`` reconciles the whole table.
+
+    Partitions whose leading value does not fit the type of the leading key, such
+    as Hive's ``__HIVE_DEFAULT_PARTITION__`` for nulls in an integer key, can be
+    neither compared with the checkpoint nor added, so they are only reported.
+    """
+
+    def __init__(
+        self,
+        bucket_name: str,
+        database_name: str,
+        table_name: str,
+        glue_handler: Optional[GlueHandler] = None,
+        checkpoint_path: Optional[str] = None,
+        max_workers: int = DEFAULT_LIST_WORKERS,
+        segments: int = MAX_PARTITION_SEGMENTS,
+    ) -> None:
+        """
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            database_name (str): The name of the Glue database.
+            table_name (str): The name of the Glue table.
+            glue_handler (Optional[GlueHandler]): The GlueHandler used for the catalog.
+            checkpoint_path (Optional[str]): The path of the checkpoint file, or None
+                to reconcile the whole table on every run.
+            max_workers (int): The maximum number of concurrent S3 requests.
+            segments (int): The number of catalog segments scanned in parallel.
+        """
+        self.bucket_name = bucket_name
+        self.database_name = database_name
+        self.table_name = table_name
+        self.glue_handler = glue_handler or GlueHandler()
+        self.checkpoint_path = checkpoint_path
+        self.max_workers = max_workers
+        self.segments = segments
+
+    @property
+    def partition_keys(self) -> List[Dict[str, Any]]:
+        """
+        The partition keys of the table, with their names and types.
+        """
+        table = self.glue_handler.get_table(self.database_name, self.table_name)
+        return table.get("PartitionKeys", [])
+
+    def diff(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Compares the partitions in S3 with those in the catalog.
+
+        Args:
+            full (bool): Whether to compare the whole table, ignoring the checkpoint.
+
+        Returns:
+            Dict[str, Any]: A dictionary with the keys:
+                - missing: The values of each partition in S3 but not in the catalog.
+                - stale: The values of each partition in the catalog but not in S3.
+                - invalid: The values of each partition in S3 whose leading value
+                  does not fit the type of the leading key.
+                - high_water_mark: The largest leading partition value in S3.
+        """
+        keys = self.partition_keys
+        if not keys:
+            raise ValueError(
+                f"{self.database_name}.{self.table_name} is not partitioned"
+            )
+        leading_key = keys[0]
+        names = [key["Name"] for key in keys]
+        lower_bound = None if full else self._read_checkpoint(names)
+        if lower_bound is not None and _parse_value(leading_key, lower_bound) is None:
+            lower_bound = None
+
+        s3_partitions = self._list_s3_partitions(leading_key, names, lower_bound)
+        invalid = {
+            values
+            for values in s3_partitions
+            if _parse_value(leading_key, values[0]) is None
+        }
+        valid = s3_partitions - invalid
+        glue_partitions = self.glue_handler.get_partition_values(
+            self.database_name,
+            self.table_name,
+            expression=self._build_expression(leading_key, lower_bound),
+            segments=self.segments,
+        )
+        leading_values = [values[0] for values in valid]
+        return {
+            "missing": [list(values) for values in sorted(valid - glue_partitions)],
+            "stale": [
+                list(values) for values in sorted(glue_partitions - s3_partitions)
+            ],
+            "invalid": [list(values) for values in sorted(invalid)],
+            "high_water_mark": (
+                max(leading_values, key=lambda value: _parse_value(leading_key, value))
+                if leading_values
+                else lower_bound
+            ),
+        }
+
+    def reconcile(
+        self,
+        delete_stale: bool = True,
+        dry_run: bool = False,
+        full: bool = False,
+        max_workers: int = DEFAULT_GLUE_WORKERS,
+    ) -> Dict[str, Any]:
+        """
+        Adds missing partitions to the catalog and deletes stale ones, in batches.
+
+        Missing partitions are created even if the handler already knows them, since
+        they may have been deleted from the catalog by another process. The checkpoint
+        is only advanced when every missing partition was created and every change
+        succeeded, so the others are retried by the next run.
+
+        Args:
+            delete_stale (bool): Whether to delete stale partitions from the catalog.
+            dry_run (bool): Whether to only report the differences.
+            full (bool): Whether to reconcile the whole table, ignoring the checkpoint.
+            max_workers (int): The maximum number of concurrent catalog requests.
+
+        Returns:
+            Dict[str, Any]: The ``missing``, ``stale`` and ``invalid`` partitions as
+            returned by ``diff``, the ``created``, ``deleted`` and ``failed``
+            partitions, and the ``unresolved`` missing partitions that were not
+            created.
+        """
+        difference = self.diff(full=full)
+        result: Dict[str, Any] = {
+            "missing": difference["missing"],
+            "stale": difference["stale"],
+            "invalid": difference["invalid"],
+            "created": [],
+            "deleted": [],
+            "failed": [],
+            "unresolved": [],
+        }
+        if dry_run:
+            return result
+
+        names = [key["Name"] for key in self.partition_keys]
+        if difference["missing"]:
+            added = self.glue_handler.add_partitions_to_glue(
+                self.database_name,
+                self.table_name,
+                self.bucket_name,
+                [dict(zip(names, values)) for values in difference["missing"]],
+                max_workers=max_workers,
+                skip_known=False,
+            )
+            result["created"] = added["created"]
+            result["failed"].extend(added["failed"])
+            created = {tuple(values) for values in added["created"]}
+            result["unresolved"] = [
+                values
+                for values in difference["missing"]
+                if tuple(values) not in created
+            ]
+        if delete_stale and difference["stale"]:
+            deleted = self.glue_handler.delete_partitions_from_glue(
+                self.database_name,
+                self.table_name,
+                difference["stale"],
+                max_workers=max_workers,
+            )
+            result["deleted"] = deleted["deleted"]
+            result["failed"].extend(deleted["failed"])
+
+        logger.info(
+            f"Reconciled {self.database_name}.{self.table_name}: "
+            f"{len(result['created'])} created, {len(result['deleted'])} deleted, "
+            f"{len(result['failed'])} failed, {len(result['unresolved'])} unresolved"
+        )
+        if (
+            not result["failed"]
+            and not result["unresolved"]
+            and difference["high_water_mark"] is not None
+        ):
+            self._write_checkpoint(names, difference["high_water_mark"])
+        return result
+
+    def _list_s3_partitions(
+        self,
+        leading_key: Dict[str, Any],
+        names: List[str],
+        lower_bound: Optional[str],
+    ) -> Set[PartitionValues]:
+        reader = PartitionReader(
+            self.bucket_name,
+            self.database_name,
+            self.table_name,
+            names,
+            s3_handler=self.glue_handler.s3_handler,
+            max_workers=self.max_workers,
+        )
+        leading_name = leading_key["Name"]
+        bound = None if lower_bound is None else _parse_value(leading_key, lower_bound)
+
+        def within_bound(values: Dict[str, str]) -> bool:
+            if leading_name not in values:
+                return True
+            # Values that cannot be compared are kept, so that they are reported.
+            value = _parse_value(leading_key, values[leading_name])
+            return value is None or value >= bound
+
+        partitions = reader.list_partitions(
+            None if lower_bound is None else within_bound
+        )
+        return {tuple(values[name] for name in names) for values, _ in partitions}
+
+    def _build_expression(
+        self, leading_key: Dict[str, Any], lower_bound: Optional[str]
+    ) -> Optional[str]:
+        if lower_bound is None:
+            return None
+        if leading_key.get("Type", "string").lower() in INTEGER_TYPES:
+            return f"{leading_key['Name']} >= {int(lower_bound)}"
+        escaped = lower_bound.replace("'", "''")
+        return f"{leading_key['Name']} >= '{escaped}'"
+
+    def _read_checkpoint(self, names: List[str]) -> Optional[str]:
+        if self.checkpoint_path is None:
+            return None
+        try:
+            with open(self.checkpoint_path) as file:
+                checkpoint = json.load(file)
+        except (OSError, ValueError):
+            return None
+        # A checkpoint of another table or an older layout is ignored.
+        if (
+            checkpoint.get("database") != self.database_name
+            or checkpoint.get("table") != self.table_name
+            or checkpoint.get("partition_keys") != names
+        ):
+            return None
+        return checkpoint.get("high_water_mark")
+
+    def _write_checkpoint(self, names: List[str], high_water_mark: str) -> None:
+        if self.checkpoint_path is None:
+            return
+        checkpoint = {
+            "database": self.database_name,
+            "table": self.table_name,
+            "partition_keys": names,
+            "high_water_mark": high_water_mark,
+            "synced_at": datetime.now(timezone.utc).isoformat(),
+        }
+        # Written to a temporary file and renamed, so an interrupted run never
+        # leaves a partial checkpoint.
+        temporary_path = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(temporary_path, "w") as file:
+            json.dump(checkpoint, file)
+        os.replace(temporary_path, self.checkpoint_path)
+
+
+def _parse_value(key: Dict[str, Any], value: str) -> Optional[Any]:
+    if key.get("Type", "string").lower() not in INTEGER_TYPES:
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return None
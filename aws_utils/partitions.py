@@ -0,0 +1,252 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import unquote
+from aws_utils.parquet import is_data_file
+from aws_utils.s3 import DEFAULT_LIST_WORKERS, S3Handler, S3Utils
+
+# Called with the partition values known so far, leading keys first. Returns
+# False only if no partition starting with those values can match.
+PartitionPredicate = Callable[[Dict[str, str]], bool]
+
+
+def date_range_predicate(
+    start: date, end: date, keys: Tuple[str, ...] = ("year", "month", "day")
+) -> PartitionPredicate:
+    """
+    Builds a predicate matching the partitions of an inclusive date range.
+
+    Args:
+        start (date): The first date of the range.
+        end (date): The last date of the range.
+        keys (Tuple[str, ...]): The partition keys holding the date. Either up to
+            three numeric keys for the year, month and day, or one key holding an
+            ISO date such as ``dt=2024-01-31``.
+
+    Returns:
+        PartitionPredicate: A predicate that also prunes partial partition values,
+        so a whole year outside the range is never listed. Values that are not
+        dates, such as ``__HIVE_DEFAULT_PARTITION__``, never match.
+    """
+    if len(keys) == 1:
+        (key,) = keys
+
+        def iso_predicate(values: Dict[str, str]) -> bool:
+            if key not in values:
+                return True
+            try:
+                return start <= date.fromisoformat(values[key]) <= end
+            except ValueError:
+                return False
+
+        return iso_predicate
+
+    start_parts = (start.year, start.month, start.day)[: len(keys)]
+    end_parts = (end.year, end.month, end.day)[: len(keys)]
+
+    def predicate(values: Dict[str, str]) -> bool:
+        parts: List[int] = []
+        for key in keys:
+            if key not in values:
+                break
+            try:
+                parts.append(int(values[key]))
+            except ValueError:
+                return False
+        depth = len(parts)
+        return start_parts[:depth] <= tuple(parts) <= end_parts[:depth]
+
+    return predicate
+
+
+class PartitionReader:
+    """
+    Reads the objects of a Hive-partitioned table laid out as by
+    ``GlueHandler.build_partition_location``, i.e.
+    ``s3://{bucket}/{database}/{table}/{key}=value/.../``.
+
+    Only matching partitions are listed. Partition keys with candidate values are
+    turned into prefixes without any request, and the other keys are discovered
+    level by level with delimiter listings that are pruned by the predicate. The
+    cost of a read therefore grows with the number of matching partitions rather
+    than with the size of the table.
+    """
+
+    def __init__(
+        self,
+        bucket_name: str,
+        database_name: str,
+        table_name: str,
+        partition_keys: List[str],
+        s3_handler: Optional[S3Handler] = None,
+        max_workers: int = DEFAULT_LIST_WORKERS,
+    ) -> None:
+        """
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            database_name (str): The name of the Glue database.
+            table_name (str): The name of the Glue table.
+            partition_keys (List[str]): The partition keys, in directory order.
+            s3_handler (Optional[S3Handler]): The S3Handler used to list and read.
+            max_workers (int): The maximum number of concurrent S3 requests.
+        """
+        self.bucket_name = bucket_name
+        self.database_name = database_name
+        self.table_name = table_name
+        self.partition_keys = partition_keys
+        self.s3_handler = s3_handler or S3Handler()
+        self.max_workers = max_workers
+
+    @classmethod
+    def from_glue_table(
+        cls,
+        glue_handler: Any,
+        bucket_name: str,
+        database_name: str,
+        table_name: str,
+        **kwargs: Any,
+    ) -> "PartitionReader":
+        """
+        Creates a reader for a Glue table, taking the partition keys from its definition.
+
+        Args:
+            glue_handler (GlueHandler): The GlueHandler used to fetch the table.
+            bucket_name (str): The name of the S3 bucket.
+            database_name (str): The name of the Glue database.
+            table_name (str): The name of the Glue table.
+            **kwargs: Further arguments of the reader.
+
+        Returns:
+            PartitionReader: The reader.
+        """
+        table = glue_handler.get_table(database_name, table_name)
+        partition_keys = [key["Name"] for key in table.get("PartitionKeys", [])]
+        return cls(bucket_name, database_name, table_name, partition_keys, **kwargs)
+
+    @property
+    def table_prefix(self) -> str:
+        """
+        The S3 prefix of the table.
+        """
+        return f"{self.database_name}/{self.table_name}/"
+
+    def list_partitions(
+        self,
+        predicate: Optional[PartitionPredicate] = None,
+        values: Optional[Dict[str, Iterable[Any]]] = None,
+    ) -> List[Tuple[Dict[str, str], str]]:
+        """
+        Finds the partitions that match a predicate and candidate values.
+
+        Args:
+            predicate (Optional[PartitionPredicate]): Called with the partition values
+                known after each level; partitions for which it returns False are
+                not explored further.
+            values (Optional[Dict[str, Iterable[Any]]]): Candidate values of some
+                partition keys, such as ``{"region": ["eu", "us"]}``.
+
+        Returns:
+            List[Tuple[Dict[str, str], str]]: The values and S3 prefix of every
+            matching partition. Partitions from candidate values are returned
+            whether or not they hold any data.
+        """
+        values = values or {}
+        partitions: List[Tuple[Dict[str, str], str]] = [({}, self.table_prefix)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for key in self.partition_keys:
+                if key in values:
+                    candidates = [str(value) for value in values[key]]
+                    next_partitions = [
+                        ({**known, key: value}, f"{prefix}{key}={value}/")
+                        for known, prefix in partitions
+                        for value in candidates
+                    ]
+                else:
+                    listings = executor.map(
+                        lambda partition: self._list_partition_values(key, *partition),
+                        partitions,
+                    )
+                    next_partitions = [
+                        partition for listing in listings for partition in listing
+                    ]
+                if predicate is not None:
+                    next_partitions = [
+                        (known, prefix)
+                        for known, prefix in next_partitions
+                        if predicate(known)
+                    ]
+                partitions = next_partitions
+        return partitions
+
+    def iter_objects(
+        self,
+        predicate: Optional[PartitionPredicate] = None,
+        values: Optional[Dict[str, Iterable[Any]]] = None,
+    ) -> Iterator[Tuple[Dict[str, str], Dict[str, Any]]]:
+        """
+        Lists the data files of the matching partitions, listing partitions in parallel.
+
+        Directory markers, empty objects and hidden files such as ``_SUCCESS`` are skipped.
+
+        Args:
+            predicate (Optional[PartitionPredicate]): See ``list_partitions``.
+            values (Optional[Dict[str, Iterable[Any]]]): See ``list_partitions``.
+
+        Yields:
+            Tuple[Dict[str, str], Dict[str, Any]]: The partition values and the object
+            summary of each data file, in no particular order.
+        """
+        prefixes = [prefix for _, prefix in self.list_partitions(predicate, values)]
+        for obj in self.s3_handler.iter_objects_under(
+            self.bucket_name, prefixes, self.max_workers
+        ):
+            if obj["Size"] > 0 and is_data_file(obj["Key"]):
+                yield S3Utils.extract_partition_values(obj["Key"])[0], obj
+
+    def iter_object_bytes(
+        self,
+        predicate: Optional[PartitionPredicate] = None,
+        values: Optional[Dict[str, Iterable[Any]]] = None,
+    ) -> Iterator[Tuple[Dict[str, str], str, bytes]]:
+        """
+        Downloads the data files of the matching partitions concurrently.
+
+        At most ``max_workers`` downloads are in flight at once, so memory stays
+        bounded however many files match.
+
+        Args:
+            predicate (Optional[PartitionPredicate]): See ``list_partitions``.
+            values (Optional[Dict[str, Iterable[Any]]]): See ``list_partitions``.
+
+        Yields:
+            Tuple[Dict[str, str], str, bytes]: The partition values, key and content of
+            each data file, in no particular order.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight: Deque[Any] = deque()
+            for partition_values, obj in self.iter_objects(predicate, values):
+                future = executor.submit(
+                    self.s3_handler.transfer.download_bytes,
+                    self.bucket_name,
+                    obj["Key"],
+                )
+                in_flight.append((partition_values, obj["Key"], future))
+                if len(in_flight) >= self.max_workers:
+                    partition_values, key, future = in_flight.popleft()
+                    yield partition_values, key, future.result()
+            while in_flight:
+                partition_values, key, future = in_flight.popleft()
+                yield partition_values, key, future.result()
+
+    def _list_partition_values(
+        self, key: str, known: Dict[str, str], prefix: str
+    ) -> List[Tuple[Dict[str, str], str]]:
+        partitions = []
+        for sub_prefix in self.s3_handler.list_common_prefixes(
+            self.bucket_name, prefix
+        ):
+            name, _, value = unquote(sub_prefix[len(prefix) : -1]).partition("=")
+            if name == key:
+                partitions.append(({**known, key: value}, sub_prefix))
+        return partitions
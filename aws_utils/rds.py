@@ -1,38 +1,99 @@
-import boto3
-import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List
+from aws_utils.cache import TTLCache
+from aws_utils.clients import SharedClient
+
+DEFAULT_LOOKUP_TTL_SECONDS = 60
+DEFAULT_LOOKUP_MAX_ENTRIES = 1024
+DB_INSTANCE_FILTER_LIMIT = 100
+
+_MISSING = object()
 
 
 class RDSHandler:
-    def __init__(self) -> None:
+    rds_client = SharedClient("rds")
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_LOOKUP_TTL_SECONDS,
+        max_entries: int = DEFAULT_LOOKUP_MAX_ENTRIES,
+    ) -> None:
         """
-        Initializes the RDSHandler by creating an RDS client using AWS credentials
-        from environment variables.
+        Initializes the RDSHandler with a cache of instance lookups.
+
+        Args:
+            ttl_seconds (float): How long looked up instances are cached.
+            max_entries (int): The maximum number of cached lookups. The least
+                recently used lookups are evicted first.
         """
-        self.rds_client = boto3.client("rds", region_name=os.environ["AWS_REGION"])
+        self._instances = TTLCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
 
     def get_rds_instance_by_identifier(
-        self, identifier: str
+        self, identifier: str, refresh: bool = False
     ) -> Optional[Dict[str, Any]]:
         """
         Retrieves an RDS instance by its identifier.
 
+        The instance is looked up with a server-side filter and cached, so repeated
+        lookups do not call RDS again until the cache expires.
+
         Args:
             identifier (str): The identifier of the RDS instance.
+            refresh (bool): Whether to bypass the cache.
 
         Returns:
             Optional[Dict[str, Any]]: A dictionary containing details of the RDS instance if found, otherwise None.
         """
-        response = self.rds_client.describe_db_instances()
-        instances = response["DBInstances"]
-
-        for instance in instances:
-            if instance["DBInstanceIdentifier"] == identifier:
-                return {
-                    "DBInstanceIdentifier": instance["DBInstanceIdentifier"],
-                    "DBInstanceStatus": instance["DBInstanceStatus"],
-                    "DBInstanceClass": instance["DBInstanceClass"],
-                    "Engine": instance["Engine"],
-                    "Endpoint": instance.get("Endpoint", {}).get("Address", None),
-                }
-        return None
+        return self.get_rds_instances_by_identifiers([identifier], refresh)[identifier]
+
+    def get_rds_instances_by_identifiers(
+        self, identifiers: Iterable[str], refresh: bool = False
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Retrieves many RDS instances by their identifiers.
+
+        Identifiers that are not cached are fetched together in one paginated
+        ``describe_db_instances`` sweep, filtered server-side by identifier.
+
+        Args:
+            identifiers (Iterable[str]): The identifiers of the RDS instances.
+            refresh (bool): Whether to bypass the cache.
+
+        Returns:
+            Dict[str, Optional[Dict[str, Any]]]: The details of each instance, or None
+            for identifiers that do not exist.
+        """
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        missing: List[str] = []
+        for identifier in identifiers:
+            cached = _MISSING if refresh else self._instances.get(identifier, _MISSING)
+            if cached is _MISSING:
+                missing.append(identifier)
+            else:
+                results[identifier] = cached
+
+        if not missing:
+            return results
+        paginator = self.rds_client.get_paginator("describe_db_instances")
+        for i in range(0, len(missing), DB_INSTANCE_FILTER_LIMIT):
+            chunk = missing[i : i + DB_INSTANCE_FILTER_LIMIT]
+            found = {}
+            for page in paginator.paginate(
+                Filters=[{"Name": "db-instance-id", "Values": chunk}]
+            ):
+                for instance in page["DBInstances"]:
+                    found[instance["DBInstanceIdentifier"]] = _summarize(instance)
+            for identifier in chunk:
+                # RDS stores identifiers in lowercase.
+                results[identifier] = found.get(identifier.lower())
+                self._instances.set(identifier, results[identifier])
+        return results
+
+
+def _summarize(instance: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "DBInstanceIdentifier": instance["DBInstanceIdentifier"],
+        "DBInstanceStatus": instance["DBInstanceStatus"],
+        "DBInstanceClass": instance["DBInstanceClass"],
+        "Engine": instance["Engine"],
+        "Endpoint": instance.get("Endpoint", {}).get("Address", None),
+    }
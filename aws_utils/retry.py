@@ -0,0 +1,61 @@
+import random
+import time
+from typing import Callable, Iterator, Tuple, Type, TypeVar
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_MIN_DELAY = 0.1
+DEFAULT_MAX_DELAY = 5.0
+
+T = TypeVar("T")
+
+
+def backoff_delays(
+    min_delay: float = DEFAULT_MIN_DELAY, max_delay: float = DEFAULT_MAX_DELAY
+) -> Iterator[float]:
+    """
+    Yields exponentially growing delays with jitter, capped at ``max_delay``.
+
+    Args:
+        min_delay (float): The first delay in seconds.
+        max_delay (float): The largest delay in seconds.
+
+    Yields:
+        float: The next delay in seconds.
+    """
+    delay = min_delay
+    while True:
+        yield delay / 2 + random.uniform(0, delay / 2)
+        delay = min(delay * 2, max_delay)
+
+
+def call_with_retries(
+    func: Callable[[], T],
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+    min_delay: float = DEFAULT_MIN_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+) -> T:
+    """
+    Calls a function, retrying with exponential backoff and jitter when it raises.
+
+    Args:
+        func (Callable[[], T]): The function to call.
+        max_attempts (int): The maximum number of calls.
+        retry_on (Tuple[Type[BaseException], ...]): The exceptions that trigger a retry.
+        min_delay (float): The first delay in seconds.
+        max_delay (float): The largest delay in seconds.
+
+    Returns:
+        T: The return value of the first successful call.
+
+    Raises:
+        Exception: The last error if every attempt failed.
+    """
+    delays = backoff_delays(min_delay, max_delay)
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return func()
+        except retry_on:
+            if attempt == max_attempts:
+                raise
+            time.sleep(next(delays))
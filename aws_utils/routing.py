@@ -0,0 +1,194 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple
+from aws_utils.cache import TTLCache
+
+_WILDCARD = re.compile(r"\*\*|\*|\?|\{[^{}/]+\}")
+
+# Compiled tables survive between warm Lambda invocations, keyed by config fingerprint.
+_ROUTING_TABLES = TTLCache(ttl_seconds=None, max_entries=16)
+# The (config, table) pairs of recently routed config objects, keyed by their id.
+# Holding the config keeps its id from being reused while the entry is cached.
+_TABLES_BY_CONFIG_ID = TTLCache(ttl_seconds=None, max_entries=16)
+
+
+class _TrieNode:
+    __slots__ = ("children", "targets", "patterns")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.targets: Set[int] = set()
+        self.patterns: List[Tuple[Pattern[str], int]] = []
+
+
+def compile_pattern(pattern: str) -> Tuple[str, Optional[Pattern[str]]]:
+    """
+    Splits a routing pattern into its literal prefix and a regex for the rest.
+
+    A pattern without wildcards is a plain key prefix. Otherwise ``*`` and ``?``
+    match within one path segment, ``**`` matches across segments and ``{name}``
+    matches one Hive partition value, such as in ``raw/year={year}/``. Like plain
+    prefixes, patterns only need to match the start of a key.
+
+    Args:
+        pattern (str): The routing pattern.
+
+    Returns:
+        Tuple[str, Optional[Pattern[str]]]: The literal prefix before the first
+        wildcard, and a regex for the remainder of the pattern, or None for a
+        plain prefix.
+    """
+    first = _WILDCARD.search(pattern)
+    if first is None:
+        return pattern, None
+
+    parts = []
+    position = first.start()
+    for match in _WILDCARD.finditer(pattern, position):
+        parts.append(re.escape(pattern[position : match.start()]))
+        token = match.group()
+        if token == "**":
+            parts.append(".*")
+        elif token == "*":
+            parts.append("[^/]*")
+        elif token == "?":
+            parts.append("[^/]")
+        else:
+            parts.append("[^/]+")
+        position = match.end()
+    parts.append(re.escape(pattern[position:]))
+    return pattern[: first.start()], re.compile("".join(parts))
+
+
+class RoutingTable:
+    """
+    Prefix trie that maps S3 object keys to the routing targets that match them.
+
+    Each target has literal key prefixes and, optionally, wildcard patterns. Plain
+    prefixes are resolved by walking the key through the trie once, so the cost of
+    a lookup depends on the key length rather than on the number of prefixes.
+    Wildcard patterns are stored at the node of their literal prefix and only
+    evaluated for keys that reach it.
+
+    With only a handful of prefixes, walking the trie in Python is slower than
+    checking each prefix with ``str.startswith``, about half as fast with six
+    prefixes; the trie pays off from about 20 prefixes.
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, List[str]],
+        patterns: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        """
+        Args:
+            routes (Dict[str, List[str]]): The literal key prefixes of each routing
+                target. Characters such as ``*`` or ``{`` have no special meaning.
+            patterns (Optional[Dict[str, List[str]]]): The wildcard patterns of each
+                routing target, as accepted by ``compile_pattern``. Targets that
+                only appear here are added after those of ``routes``.
+        """
+        patterns = patterns or {}
+        self.targets = list(dict.fromkeys([*routes, *patterns]))
+        self._root = _TrieNode()
+        for index, target in enumerate(self.targets):
+            for prefix in routes.get(target, []):
+                self._add(prefix, None, index)
+            for pattern in patterns.get(target, []):
+                self._add(*compile_pattern(pattern), index)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RoutingTable":
+        """
+        Builds a routing table from an S3Router configuration.
+
+        Args:
+            config (Dict[str, Any]): The router configuration, whose entries each
+                hold a ``prefixes`` list of literal prefixes and optionally a
+                ``patterns`` list of wildcard patterns.
+
+        Returns:
+            RoutingTable: A table whose targets are the configuration keys.
+        """
+        return cls(
+            {key: value.get("prefixes", []) for key, value in config.items()},
+            {key: value.get("patterns", []) for key, value in config.items()},
+        )
+
+    def match(self, object_key: str) -> List[str]:
+        """
+        Returns every target with a pattern matching the object key.
+
+        Args:
+            object_key (str): The S3 object key.
+
+        Returns:
+            List[str]: The matching targets, in the order they were configured.
+        """
+        matched: Set[int] = set()
+        node: Optional[_TrieNode] = self._root
+        position = 0
+        while node is not None:
+            matched.update(node.targets)
+            for regex, index in node.patterns:
+                if index not in matched and regex.match(object_key, position):
+                    matched.add(index)
+            if position == len(object_key):
+                break
+            node = node.children.get(object_key[position])
+            position += 1
+        return [self.targets[index] for index in sorted(matched)]
+
+    def _add(self, prefix: str, regex: Optional[Pattern[str]], index: int) -> None:
+        node = self._root
+        for char in prefix:
+            node = node.children.setdefault(char, _TrieNode())
+        if regex is None:
+            node.targets.add(index)
+        else:
+            node.patterns.append((regex, index))
+
+
+def config_fingerprint(config: Dict[str, Any]) -> str:
+    """
+    Returns a stable fingerprint of a router configuration.
+
+    Args:
+        config (Dict[str, Any]): The router configuration.
+
+    Returns:
+        str: A hex digest that changes whenever the configuration changes.
+    """
+    # Key order is kept because it decides the order of matched targets.
+    payload = json.dumps(config, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_routing_table(config: Dict[str, Any]) -> RoutingTable:
+    """
+    Returns the compiled routing table of a configuration, compiling it only the
+    first time the configuration is seen in this process.
+
+    The table of a configuration object that was routed before is found by
+    identity, without reading the configuration, so a configuration must not be
+    modified after its first use. Other objects are fingerprinted, so a
+    configuration loaded again on each invocation still reuses the compiled table.
+
+    Args:
+        config (Dict[str, Any]): The router configuration.
+
+    Returns:
+        RoutingTable: The compiled routing table.
+    """
+    cached = _TABLES_BY_CONFIG_ID.get(id(config))
+    if cached is not None and cached[0] is config:
+        return cached[1]
+
+    fingerprint = config_fingerprint(config)
+    table = _ROUTING_TABLES.get(fingerprint)
+    if table is None:
+        table = RoutingTable.from_config(config)
+        _ROUTING_TABLES.set(fingerprint, table)
+    _TABLES_BY_CONFIG_ID.set(id(config), (config, table))
+    return table
@@ -1,8 +1,128 @@
-import boto3
 import csv
 import os
+import io
 import json
-from io import StringIO
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from urllib.parse import unquote
+from aws_utils.clients import SharedClient
+from aws_utils.parquet_io import (
+    ParquetFilter,
+    ParquetS3Writer,
+    read_parquet_columns,
+    read_parquet_table,
+)
+from aws_utils.s3_transfer import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PART_SIZE,
+    S3TransferManager,
+    UploadSource,
+)
+
+DEFAULT_LIST_WORKERS = 16
+DELETE_OBJECTS_LIMIT = 1000
+PARTITION_PREFIX_CACHE_SIZE = 4096
+
+_WORKER_DONE = object()
+
+
+def _stream_from_workers(
+    producer: Callable[[Any], Iterable[List[Any]]],
+    items: List[Any],
+    max_workers: int,
+) -> Iterator[Any]:
+    """
+    Runs ``producer`` for every item on a thread pool and yields the results lazily.
+
+    Each producer yields batches (eg. one listing page) which are passed through a
+    bounded queue, so memory stays flat however many results are produced. Errors
+    raised by a producer are re-raised in the consuming thread, and closing the
+    generator early stops all workers.
+    """
+    batches: queue.Queue = queue.Queue(maxsize=max_workers * 2)
+    stop = threading.Event()
+
+    def put(item: Any) -> None:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def run(item: Any) -> None:
+        try:
+            for batch in producer(item):
+                if stop.is_set():
+                    return
+                put(batch)
+        except BaseException as e:
+            put(e)
+        finally:
+            put(_WORKER_DONE)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for item in items:
+            executor.submit(run, item)
+        remaining = len(items)
+        while remaining:
+            batch = batches.get()
+            if batch is _WORKER_DONE:
+                remaining -= 1
+            elif isinstance(batch, BaseException):
+                raise batch
+            else:
+                yield from batch
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _column_indexes(
+    columns: Optional[Sequence[Union[str, int]]], header: List[str]
+) -> Optional[List[int]]:
+    if columns is None:
+        return None
+    positions = {name: i for i, name in reversed(list(enumerate(header)))}
+    missing = [c for c in columns if not isinstance(c, int) and c not in positions]
+    if missing:
+        raise ValueError(f"Columns {missing} are not in the CSV header")
+    return [
+        column if isinstance(column, int) else positions[column] for column in columns
+    ]
+
+
+@lru_cache(maxsize=PARTITION_PREFIX_CACHE_SIZE)
+def _parse_prefix(prefix: str) -> Tuple[Tuple[Tuple[str, str], ...], Tuple[str, ...]]:
+    # Objects in the same directory share a prefix, so each prefix is parsed once.
+    partitions = []
+    paths = []
+    for part in prefix.split("/"):
+        if not part:
+            continue
+        part = unquote(part)
+        if "=" in part:
+            key, value = part.split("=", 1)
+            partitions.append((key, value))
+        else:
+            paths.append(part)
+    return tuple(partitions), tuple(paths)
 
 
 class S3Utils:
@@ -11,6 +131,10 @@ class S3Utils:
         """
         Extract partition values from an S3 object key.
 
+        Every directory of the key is URL-decoded. Directories of the form
+        ``key=value`` are partitions and the others are paths. The last part of the
+        key is the file name, which is empty for keys ending with ``/``.
+
         Args:
             object_key (str): The S3 object key to extract partition values from.
 
@@ -20,33 +144,114 @@ class S3Utils:
                 - list: A list of paths extracted from the object key. Eg. ['path', 'to', 'folder']
                 - str: The file name extracted from the object key. Eg. 'file.csv'
         """
-        partition_values = {}
-        parts = object_key.split("/")
-        paths = []
-
-        for part in parts:
-            if "%" in part:
-                part = part.replace("%3D", "=")
-                if "=" in part:
-                    key, value = part.split("=")
-                    partition_values[key] = value
-            elif "." not in part:
-                paths.append(part)
-            else:
-                file_name = part
+        prefix, _, file_name = object_key.rpartition("/")
+        partitions, paths = _parse_prefix(prefix)
+        if "%" in file_name:
+            file_name = unquote(file_name)
+        return dict(partitions), list(paths), file_name
 
-        return partition_values, paths, file_name
+    @staticmethod
+    def extract_partition_table(
+        object_keys: Iterable[str],
+        schema: Optional[Dict[str, Callable[[str], Any]]] = None,
+    ) -> Dict[str, List[Any]]:
+        """
+        Parses many S3 object keys into a columnar table of partition values.
+
+        The table has one column per partition key, holding None for keys without
+        that partition, followed by ``path`` and ``file_name`` columns. It can be
+        passed directly to ``pyarrow.table`` or ``pandas.DataFrame``.
+
+        Args:
+            object_keys (Iterable[str]): The S3 object keys to parse.
+            schema (Optional[Dict[str, Callable[[str], Any]]]): Converters for
+                declared partition keys, such as ``{"year": int}``. Declared columns
+                come first and are present even if no key has them. Partitions that
+                are not declared are kept as strings.
+
+        Returns:
+            Dict[str, List[Any]]: The columns of the table, all of the same length.
+
+        Raises:
+            ValueError: If a partition value cannot be converted to its declared type,
+                or if a partition key is named ``path`` or ``file_name``.
+        """
+        schema = schema or {}
+        names: Dict[str, None] = dict.fromkeys(schema)
+        # Keys in the same directory share their parsed and converted partitions.
+        prefixes: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        rows: List[Dict[str, Any]] = []
+        paths: List[str] = []
+        file_names: List[str] = []
+
+        for object_key in object_keys:
+            prefix, _, file_name = object_key.rpartition("/")
+            parsed = prefixes.get(prefix)
+            if parsed is None:
+                partitions, path_parts = _parse_prefix(prefix)
+                values = {}
+                for key, value in partitions:
+                    if key in schema:
+                        try:
+                            value = schema[key](value)
+                        except (TypeError, ValueError) as e:
+                            raise ValueError(
+                                f"Invalid value {value!r} for partition {key!r} "
+                                f"in {object_key!r}: {e}"
+                            )
+                    values[key] = value
+                    names.setdefault(key)
+                parsed = prefixes[prefix] = (values, "/".join(path_parts))
+            rows.append(parsed[0])
+            paths.append(parsed[1])
+            file_names.append(unquote(file_name) if "%" in file_name else file_name)
+
+        collisions = [name for name in ("path", "file_name") if name in names]
+        if collisions:
+            raise ValueError(
+                f"Partition keys {collisions} collide with the metadata columns"
+            )
+        columns: Dict[str, List[Any]] = {
+            name: [row.get(name) for row in rows] for name in names
+        }
+        columns["path"] = paths
+        columns["file_name"] = file_names
+        return columns
 
 
 class S3Handler:
-    def __init__(self):
-        self.s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
-            aws_session_token=os.environ.get("AWS_SESSION_TOKEN"),
-            region_name=os.environ.get("AWS_REGION"),
-        )
+    s3_client = SharedClient("s3")
+
+    def __init__(
+        self,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        """
+        Initializes the S3Handler. The S3 client is shared by every handler and
+        uses the AWS credentials from environment variables.
+
+        Args:
+            part_size (int): The size in bytes of each ranged GET and multipart upload part.
+            max_concurrency (int): The maximum number of parts transferred in parallel.
+        """
+        self.part_size = part_size
+        self.max_concurrency = max_concurrency
+        self._transfer: Optional[S3TransferManager] = None
+
+    @property
+    def transfer(self) -> S3TransferManager:
+        """
+        The S3TransferManager for the current S3 client, recreated if the client changes.
+        """
+        s3_client = self.s3_client
+        if self._transfer is None or self._transfer.s3_client is not s3_client:
+            self._transfer = S3TransferManager(
+                s3_client,
+                part_size=self.part_size,
+                max_concurrency=self.max_concurrency,
+            )
+        return self._transfer
 
     def load_csv_from_s3(self, bucket_name: str, csv_key: str) -> list:
         """
@@ -59,11 +264,103 @@ class S3Handler:
         Returns:
             list: A list of rows from the CSV file, first row is the header.
         """
-        csv_object = self.s3_client.get_object(Bucket=bucket_name, Key=csv_key)
-        csv_data = csv_object["Body"].read().decode("utf-8")
-        csv_reader = csv.reader(StringIO(csv_data))
-        data = [row for row in csv_reader]
-        return data
+        with self._open_text(bucket_name, csv_key) as csv_data:
+            return list(csv.reader(csv_data))
+
+    def iter_csv_rows(
+        self,
+        bucket_name: str,
+        csv_key: str,
+        columns: Optional[Sequence[Union[str, int]]] = None,
+        limit: Optional[int] = None,
+        start_byte: int = 0,
+        has_header: bool = True,
+        encoding: str = "utf-8",
+    ) -> Iterator[List[str]]:
+        """
+        Stream the rows of a CSV file from S3 without loading the file into memory.
+
+        The body is decoded incrementally, so memory use depends on the row size
+        rather than the file size.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            csv_key (str): The key of the CSV file in S3.
+            columns (Optional[Sequence[Union[str, int]]]): The columns to keep, by
+                header name or index, in the order they should be returned.
+            limit (Optional[int]): The maximum number of rows to yield.
+            start_byte (int): The byte offset to resume reading from. Must be the start
+                of a row; the header is then read separately from the start of the file.
+            has_header (bool): Whether the first row of the file is a header.
+            encoding (str): The text encoding of the file.
+
+        Yields:
+            List[str]: Each data row, excluding the header.
+
+        Raises:
+            ValueError: If a column is selected by a name that is not in the header,
+                or by name in a file without a header.
+        """
+        if not has_header and any(not isinstance(c, int) for c in columns or ()):
+            raise ValueError(
+                "Columns can only be selected by index in a CSV file without a header"
+            )
+        header: List[str] = []
+        if has_header and start_byte > 0:
+            with self._open_text(bucket_name, csv_key, encoding=encoding) as csv_data:
+                header = next(csv.reader(csv_data), [])
+
+        with self._open_text(bucket_name, csv_key, start_byte, encoding) as csv_data:
+            csv_reader = csv.reader(csv_data)
+            if has_header and start_byte == 0:
+                header = next(csv_reader, [])
+            indexes = _column_indexes(columns, header)
+
+            for count, row in enumerate(csv_reader):
+                if limit is not None and count >= limit:
+                    break
+                if indexes is None:
+                    yield row
+                else:
+                    yield [row[i] if i < len(row) else "" for i in indexes]
+
+    def iter_jsonl_records(
+        self,
+        bucket_name: str,
+        jsonl_key: str,
+        columns: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        start_byte: int = 0,
+        encoding: str = "utf-8",
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the records of a JSON-lines file from S3 without loading the file
+        into memory.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            jsonl_key (str): The key of the JSON-lines file in S3.
+            columns (Optional[Sequence[str]]): The fields to keep from each record.
+            limit (Optional[int]): The maximum number of records to yield.
+            start_byte (int): The byte offset to resume reading from. Must be the
+                start of a line.
+            encoding (str): The text encoding of the file.
+
+        Yields:
+            Dict[str, Any]: Each record. Blank lines are skipped.
+        """
+        count = 0
+        with self._open_text(bucket_name, jsonl_key, start_byte, encoding) as lines:
+            for line in lines:
+                if limit is not None and count >= limit:
+                    break
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if columns is not None:
+                    record = {column: record.get(column) for column in columns}
+                count += 1
+                yield record
 
     def load_json_from_s3(self, bucket_name: str, json_key: str) -> dict:
         """
@@ -76,8 +373,7 @@ class S3Handler:
         Returns:
             dict: The JSON data as a dictionary.
         """
-        json_object = self.s3_client.get_object(Bucket=bucket_name, Key=json_key)
-        json_data = json_object["Body"].read()
+        json_data = self.transfer.download_bytes(bucket_name, json_key)
         return json.loads(json_data)
 
     def load_parquet_from_s3(self, bucket_name: str, parquet_key: str) -> bytes:
@@ -91,10 +387,64 @@ class S3Handler:
         Returns:
             bytes: The raw Parquet data.
         """
-        parquet_object = self.s3_client.get_object(Bucket=bucket_name, Key=parquet_key)
-        parquet_data = parquet_object["Body"].read()
+        parquet_data = self.transfer.download_bytes(bucket_name, parquet_key)
         return parquet_data
 
+    def read_parquet_table(
+        self,
+        bucket_name: str,
+        parquet_key: str,
+        columns: Optional[Sequence[str]] = None,
+        row_groups: Optional[Sequence[int]] = None,
+        filters: Optional[List[ParquetFilter]] = None,
+    ) -> Any:
+        """
+        Read selected columns and row groups of a Parquet file in S3 as an Arrow table.
+
+        Only the footer and the selected column chunks are downloaded, using
+        concurrent ranged GETs. Requires pyarrow.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            parquet_key (str): The key of the Parquet file in S3.
+            columns (Optional[Sequence[str]]): The columns to read. Defaults to all.
+            row_groups (Optional[Sequence[int]]): The row groups to read. Defaults to all.
+            filters (Optional[List[ParquetFilter]]): Conditions such as
+                ``("year", ">=", 2024)`` that every returned row satisfies. Row
+                groups that cannot match are skipped using their statistics.
+
+        Returns:
+            pyarrow.Table: The selected rows and columns.
+        """
+        return read_parquet_table(
+            self.transfer, bucket_name, parquet_key, columns, row_groups, filters
+        )
+
+    def read_parquet_columns(
+        self,
+        bucket_name: str,
+        parquet_key: str,
+        columns: Optional[Sequence[str]] = None,
+        row_groups: Optional[Sequence[int]] = None,
+        filters: Optional[List[ParquetFilter]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Read selected columns of a Parquet file in S3 as NumPy arrays.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            parquet_key (str): The key of the Parquet file in S3.
+            columns (Optional[Sequence[str]]): See ``read_parquet_table``.
+            row_groups (Optional[Sequence[int]]): See ``read_parquet_table``.
+            filters (Optional[List[ParquetFilter]]): See ``read_parquet_table``.
+
+        Returns:
+            Dict[str, numpy.ndarray]: The values of each column.
+        """
+        return read_parquet_columns(
+            self.transfer, bucket_name, parquet_key, columns, row_groups, filters
+        )
+
     def load_excel_from_s3(self, bucket_name: str, object_key: str) -> bytes:
         """
         Load an Excel file from S3.
@@ -106,28 +456,26 @@ class S3Handler:
         Returns:
             bytes: The raw Excel data.
         """
-        response = self.s3_client.get_object(Bucket=bucket_name, Key=object_key)
-        excel_data = response["Body"].read()
+        excel_data = self.transfer.download_bytes(bucket_name, object_key)
         return excel_data
 
     def load_generic_file_from_s3(self, bucket_name: str, file_key: str) -> bytes:
         """
         Load a generic file from S3.
         """
-        response = self.s3_client.get_object(Bucket=bucket_name, Key=file_key)
-        file_data = response["Body"].read()
+        file_data = self.transfer.download_bytes(bucket_name, file_key)
         return file_data
 
     def upload_generic_file_to_s3(
-        self, bucket_name: str, file_key: str, file_data: bytes
+        self, bucket_name: str, file_key: str, file_data: UploadSource
     ):
         """
         Upload a generic file to S3.
         """
-        self.s3_client.put_object(Bucket=bucket_name, Key=file_key, Body=file_data)
+        self.transfer.upload(bucket_name, file_key, file_data)
 
     def upload_parquet_to_s3(
-        self, bucket_name: str, parquet_key: str, parquet_data: bytes
+        self, bucket_name: str, parquet_key: str, parquet_data: UploadSource
     ):
         """
         Upload a Parquet file to S3.
@@ -135,28 +483,91 @@ class S3Handler:
         Args:
             bucket_name (str): The name of the S3 bucket.
             parquet_key (str): The key for the Parquet file in S3.
-            parquet_data (bytes): The raw Parquet data to upload.
+            parquet_data (UploadSource): The raw Parquet data to upload, as bytes, a file
+                path, a binary file-like object or an iterable of byte chunks.
         """
-        self.s3_client.put_object(
-            Bucket=bucket_name,
-            Key=parquet_key,
-            Body=parquet_data,
+        self.transfer.upload(
+            bucket_name,
+            parquet_key,
+            parquet_data,
             ContentType="application/octet-stream",
         )
 
-    def upload_excel_to_s3(self, bucket_name: str, excel_key: str, excel_data: bytes):
+    def open_parquet_writer(
+        self, bucket_name: str, parquet_key: str, schema: Any, **writer_options: Any
+    ) -> ParquetS3Writer:
+        """
+        Open a writer that streams row groups of a Parquet file into S3.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            parquet_key (str): The key for the Parquet file in S3.
+            schema (pyarrow.Schema): The schema of the file.
+            **writer_options: Further arguments of ``pyarrow.parquet.ParquetWriter``.
+
+        Returns:
+            ParquetS3Writer: The writer, which must be closed to complete the upload.
+        """
+        return ParquetS3Writer(
+            self.transfer, bucket_name, parquet_key, schema, **writer_options
+        )
+
+    def write_parquet_to_s3(
+        self,
+        bucket_name: str,
+        parquet_key: str,
+        data: Any,
+        schema: Any = None,
+        row_group_size: Optional[int] = None,
+        **writer_options: Any,
+    ) -> None:
+        """
+        Write Arrow data to a Parquet file in S3 without building the file in memory.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            parquet_key (str): The key for the Parquet file in S3.
+            data: A pyarrow Table, or an iterable of Tables or RecordBatches that are
+                written as they are produced.
+            schema (Optional[pyarrow.Schema]): The schema of the file. Defaults to
+                the schema of the first table or batch.
+            row_group_size (Optional[int]): The maximum number of rows per row group.
+            **writer_options: Further arguments of ``pyarrow.parquet.ParquetWriter``.
+
+        Raises:
+            ValueError: If ``data`` is empty and no schema is given.
+        """
+        chunks = iter([data] if hasattr(data, "schema") else data)
+        first = next(chunks, None)
+        if first is None and schema is None:
+            raise ValueError("A schema is required to write an empty Parquet file")
+        with self.open_parquet_writer(
+            bucket_name,
+            parquet_key,
+            schema if schema is not None else first.schema,
+            **writer_options,
+        ) as writer:
+            if first is not None:
+                writer.write(first, row_group_size)
+            for chunk in chunks:
+                writer.write(chunk, row_group_size)
+
+    def upload_excel_to_s3(
+        self, bucket_name: str, excel_key: str, excel_data: UploadSource
+    ):
         """
         Upload an Excel file to S3.
 
         Args:
             bucket_name (str): The name of the S3 bucket.
             excel_key (str): The key for the Excel file in S3.
-            excel_data (bytes): The raw Excel data to upload.
+            excel_data (UploadSource): The raw Excel data to upload, as bytes, a file
+                path, a binary file-like object or an iterable of byte chunks.
         """
-        self.s3_client.put_object(
-            Bucket=bucket_name,
-            Key=excel_key,
-            Body=excel_data,
+        self.transfer.upload(
+            bucket_name,
+            excel_key,
+            excel_data,
             ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         )
 
@@ -169,14 +580,63 @@ class S3Handler:
             json_key (str): The key for the JSON file in S3.
             json_data (dict): The JSON data to upload.
         """
-        json_data = json.dumps(json_data)
-        self.s3_client.put_object(
-            Bucket=bucket_name,
-            Key=json_key,
-            Body=json_data,
-            ContentType="application/json",
+        json_data = json.dumps(json_data).encode("utf-8")
+        self.transfer.upload(
+            bucket_name, json_key, json_data, ContentType="application/json"
         )
 
+    def upload_stream_to_s3(
+        self,
+        bucket_name: str,
+        object_key: str,
+        source: UploadSource,
+        content_type: str = "application/octet-stream",
+    ) -> None:
+        """
+        Upload data of any size to S3 using a parallel multipart upload.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            object_key (str): The key for the object in S3.
+            source (UploadSource): A file path, bytes, a binary file-like object or an
+                iterable of byte chunks.
+            content_type (str): The content type of the object.
+        """
+        self.transfer.upload(bucket_name, object_key, source, ContentType=content_type)
+
+    def download_stream_from_s3(
+        self,
+        bucket_name: str,
+        object_key: str,
+        destination: Union[str, os.PathLike, BinaryIO],
+    ) -> int:
+        """
+        Download an object of any size from S3 using parallel ranged GETs.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            object_key (str): The key of the object in S3.
+            destination (Union[str, os.PathLike, BinaryIO]): A file path or a writable
+                binary file-like object.
+
+        Returns:
+            int: The number of bytes downloaded.
+        """
+        return self.transfer.download(bucket_name, object_key, destination)
+
+    def iter_object_chunks(self, bucket_name: str, object_key: str) -> Iterator[bytes]:
+        """
+        Stream an object from S3 as ordered chunks fetched with parallel ranged GETs.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            object_key (str): The key of the object in S3.
+
+        Returns:
+            Iterator[bytes]: Consecutive chunks of the object, each at most one part long.
+        """
+        return self.transfer.iter_chunks(bucket_name, object_key)
+
     def list_objects(self, bucket_name: str, prefix: str) -> list:
         """
         List objects in an S3 bucket with a specific prefix.
@@ -186,7 +646,156 @@ class S3Handler:
             prefix (str): The prefix to filter the objects.
 
         Returns:
-            list: A list of objects in the specified bucket with the given prefix.
+            list: A list of all objects in the specified bucket with the given prefix.
         """
-        response = self.s3_client.list_objects_v2(Bucket=bucket_name, Prefix=prefix)
-        return response.get("Contents", [])
+        return list(self.iter_objects(bucket_name, prefix))
+
+    def iter_objects(
+        self,
+        bucket_name: str,
+        prefix: str,
+        fan_out_depth: int = 0,
+        max_workers: int = DEFAULT_LIST_WORKERS,
+        delimiter: str = "/",
+        start_after: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily list every object under a prefix, following continuation tokens.
+
+        With ``fan_out_depth`` set, the first levels below the prefix are discovered
+        with delimiter listings (eg. each ``year=``/``month=`` directory) and the
+        resulting sub-prefixes are listed in parallel, so wall time scales with the
+        number of partitions rather than the total number of keys. Objects are then
+        yielded in no particular order.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            prefix (str): The prefix to filter the objects.
+            fan_out_depth (int): The number of directory levels to discover before
+                listing in parallel. 0 lists the prefix serially in key order.
+            max_workers (int): The maximum number of concurrent listing requests.
+            delimiter (str): The delimiter used to discover sub-prefixes.
+            start_after (Optional[str]): Only list keys after this key. Applies to
+                serial listings only.
+
+        Yields:
+            Dict[str, Any]: The object summaries, as returned by ``list_objects_v2``.
+        """
+        if fan_out_depth <= 0:
+            for page in self._iter_pages(bucket_name, prefix, start_after):
+                yield from page
+            return
+
+        prefixes = [prefix]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for _ in range(fan_out_depth):
+                next_prefixes: List[str] = []
+                listings = executor.map(
+                    lambda p: self._list_level(bucket_name, p, delimiter), prefixes
+                )
+                for objects, common_prefixes in listings:
+                    yield from objects
+                    next_prefixes.extend(common_prefixes)
+                prefixes = next_prefixes
+
+        yield from self.iter_objects_under(bucket_name, prefixes, max_workers)
+
+    def iter_objects_under(
+        self,
+        bucket_name: str,
+        prefixes: List[str],
+        max_workers: int = DEFAULT_LIST_WORKERS,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily list every object under several prefixes, listing them in parallel.
+
+        Objects are yielded in no particular order.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            prefixes (List[str]): The prefixes to list, which should not overlap.
+            max_workers (int): The maximum number of concurrent listing requests.
+
+        Yields:
+            Dict[str, Any]: The object summaries, as returned by ``list_objects_v2``.
+        """
+        return _stream_from_workers(
+            lambda p: self._iter_pages(bucket_name, p), prefixes, max_workers
+        )
+
+    def list_common_prefixes(
+        self, bucket_name: str, prefix: str, delimiter: str = "/"
+    ) -> List[str]:
+        """
+        List the sub-prefixes directly below a prefix, eg. the partitions of a table.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            prefix (str): The prefix to list below.
+            delimiter (str): The delimiter separating directory levels.
+
+        Returns:
+            List[str]: The sub-prefixes, each ending with the delimiter.
+        """
+        return self._list_level(bucket_name, prefix, delimiter)[1]
+
+    def _open_text(
+        self,
+        bucket_name: str,
+        object_key: str,
+        start_byte: int = 0,
+        encoding: str = "utf-8",
+    ) -> io.TextIOWrapper:
+        kwargs: Dict[str, Any] = {"Bucket": bucket_name, "Key": object_key}
+        if start_byte > 0:
+            kwargs["Range"] = f"bytes={start_byte}-"
+        body = self.s3_client.get_object(**kwargs)["Body"]
+        return io.TextIOWrapper(body, encoding=encoding, newline="")
+
+    def delete_objects(self, bucket_name: str, object_keys: List[str]) -> None:
+        """
+        Delete many objects from S3, 1,000 keys per request.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            object_keys (List[str]): The keys of the objects to delete.
+
+        Raises:
+            Exception: If any object could not be deleted.
+        """
+        for i in range(0, len(object_keys), DELETE_OBJECTS_LIMIT):
+            response = self.s3_client.delete_objects(
+                Bucket=bucket_name,
+                Delete={
+                    "Objects": [
+                        {"Key": key}
+                        for key in object_keys[i : i + DELETE_OBJECTS_LIMIT]
+                    ],
+                    "Quiet": True,
+                },
+            )
+            if response.get("Errors"):
+                raise Exception(f"Failed to delete objects: {response['Errors']}")
+
+    def _iter_pages(
+        self, bucket_name: str, prefix: str, start_after: Optional[str] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        kwargs = {"Bucket": bucket_name, "Prefix": prefix}
+        if start_after:
+            kwargs["StartAfter"] = start_after
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(**kwargs):
+            yield page.get("Contents", [])
+
+    def _list_level(
+        self, bucket_name: str, prefix: str, delimiter: str
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        objects: List[Dict[str, Any]] = []
+        common_prefixes: List[str] = []
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(
+            Bucket=bucket_name, Prefix=prefix, Delimiter=delimiter
+        ):
+            objects.extend(page.get("Contents", []))
+            common_prefixes.extend(p["Prefix"] for p in page.get("CommonPrefixes", []))
+        return objects, common_prefixes
@@ -1,24 +1,99 @@
+import json
 import logging
+from urllib.parse import unquote_plus
 from aws_utils import events
-from typing import Dict, Any, Tuple, List
+from aws_utils.routing import get_routing_table
+from typing import Dict, Any, Optional, Tuple, List
 
 logger = logging.getLogger(__name__)
 
 
+EVENT_SOURCE = "com.oxforddataprocesses"
+
+
 class S3Router:
     @staticmethod
     def extract_s3_info(event: Dict[str, Any]) -> Tuple[str, str]:
         """
-        Extracts S3 bucket name and object key from the event.
+        Extracts S3 bucket name and object key from the first record of the event.
 
         Args:
             event (Dict[str, Any]): The event containing S3 information.
 
         Returns:
-            Tuple[str, str]: A tuple containing the bucket name and object key.
+            Tuple[str, str]: A tuple containing the bucket name and URL-decoded object key.
+        """
+        record = S3Router.extract_s3_records(event)[0]
+        return record["bucket"], record["object_key"]
+
+    @staticmethod
+    def extract_s3_records(event: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Extracts every S3 object referenced by an event.
+
+        Handles S3 notifications delivered directly and S3 notifications delivered
+        in the bodies of SQS messages. S3 test events carry no records and are skipped.
+
+        Args:
+            event (Dict[str, Any]): The Lambda event.
+
+        Returns:
+            List[Dict[str, Any]]: One dictionary per S3 record with the ``bucket``, the
+            URL-decoded ``object_key`` and the ``message_id`` of the SQS message it
+            came from, or None for direct notifications.
+
+        Raises:
+            Exception: If a record or message body is malformed.
         """
-        s3_info = event["Records"][0]["s3"]
-        return s3_info["bucket"]["name"], s3_info["object"]["key"]
+        records, malformed = S3Router.split_s3_records(event)
+        if malformed:
+            raise Exception(f"Malformed records in event: {malformed}")
+        return records
+
+    @staticmethod
+    def split_s3_records(
+        event: Dict[str, Any],
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Extracts every S3 object referenced by an event, setting malformed messages aside.
+
+        A message whose body is not valid JSON or does not hold well-formed S3
+        records contributes no records, so one bad message does not fail the others.
+
+        Args:
+            event (Dict[str, Any]): The Lambda event.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: The records, as
+            returned by ``extract_s3_records``, and one dictionary per malformed
+            record or message with its ``message_id`` and the ``error``.
+        """
+        records: List[Dict[str, Any]] = []
+        malformed: List[Dict[str, Any]] = []
+        for record in event.get("Records", []):
+            message_id = None if "s3" in record else record.get("messageId")
+            try:
+                if "s3" in record:
+                    s3_records = [record]
+                else:
+                    s3_records = json.loads(record["body"]).get("Records", [])
+                # Every record of a message is parsed before any is kept, so a
+                # retried message never duplicates the records that were routed.
+                parsed = [
+                    {
+                        "bucket": s3_record["s3"]["bucket"]["name"],
+                        "object_key": unquote_plus(s3_record["s3"]["object"]["key"]),
+                        "message_id": message_id,
+                    }
+                    for s3_record in s3_records
+                ]
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                malformed.append(
+                    {"message_id": message_id, "error": f"{type(e).__name__}: {e}"}
+                )
+                continue
+            records.extend(parsed)
+        return records, malformed
 
     @staticmethod
     def create_event_detail(bucket_name: str, object_key: str) -> Dict[str, Any]:
@@ -57,7 +132,7 @@ class S3Router:
         """
         response, entries = events_handler.publish_event(
             f"{lambda_function_name}-event-bus",
-            "com.oxforddataprocesses",
+            EVENT_SOURCE,
             detail["event_type"],
             detail,
         )
@@ -108,27 +183,99 @@ class S3Router:
                 )
 
     @staticmethod
-    def handle_s3_event(event: Dict[str, Any], config: Dict[str, Any]) -> None:
+    def handle_s3_event(
+        event: Dict[str, Any], config: Dict[str, Any]
+    ) -> Dict[str, List[Dict[str, str]]]:
         """
-        Handles the S3 event and processes it according to the configuration.
+        Handles every record of an S3 event and routes it according to the configuration.
+
+        All records are validated against the S3PutObject schema in one pass, and
+        the events for every matching Lambda function are published in batched
+        put_events calls, grouped by event bus.
 
         Args:
-            event (Dict[str, Any]): The S3 event to handle.
+            event (Dict[str, Any]): The S3 event, delivered directly or through SQS.
             config (Dict[str, Any]): The configuration for processing the event.
 
+        Returns:
+            Dict[str, List[Dict[str, str]]]: The SQS partial batch response, listing
+            the messages that were malformed or whose records failed validation or
+            publishing.
+
         Raises:
-            Exception: If the event validation fails.
+            Exception: If a record of a direct S3 notification is malformed or fails
+                validation or publishing.
         """
         events_handler = events.EventsHandler()
-        bucket_name, object_key = S3Router.extract_s3_info(event)
-        detail = S3Router.create_event_detail(bucket_name, object_key)
         schema_json = events_handler.get_schema("S3PutObject")
-        events_handler.validate_event(detail, schema_json)
-
-        for key in config.keys():
-            prefixes = config[key]["prefixes"]
-            lambda_name = config[key]["lambda_name"]
-            logger.info(f"Processing event for {lambda_name}")
-            S3Router.process_event_for_lambda(
-                events_handler, detail, lambda_name, object_key, prefixes
-            )
+        if schema_json is None:
+            raise Exception("Could not retrieve the S3PutObject schema")
+        routing_table = get_routing_table(config)
+
+        records, failed_records = S3Router.split_s3_records(event)
+        for record in failed_records:
+            logger.error(f"Malformed record {record}")
+        details = [
+            S3Router.create_event_detail(record["bucket"], record["object_key"])
+            for record in records
+        ]
+        errors = events_handler.validate_events(details, schema_json)
+
+        entries_by_bus: Dict[str, List[Dict[str, Any]]] = {}
+        records_by_entry: Dict[int, Dict[str, Any]] = {}
+        for record, detail, error in zip(records, details, errors):
+            if error is not None:
+                logger.error(f"Invalid record {record}: {error}")
+                failed_records.append(record)
+                continue
+
+            for key in routing_table.match(record["object_key"]):
+                event_bus_name = f"{config[key]['lambda_name']}-event-bus"
+                entry = {
+                    "Source": EVENT_SOURCE,
+                    "DetailType": detail["event_type"],
+                    "Detail": json.dumps(detail),
+                    "EventBusName": event_bus_name,
+                }
+                entries_by_bus.setdefault(event_bus_name, []).append(entry)
+                records_by_entry[id(entry)] = record
+
+        entries = [
+            entry for bus_entries in entries_by_bus.values() for entry in bus_entries
+        ]
+        logger.info(f"Publishing {len(entries)} events to {len(entries_by_bus)} buses")
+        for failure in events_handler.put_events(entries):
+            logger.error(f"Failed to publish event: {failure}")
+            failed_records.append(records_by_entry[id(failure["Entry"])])
+
+        return S3Router.build_batch_response(failed_records)
+
+    @staticmethod
+    def build_batch_response(
+        failed_records: List[Dict[str, Any]],
+    ) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Builds the SQS partial batch response for the records that failed.
+
+        Args:
+            failed_records (List[Dict[str, Any]]): Records from ``extract_s3_records``.
+
+        Returns:
+            Dict[str, List[Dict[str, str]]]: The ``batchItemFailures`` response.
+
+        Raises:
+            Exception: If a failed record came from a direct S3 notification, which
+                cannot be retried partially.
+        """
+        message_ids: List[str] = []
+        for record in failed_records:
+            message_id: Optional[str] = record["message_id"]
+            if message_id is None:
+                raise Exception(f"Failed to route S3 records: {failed_records}")
+            if message_id not in message_ids:
+                message_ids.append(message_id)
+        return {
+            "batchItemFailures": [
+                {"itemIdentifier": message_id} for message_id in message_ids
+            ]
+        }
@@ -0,0 +1,420 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Union
+
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+DEFAULT_MAX_CONCURRENCY = 8
+
+UploadSource = Union[
+    str, os.PathLike, bytes, bytearray, memoryview, BinaryIO, Iterable[bytes]
+]
+
+
+class MultipartUploadWriter:
+    """
+    Write-only, file-like object that streams data into S3.
+
+    Data is buffered until a full part is available, then uploaded as a part of a
+    multipart upload on a background thread pool. At most ``max_concurrency`` parts
+    are held in memory at any time, so memory use is bounded by
+    ``part_size * (max_concurrency + 1)`` regardless of the object size. Objects
+    that never fill a single part are written with one ``put_object`` call.
+    """
+
+    def __init__(
+        self,
+        s3_client: Any,
+        bucket_name: str,
+        object_key: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        extra_args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Args:
+            s3_client: The boto3 S3 client used for the upload.
+            bucket_name (str): The name of the S3 bucket.
+            object_key (str): The key of the object to write.
+            part_size (int): The size in bytes of each uploaded part.
+            max_concurrency (int): The maximum number of parts uploaded in parallel.
+            extra_args (Optional[Dict[str, Any]]): Extra arguments passed to
+                ``put_object``/``create_multipart_upload``, eg. ``ContentType``.
+        """
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.object_key = object_key
+        self.part_size = part_size
+        self.max_concurrency = max_concurrency
+        self.extra_args = extra_args or {}
+
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._futures: List[Future] = []
+        self._part_number = 0
+        self._closed = False
+
+    def __enter__(self) -> "MultipartUploadWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        """
+        Buffers data and uploads every complete part.
+
+        Args:
+            data (bytes): The data to write.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        if self._closed:
+            raise ValueError("I/O operation on closed MultipartUploadWriter")
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[: self.part_size])
+            del self._buffer[: self.part_size]
+            self._submit_part(part)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        """
+        Uploads any buffered data and completes the upload.
+
+        Raises:
+            Exception: If any part failed to upload. The multipart upload is aborted.
+                If the single ``put_object`` of a small object fails, the writer
+                stays open so that ``close`` can be retried or ``abort`` called.
+        """
+        if self._closed:
+            return
+        if self._upload_id is None:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=self.object_key,
+                Body=bytes(self._buffer),
+                **self.extra_args,
+            )
+            self._closed = True
+            self._buffer = bytearray()
+            return
+
+        try:
+            if self._buffer:
+                self._submit_part(bytes(self._buffer))
+                self._buffer = bytearray()
+            parts = sorted(
+                (future.result() for future in self._futures),
+                key=lambda part: part["PartNumber"],
+            )
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=self.object_key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            self.abort()
+            raise
+        self._closed = True
+        self._executor.shutdown(wait=True)
+
+    def abort(self) -> None:
+        """
+        Aborts the upload and discards any data written so far.
+        """
+        self._closed = True
+        self._buffer = bytearray()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._upload_id is not None:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=self.object_key,
+                UploadId=self._upload_id,
+            )
+            self._upload_id = None
+
+    def _submit_part(self, data: bytes) -> None:
+        if self._upload_id is None:
+            response = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket_name, Key=self.object_key, **self.extra_args
+            )
+            self._upload_id = response["UploadId"]
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+
+        self._part_number += 1
+        if self._part_number > MAX_PARTS:
+            raise ValueError(
+                f"Upload of {self.object_key} exceeds {MAX_PARTS} parts, "
+                f"increase part_size (currently {self.part_size} bytes)"
+            )
+
+        for future in self._futures:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+        self._slots.acquire()
+        future = self._executor.submit(self._upload_part, self._part_number, data)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def _upload_part(self, part_number: int, data: bytes) -> Dict[str, Any]:
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket_name,
+            Key=self.object_key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+
+class S3TransferManager:
+    """
+    Parallel transfer engine for S3 objects.
+
+    Downloads are split into ranged GETs and uploads into multipart uploads, both
+    run on a thread pool of ``max_concurrency`` workers. Memory use is bounded by
+    ``part_size * max_concurrency`` rather than by the size of the object.
+    """
+
+    def __init__(
+        self,
+        s3_client: Any,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> None:
+        """
+        Args:
+            s3_client: The boto3 S3 client used for transfers.
+            part_size (int): The size in bytes of each ranged GET and uploaded part.
+            max_concurrency (int): The maximum number of parts transferred in parallel.
+
+        Raises:
+            ValueError: If the part size is below the S3 multipart minimum of 5 MiB.
+        """
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(f"part_size must be at least {MIN_PART_SIZE} bytes")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.s3_client = s3_client
+        self.part_size = part_size
+        self.max_concurrency = max_concurrency
+
+    def open_writer(
+        self, bucket_name: str, object_key: str, **extra_args: Any
+    ) -> MultipartUploadWriter:
+        """
+        Opens a file-like writer that streams data into an S3 object.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            object_key (str): The key of the object to write.
+            **extra_args: Extra arguments for the upload, eg. ``ContentType``.
+
+        Returns:
+            MultipartUploadWriter: The writer, which must be closed to complete the upload.
+        """
+        return MultipartUploadWriter(
+            self.s3_client,
+            bucket_name,
+            object_key,
+            part_size=self.part_size,
+            max_concurrency=self.max_concurrency,
+            extra_args=extra_args,
+        )
+
+    def upload(
+        self, bucket_name: str, object_key: str, source: UploadSource, **extra_args: Any
+    ) -> None:
+        """
+        Uploads data to S3, using a multipart upload when it exceeds one part.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            object_key (str): The key of the object to write.
+            source (UploadSource): A file path, bytes, a binary file-like object or an
+                iterable of byte chunks.
+            **extra_args: Extra arguments for the upload, eg. ``ContentType``.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as file:
+                self.upload(bucket_name, object_key, file, **extra_args)
+            return
+        if isinstance(source, (bytes, bytearray)) and len(source) <= self.part_size:
+            self.s3_client.put_object(
+                Bucket=bucket_name, Key=object_key, Body=source, **extra_args
+            )
+            return
+
+        with self.open_writer(bucket_name, object_key, **extra_args) as writer:
+            for chunk in self._iter_source(source):
+                writer.write(chunk)
+
+    def iter_chunks(self, bucket_name: str, object_key: str) -> Iterator[bytes]:
+        """
+        Streams an S3 object as ordered chunks fetched with concurrent ranged GETs.
+
+        The first range also discovers the object size, so small objects cost a
+        single request. Later ranges are pinned to the ETag of the first response
+        so a concurrent overwrite cannot produce a torn read.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            object_key (str): The key of the object to read.
+
+        Yields:
+            bytes: Consecutive chunks of at most ``part_size`` bytes.
+        """
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.s3_client.get_object(
+                Bucket=bucket_name,
+                Key=object_key,
+                Range=f"bytes=0-{self.part_size - 1}",
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "InvalidRange":
+                raise
+            response = self.s3_client.get_object(Bucket=bucket_name, Key=object_key)
+
+        first_chunk = response["Body"].read()
+        content_range = response.get("ContentRange")
+        total_size = (
+            int(content_range.rsplit("/", 1)[1]) if content_range else len(first_chunk)
+        )
+        if first_chunk:
+            yield first_chunk
+        if total_size <= len(first_chunk):
+            return
+
+        etag = response.get("ETag")
+        offsets = iter(range(len(first_chunk), total_size, self.part_size))
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            pending: List[Future] = []
+            for start in offsets:
+                end = min(start + self.part_size, total_size) - 1
+                pending.append(
+                    executor.submit(
+                        self.get_range, bucket_name, object_key, start, end, etag
+                    )
+                )
+                if len(pending) >= self.max_concurrency:
+                    break
+            while pending:
+                chunk = pending.pop(0).result()
+                start = next(offsets, None)
+                if start is not None:
+                    end = min(start + self.part_size, total_size) - 1
+                    pending.append(
+                        executor.submit(
+                            self.get_range, bucket_name, object_key, start, end, etag
+                        )
+                    )
+                yield chunk
+
+    def get_range(
+        self,
+        bucket_name: str,
+        object_key: str,
+        start: int,
+        end: int,
+        etag: Optional[str] = None,
+    ) -> bytes:
+        """
+        Fetches an inclusive byte range of an S3 object.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            object_key (str): The key of the object to read.
+            start (int): The first byte offset to read.
+            end (int): The last byte offset to read (inclusive).
+            etag (Optional[str]): If given, the read fails if the object has changed.
+
+        Returns:
+            bytes: The requested bytes.
+        """
+        kwargs: Dict[str, Any] = {
+            "Bucket": bucket_name,
+            "Key": object_key,
+            "Range": f"bytes={start}-{end}",
+        }
+        if etag:
+            kwargs["IfMatch"] = etag
+        return self.s3_client.get_object(**kwargs)["Body"].read()
+
+    def download_bytes(self, bucket_name: str, object_key: str) -> bytes:
+        """
+        Downloads an S3 object into memory using concurrent ranged GETs.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            object_key (str): The key of the object to read.
+
+        Returns:
+            bytes: The object data.
+        """
+        return b"".join(self.iter_chunks(bucket_name, object_key))
+
+    def download(
+        self,
+        bucket_name: str,
+        object_key: str,
+        destination: Union[str, os.PathLike, BinaryIO],
+    ) -> int:
+        """
+        Downloads an S3 object to a file path or a writable binary file-like object.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            object_key (str): The key of the object to read.
+            destination (Union[str, os.PathLike, BinaryIO]): Where to write the data.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        if isinstance(destination, (str, os.PathLike)):
+            with open(destination, "wb") as file:
+                return self.download(bucket_name, object_key, file)
+
+        written = 0
+        for chunk in self.iter_chunks(bucket_name, object_key):
+            destination.write(chunk)
+            written += len(chunk)
+        return written
+
+    def _iter_source(self, source: UploadSource) -> Iterator[bytes]:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            view = memoryview(source)
+            for start in range(0, len(view), self.part_size):
+                yield view[start : start + self.part_size]
+        elif hasattr(source, "read"):
+            while True:
+                chunk = source.read(self.part_size)
+                if not chunk:
+                    break
+                yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        else:
+            for chunk in source:
+                yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
@@ -1,9 +1,12 @@
-import boto3
 import os
-from typing import Any
+from typing import Any, Dict, Iterable, List, Optional, Union
+from aws_utils.batching import DEFAULT_BATCH_WORKERS, BatchFailure, send_in_batches
+from aws_utils.clients import SharedClient
 
 
 class SNSHandler:
+    sns_client = SharedClient("sns")
+
     def __init__(self, topic_name: str) -> None:
         """
         Initializes the SNSHandler with the specified SNS topic name.
@@ -11,7 +14,6 @@ class SNSHandler:
         Args:
             topic_name (str): The name of the SNS topic to which notifications will be sent.
         """
-        self.sns_client = boto3.client("sns", region_name=os.environ["AWS_REGION"])
         self.topic_arn = (
             f"arn:aws:sns:eu-west-2:{os.environ['AWS_ACCOUNT_ID']}:{topic_name}"
         )
@@ -29,3 +31,68 @@ class SNSHandler:
             Message=message,
             Subject=subject,
         )
+
+    def publish_notifications(
+        self,
+        messages: Iterable[Union[str, Dict[str, Any]]],
+        subject: Optional[str] = None,
+        max_workers: int = DEFAULT_BATCH_WORKERS,
+    ) -> List[Dict[str, Any]]:
+        """
+        Publishes many notifications to the SNS topic with ``publish_batch``.
+
+        Messages are packed into batches of up to 10 entries and 256 KB, batches
+        are published concurrently and only failed entries are retried.
+
+        Args:
+            messages (Iterable[Union[str, Dict[str, Any]]]): The messages to publish.
+                A string is used as the message body; a dictionary is used as a
+                ``PublishBatchRequestEntries`` entry without its ``Id``.
+            subject (Optional[str]): The subject of messages given as strings.
+            max_workers (int): The maximum number of batches published concurrently.
+
+        Returns:
+            List[Dict[str, Any]]: The entries that could not be published, each with
+            the ``Code`` and ``Message`` of its last error.
+        """
+
+        def to_entry(message: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+            if isinstance(message, dict):
+                return message
+            entry = {"Message": message}
+            if subject is not None:
+                entry["Subject"] = subject
+            return entry
+
+        def publish_batch(entries: List[Dict[str, Any]]) -> List[BatchFailure]:
+            response = self.sns_client.publish_batch(
+                TopicArn=self.topic_arn,
+                PublishBatchRequestEntries=[
+                    {**entry, "Id": str(index)} for index, entry in enumerate(entries)
+                ],
+            )
+            return [
+                (
+                    int(failure.pop("Id")),
+                    failure,
+                    not failure.get("SenderFault", False),
+                )
+                for failure in response.get("Failed", [])
+            ]
+
+        return send_in_batches(
+            (to_entry(message) for message in messages),
+            _entry_size,
+            publish_batch,
+            max_workers=max_workers,
+        )
+
+
+def _entry_size(entry: Dict[str, Any]) -> int:
+    size = len(entry["Message"].encode("utf-8"))
+    size += len(entry.get("Subject", "").encode("utf-8"))
+    for name, attribute in entry.get("MessageAttributes", {}).items():
+        size += len(name.encode("utf-8")) + len(attribute["DataType"].encode("utf-8"))
+        size += len(attribute.get("StringValue", "").encode("utf-8"))
+        size += len(attribute.get("BinaryValue", b""))
+    return size
@@ -1,46 +1,118 @@
-import os
-import boto3
-from botocore.exceptions import ClientError
-from typing import List, Dict
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Union
+from aws_utils.batching import DEFAULT_BATCH_WORKERS, BatchFailure, send_in_batches
+from aws_utils.clients import SharedClient
+
+SQS_BATCH_LIMIT = 10
+DEFAULT_NUM_POLLERS = 4
+DEFAULT_MAX_IN_FLIGHT = 100
+DEFAULT_VISIBILITY_TIMEOUT = 30
+DEFAULT_WAIT_TIME_SECONDS = 10
+
+_POLLER_DONE = object()
 
 
 class SQSHandler:
-    def __init__(self) -> None:
+    sqs_client = SharedClient("sqs")
+
+    def send_messages(
+        self,
+        queue_url: str,
+        messages: Iterable[Union[str, Dict[str, Any]]],
+        max_workers: int = DEFAULT_BATCH_WORKERS,
+    ) -> List[Dict[str, Any]]:
+        """
+        Sends many messages to the specified SQS queue with ``send_message_batch``.
+
+        Messages are packed into batches of up to 10 entries and 256 KB, batches
+        are sent concurrently and only failed entries are retried.
+
+        Args:
+            queue_url (str): The URL of the SQS queue to send to.
+            messages (Iterable[Union[str, Dict[str, Any]]]): The messages to send.
+                A string is used as the message body; a dictionary is used as a
+                ``send_message_batch`` entry without its ``Id``.
+            max_workers (int): The maximum number of batches sent concurrently.
+
+        Returns:
+            List[Dict[str, Any]]: The entries that could not be sent, each with the
+            ``Code`` and ``Message`` of its last error.
         """
-        Initializes the SQSHandler by creating an SQS client using AWS credentials
-        from environment variables.
+
+        def send_batch(entries: List[Dict[str, Any]]) -> List[BatchFailure]:
+            response = self.sqs_client.send_message_batch(
+                QueueUrl=queue_url,
+                Entries=[
+                    {**entry, "Id": str(index)} for index, entry in enumerate(entries)
+                ],
+            )
+            return [
+                (
+                    int(failure.pop("Id")),
+                    failure,
+                    not failure.get("SenderFault", False),
+                )
+                for failure in response.get("Failed", [])
+            ]
+
+        return send_in_batches(
+            (
+                message if isinstance(message, dict) else {"MessageBody": message}
+                for message in messages
+            ),
+            _entry_size,
+            send_batch,
+            max_workers=max_workers,
+        )
+
+    def consume_messages(
+        self,
+        queue_url: str,
+        num_pollers: int = DEFAULT_NUM_POLLERS,
+        max_in_flight: Optional[int] = DEFAULT_MAX_IN_FLIGHT,
+        visibility_timeout: int = DEFAULT_VISIBILITY_TIMEOUT,
+        stop_when_empty: bool = True,
+    ) -> "SQSConsumer":
+        """
+        Creates a streaming consumer for the specified SQS queue.
+
+        Args:
+            queue_url (str): The URL of the SQS queue to consume.
+            num_pollers (int): The number of concurrent long-polling threads.
+            max_in_flight (Optional[int]): The maximum number of received messages
+                that have not been acknowledged yet. None means no limit.
+            visibility_timeout (int): The visibility timeout in seconds, extended
+                automatically while a message is in flight.
+            stop_when_empty (bool): Whether to stop once the queue is drained.
+
+        Returns:
+            SQSConsumer: The consumer, to be iterated or run with a callback.
         """
-        self.sqs_client = boto3.client(
-            "sqs",
-            region_name=os.environ["AWS_REGION"],
-            aws_access_key_id=os.environ["AWS_ACCESS_KEY_ID"],
-            aws_secret_access_key=os.environ["AWS_SECRET_ACCESS_KEY"],
-            aws_session_token=os.environ["AWS_SESSION_TOKEN"],
+        return SQSConsumer(
+            self.sqs_client,
+            queue_url,
+            num_pollers=num_pollers,
+            max_in_flight=max_in_flight,
+            visibility_timeout=visibility_timeout,
+            stop_when_empty=stop_when_empty,
         )
 
     def get_all_sqs_messages(self, queue_url: str) -> List[Dict[str, str]]:
         """
         Retrieves all messages from the specified SQS queue.
 
+        Messages stay invisible to other consumers while the queue is being drained.
+
         Args:
             queue_url (str): The URL of the SQS queue from which to retrieve messages.
 
         Returns:
             List[Dict[str, str]]: A list of messages from the SQS queue.
         """
-        messages: List[Dict[str, str]] = []
-        while True:
-            response = self.sqs_client.receive_message(
-                QueueUrl=queue_url,
-                MaxNumberOfMessages=10,
-                WaitTimeSeconds=10,
-                VisibilityTimeout=30,
-            )
-            if "Messages" in response:
-                messages.extend(response["Messages"])
-            else:
-                break
-        return messages
+        with self.consume_messages(queue_url, max_in_flight=None) as consumer:
+            return list(consumer)
 
     def delete_all_sqs_messages(self, queue_url: str) -> None:
         """
@@ -49,11 +121,288 @@ class SQSHandler:
         Args:
             queue_url (str): The URL of the SQS queue from which to delete messages.
         """
-        all_messages: List[Dict[str, str]] = self.get_all_sqs_messages(queue_url)
-        for message in all_messages:
+        with self.consume_messages(queue_url) as consumer:
+            consumer.run(lambda message: None)
+
+
+class SQSConsumer:
+    """
+    Streams messages from an SQS queue using several concurrent long-pollers.
+
+    Received messages are yielded by iterating the consumer, or passed to a
+    callback by ``run``. While a message is in flight its visibility timeout is
+    extended automatically, and acknowledged messages are deleted with
+    ``delete_message_batch``, 10 per call. At most ``max_in_flight`` messages are
+    held at once, so memory stays flat however large the queue is.
+    """
+
+    def __init__(
+        self,
+        sqs_client: Any,
+        queue_url: str,
+        num_pollers: int = DEFAULT_NUM_POLLERS,
+        max_in_flight: Optional[int] = DEFAULT_MAX_IN_FLIGHT,
+        visibility_timeout: int = DEFAULT_VISIBILITY_TIMEOUT,
+        wait_time_seconds: int = DEFAULT_WAIT_TIME_SECONDS,
+        stop_when_empty: bool = True,
+    ) -> None:
+        """
+        Args:
+            sqs_client: The boto3 SQS client.
+            queue_url (str): The URL of the SQS queue to consume.
+            num_pollers (int): The number of concurrent long-polling threads.
+            max_in_flight (Optional[int]): The maximum number of received messages
+                that have not been acknowledged yet. None means no limit.
+            visibility_timeout (int): The visibility timeout in seconds.
+            wait_time_seconds (int): The long-poll wait time of each receive call.
+            stop_when_empty (bool): Whether a poller stops after an empty receive.
+        """
+        self.sqs_client = sqs_client
+        self.queue_url = queue_url
+        self.num_pollers = num_pollers
+        self.visibility_timeout = visibility_timeout
+        self.wait_time_seconds = wait_time_seconds
+        self.stop_when_empty = stop_when_empty
+
+        self._slots = (
+            threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        )
+        self._messages: queue.Queue = queue.Queue()
+        self._in_flight: Dict[str, List[Any]] = {}
+        self._acked: Set[str] = set()
+        self._pending_acks: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def __enter__(self) -> "SQSConsumer":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self._start()
+        finished = 0
+        while finished < self.num_pollers:
+            item = self._messages.get()
+            if item is _POLLER_DONE:
+                finished += 1
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                yield item
+
+    def run(self, callback: Callable[[Dict[str, Any]], Any]) -> int:
+        """
+        Passes every message to a callback, acknowledging it if the callback
+        returns and releasing it back to the queue if the callback raises.
+
+        Args:
+            callback (Callable[[Dict[str, Any]], Any]): Called with each message.
+
+        Returns:
+            int: The number of messages processed successfully.
+        """
+        processed = 0
+        for message in self:
             try:
-                self.sqs_client.delete_message(
-                    QueueUrl=queue_url, ReceiptHandle=message["ReceiptHandle"]
+                callback(message)
+            except Exception:
+                self.nack(message)
+                continue
+            self.ack(message)
+            processed += 1
+        self.flush()
+        return processed
+
+    def ack(self, message: Dict[str, Any]) -> None:
+        """
+        Acknowledges a message. Deletes are sent in batches of 10.
+
+        A message that was already acknowledged or released is ignored.
+
+        Args:
+            message (Dict[str, Any]): A message yielded by this consumer.
+        """
+        message_id = message["MessageId"]
+        with self._lock:
+            if message_id not in self._in_flight or message_id in self._acked:
+                return
+            self._acked.add(message_id)
+            self._pending_acks.append(message)
+            batch = None
+            if len(self._pending_acks) >= SQS_BATCH_LIMIT:
+                batch = self._pending_acks[:SQS_BATCH_LIMIT]
+                del self._pending_acks[:SQS_BATCH_LIMIT]
+        self._release_slot()
+        if batch:
+            self._delete_batch(batch)
+
+    def nack(self, message: Dict[str, Any]) -> None:
+        """
+        Releases a message back to the queue so it can be received again.
+
+        A message that was already acknowledged or released is ignored.
+
+        Args:
+            message (Dict[str, Any]): A message yielded by this consumer.
+        """
+        message_id = message["MessageId"]
+        with self._lock:
+            if message_id not in self._in_flight or message_id in self._acked:
+                return
+            del self._in_flight[message_id]
+        self._release_slot()
+        self.sqs_client.change_message_visibility(
+            QueueUrl=self.queue_url,
+            ReceiptHandle=message["ReceiptHandle"],
+            VisibilityTimeout=0,
+        )
+
+    def flush(self) -> None:
+        """
+        Deletes every acknowledged message that has not been deleted yet.
+        """
+        with self._lock:
+            pending = self._pending_acks
+            self._pending_acks = []
+        for i in range(0, len(pending), SQS_BATCH_LIMIT):
+            self._delete_batch(pending[i : i + SQS_BATCH_LIMIT])
+
+    def close(self) -> None:
+        """
+        Stops polling, deletes any pending acknowledged messages and stops
+        extending visibility. Unacknowledged messages become visible again when
+        their visibility timeout expires.
+        """
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self.flush()
+
+    def _start(self) -> None:
+        if self._threads:
+            return
+        for _ in range(self.num_pollers):
+            self._threads.append(threading.Thread(target=self._poll, daemon=True))
+        self._threads.append(threading.Thread(target=self._extend, daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def _poll(self) -> None:
+        try:
+            while not self._stop.is_set():
+                slots = self._acquire_slots()
+                if not slots:
+                    continue
+                response = self.sqs_client.receive_message(
+                    QueueUrl=self.queue_url,
+                    MaxNumberOfMessages=slots,
+                    WaitTimeSeconds=self.wait_time_seconds,
+                    VisibilityTimeout=self.visibility_timeout,
                 )
-            except ClientError as e:
-                raise Exception(f"Error deleting message {message['MessageId']}: {e}")
+                messages = response.get("Messages", [])
+                for _ in range(slots - len(messages)):
+                    self._release_slot()
+                if not messages:
+                    if self.stop_when_empty:
+                        return
+                    continue
+
+                deadline = time.monotonic() + self.visibility_timeout
+                received = []
+                with self._lock:
+                    for message in messages:
+                        entry = self._in_flight.get(message["MessageId"])
+                        if entry is not None:
+                            # Redelivery of a message already in flight: keep the
+                            # newest receipt handle but do not yield it twice.
+                            entry[0]["ReceiptHandle"] = message["ReceiptHandle"]
+                            entry[1] = deadline
+                            continue
+                        self._in_flight[message["MessageId"]] = [message, deadline]
+                        received.append(message)
+                for _ in range(len(messages) - len(received)):
+                    self._release_slot()
+                for message in received:
+                    self._messages.put(message)
+        except Exception as e:
+            self._messages.put(e)
+        finally:
+            self._messages.put(_POLLER_DONE)
+
+    def _acquire_slots(self) -> int:
+        if self._slots is None:
+            return SQS_BATCH_LIMIT
+        if not self._slots.acquire(timeout=0.1):
+            return 0
+        slots = 1
+        while slots < SQS_BATCH_LIMIT and self._slots.acquire(blocking=False):
+            slots += 1
+        return slots
+
+    def _release_slot(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+
+    def _extend(self) -> None:
+        from botocore.exceptions import ClientError
+
+        while not self._stop.wait(self.visibility_timeout / 3):
+            now = time.monotonic()
+            with self._lock:
+                due = [
+                    entry
+                    for entry in self._in_flight.values()
+                    if entry[1] - now < self.visibility_timeout / 2
+                ]
+            for i in range(0, len(due), SQS_BATCH_LIMIT):
+                batch = due[i : i + SQS_BATCH_LIMIT]
+                try:
+                    response = self.sqs_client.change_message_visibility_batch(
+                        QueueUrl=self.queue_url,
+                        Entries=[
+                            {
+                                "Id": str(index),
+                                "ReceiptHandle": message["ReceiptHandle"],
+                                "VisibilityTimeout": self.visibility_timeout,
+                            }
+                            for index, (message, _) in enumerate(batch)
+                        ],
+                    )
+                except ClientError:
+                    continue
+                deadline = time.monotonic() + self.visibility_timeout
+                for result in response.get("Successful", []):
+                    batch[int(result["Id"])][1] = deadline
+
+    def _delete_batch(self, messages: List[Dict[str, Any]]) -> None:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.sqs_client.delete_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {"Id": str(index), "ReceiptHandle": message["ReceiptHandle"]}
+                    for index, message in enumerate(messages)
+                ],
+            )
+        except ClientError as e:
+            raise Exception(f"Error deleting messages: {e}")
+        finally:
+            with self._lock:
+                for message in messages:
+                    self._in_flight.pop(message["MessageId"], None)
+                    self._acked.discard(message["MessageId"])
+        if response.get("Failed"):
+            raise Exception(f"Error deleting messages: {response['Failed']}")
+
+
+def _entry_size(entry: Dict[str, Any]) -> int:
+    size = len(entry["MessageBody"].encode("utf-8"))
+    for name, attribute in entry.get("MessageAttributes", {}).items():
+        size += len(name.encode("utf-8")) + len(attribute["DataType"].encode("utf-8"))
+        size += len(attribute.get("StringValue", "").encode("utf-8"))
+        size += len(attribute.get("BinaryValue", b""))
+    return size
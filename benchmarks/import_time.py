@@ -0,0 +1,81 @@
+"""
+Measures the import time of every aws_utils module with ``python -X importtime``.
+
+Each module is imported in a fresh interpreter. The script fails if a module
+takes longer than the budget to import, or if importing it loads a heavy
+dependency that should only be loaded on first use.
+
+Usage:
+    python benchmarks/import_time.py [--budget-ms 100] [--runs 5]
+"""
+
+import argparse
+import pkgutil
+import statistics
+import subprocess
+import sys
+from typing import List, Tuple
+import aws_utils
+
+HEAVY_MODULES = ("boto3", "botocore", "jsonschema", "fastjsonschema", "pyarrow")
+
+
+def measure_import(module: str) -> Tuple[float, List[str]]:
+    """
+    Imports a module in a fresh interpreter.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        Tuple[float, List[str]]: The cumulative import time in milliseconds and the
+        heavy modules that were loaded by the import.
+    """
+    code = (
+        f"import {module}, sys; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            cumulative_us = int(fields[1])
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return cumulative_us / 1000, loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    modules = [
+        f"aws_utils.{info.name}" for info in pkgutil.iter_modules(aws_utils.__path__)
+    ]
+    failures = []
+    for module in modules:
+        timings = []
+        for _ in range(args.runs):
+            milliseconds, loaded = measure_import(module)
+            timings.append(milliseconds)
+        median = statistics.median(timings)
+        print(f"{module:<28} {median:8.1f} ms  {', '.join(loaded)}")
+        if median > args.budget_ms:
+            failures.append(f"{module} took {median:.1f} ms")
+        if loaded:
+            failures.append(f"{module} loaded {', '.join(loaded)}")
+
+    if failures:
+        print("\n".join(["Import budget exceeded:"] + failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
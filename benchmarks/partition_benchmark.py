@@ -0,0 +1,59 @@
+"""
+Measures partition parsing throughput of S3Utils on generated object keys.
+
+Compares calling ``extract_partition_values`` once per key with parsing all keys
+into a columnar table with ``extract_partition_table``.
+
+Usage:
+    python benchmarks/partition_benchmark.py [--keys 1000000] [--files-per-directory 100]
+"""
+
+import argparse
+import time
+from typing import List
+from aws_utils.s3 import S3Utils
+
+
+def build_keys(num_keys: int, files_per_directory: int) -> List[str]:
+    keys = []
+    for i in range(num_keys):
+        directory = i // files_per_directory
+        day = directory % 28 + 1
+        month = directory // 28 % 12 + 1
+        year = 2000 + directory // 336
+        keys.append(
+            f"raw/source/table/year={year}/month={month:02d}/day={day:02d}/"
+            f"part-{i:08d}.snappy.parquet"
+        )
+    return keys
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--files-per-directory", type=int, default=100)
+    args = parser.parse_args()
+
+    keys = build_keys(args.keys, args.files_per_directory)
+
+    start = time.perf_counter()
+    for key in keys:
+        S3Utils.extract_partition_values(key)
+    per_key_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    S3Utils.extract_partition_table(keys)
+    table_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    S3Utils.extract_partition_table(keys, {"year": int, "month": int, "day": int})
+    typed_seconds = time.perf_counter() - start
+
+    print(f"{len(keys):,} keys, {args.files_per_directory} files per directory")
+    print(f"per key:     {len(keys) / per_key_seconds:,.0f} keys/s")
+    print(f"table:       {len(keys) / table_seconds:,.0f} keys/s")
+    print(f"typed table: {len(keys) / typed_seconds:,.0f} keys/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compares the compiled routing table against the linear prefix scan it replaced.
+
+The trie only pays off with more than a few prefixes: with ``--targets 2
+--prefixes 3`` it is about half as fast as the linear scan.
+
+Usage:
+    python benchmarks/routing_benchmark.py [--targets 100] [--prefixes 5] [--keys 10000]
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+from aws_utils.routing import RoutingTable, config_fingerprint, get_routing_table
+from aws_utils.s3_router import S3Router
+
+
+def build_config(num_targets: int, prefixes_per_target: int) -> Dict[str, Any]:
+    return {
+        f"target_{target}": {
+            "lambda_name": f"lambda_{target}",
+            "prefixes": [
+                f"raw/source_{target}/table_{prefix}/"
+                for prefix in range(prefixes_per_target)
+            ],
+        }
+        for target in range(num_targets)
+    }
+
+
+def build_keys(config: Dict[str, Any], num_keys: int) -> List[str]:
+    prefixes = [prefix for value in config.values() for prefix in value["prefixes"]]
+    prefixes.append("unrouted/")
+    return [
+        f"{random.choice(prefixes)}year=2024/month=01/part-{i:05d}.parquet"
+        for i in range(num_keys)
+    ]
+
+
+def linear_scan(config: Dict[str, Any], object_key: str) -> List[str]:
+    return [
+        key
+        for key in config
+        if S3Router.is_valid_prefix(object_key, config[key]["prefixes"])
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--targets", type=int, default=100)
+    parser.add_argument("--prefixes", type=int, default=5)
+    parser.add_argument("--keys", type=int, default=10000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    config = build_config(args.targets, args.prefixes)
+    keys = build_keys(config, args.keys)
+
+    start = time.perf_counter()
+    table = RoutingTable.from_config(config)
+    compile_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = [linear_scan(config, key) for key in keys]
+    linear_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matched = [table.match(key) for key in keys]
+    trie_seconds = time.perf_counter() - start
+
+    assert matched == expected, "Routing table and linear scan disagree"
+
+    # The per-event cost of finding the compiled table of a warm invocation.
+    get_routing_table(config)
+    start = time.perf_counter()
+    for _ in range(1000):
+        get_routing_table(config)
+    lookup_seconds = (time.perf_counter() - start) / 1000
+    start = time.perf_counter()
+    for _ in range(100):
+        config_fingerprint(config)
+    fingerprint_seconds = (time.perf_counter() - start) / 100
+
+    print(f"{args.targets * args.prefixes} prefixes, {len(keys)} keys")
+    print(f"compile:     {compile_seconds * 1000:.2f} ms")
+    print(f"linear scan: {len(keys) / linear_seconds:,.0f} keys/s")
+    print(f"trie:        {len(keys) / trie_seconds:,.0f} keys/s")
+    print(f"speedup:     {linear_seconds / trie_seconds:.1f}x")
+    print(f"table lookup: {lookup_seconds * 1e6:.2f} us per event")
+    print(f"fingerprint:  {fingerprint_seconds * 1e6:.2f} us per event")
+
+
+if __name__ == "__main__":
+    main()
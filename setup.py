@@ -17,4 +17,5 @@ setup(
     ],
     python_requires=">=3.11",
     install_requires=["boto3"],
+    extras_require={"fast": ["fastjsonschema"], "parquet": ["pyarrow", "numpy"]},
 )
@@ -0,0 +1,36 @@
+import boto3
+import pytest
+from moto import mock_aws
+from aws_utils import clients
+
+AWS_REGION = "eu-west-2"
+BUCKET_NAME = "test-bucket"
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    """
+    Mocks AWS with moto, using fake credentials, and discards shared clients.
+    """
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "testing")
+    monkeypatch.setenv("AWS_REGION", AWS_REGION)
+    monkeypatch.setenv("AWS_DEFAULT_REGION", AWS_REGION)
+    monkeypatch.setenv("AWS_ACCOUNT_ID", "123456789012")
+    clients.clear_clients()
+    with mock_aws():
+        yield
+    clients.clear_clients()
+
+
+@pytest.fixture
+def bucket(aws):
+    """
+    Creates an empty S3 bucket and returns its name.
+    """
+    boto3.client("s3", region_name=AWS_REGION).create_bucket(
+        Bucket=BUCKET_NAME,
+        CreateBucketConfiguration={"LocationConstraint": AWS_REGION},
+    )
+    return BUCKET_NAME
@@ -0,0 +1,135 @@
+import itertools
+import threading
+import pytest
+from botocore.exceptions import ClientError
+from aws_utils import athena
+from aws_utils.athena import AthenaHandler, AthenaQueryExecutor
+
+
+class FakeAthenaClient:
+    def batch_get_query_execution(self, QueryExecutionIds):
+        return {
+            "QueryExecutions": [
+                {"QueryExecutionId": query_id, "Status": {"State": "SUCCEEDED"}}
+                for query_id in QueryExecutionIds
+            ]
+        }
+
+
+class FailingAthenaClient(FakeAthenaClient):
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def batch_get_query_execution(self, QueryExecutionIds):
+        self.calls += 1
+        if self.errors:
+            code = self.errors.pop(0)
+            raise ClientError(
+                {"Error": {"Code": code, "Message": code}}, "BatchGetQueryExecution"
+            )
+        return super().batch_get_query_execution(QueryExecutionIds)
+
+
+class FakeHandler:
+    athena_client = FakeAthenaClient()
+
+    def __init__(self, athena_client=None):
+        self._ids = itertools.count()
+        if athena_client is not None:
+            self.athena_client = athena_client
+
+    def start_query(self, query):
+        return f"{query}-{next(self._ids)}"
+
+    def get_query_results(self, query_id):
+        return [{"query_id": query_id}]
+
+
+def test_shutdown_waits_for_queries_and_stops_threads():
+    threads_before = threading.active_count()
+    executor = AthenaQueryExecutor(FakeHandler(), max_concurrent_queries=2)
+    futures = [executor.submit(f"q{i}") for i in range(5)]
+
+    executor.shutdown()
+
+    assert all(future.done() for future in futures)
+    assert [future.result()[0]["query_id"][:2] for future in futures] == [
+        "q0",
+        "q1",
+        "q2",
+        "q3",
+        "q4",
+    ]
+    assert threading.active_count() == threads_before
+    with pytest.raises(Exception):
+        executor.submit("late")
+
+
+def test_executor_context_manager_shuts_down():
+    with AthenaQueryExecutor(FakeHandler()) as executor:
+        future = executor.submit("q")
+    assert future.done()
+    with pytest.raises(Exception):
+        executor.submit("late")
+
+
+def test_handler_close_shuts_down_its_executor():
+    with AthenaHandler("db", "workgroup", "bucket") as handler:
+        executor = AthenaQueryExecutor(FakeHandler())
+        handler._executor = executor
+        future = executor.submit("q")
+    assert handler._executor is None
+    assert future.done()
+    with pytest.raises(Exception):
+        executor.submit("late")
+
+
+@pytest.fixture
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(athena, "MIN_POLL_INTERVAL", 0.001)
+    monkeypatch.setattr(athena, "MAX_POLL_INTERVAL", 0.001)
+
+
+def test_transient_poll_errors_are_retried(fast_polling):
+    client = FailingAthenaClient(["ThrottlingException", "InternalServerException"])
+    with AthenaQueryExecutor(FakeHandler(client)) as executor:
+        future = executor.submit("q")
+
+    assert future.result(timeout=5)[0]["query_id"] == "q-0"
+    assert client.calls == 3
+
+
+def test_persistent_poll_errors_fail_the_queries(fast_polling):
+    client = FailingAthenaClient(["AccessDeniedException"])
+    with AthenaQueryExecutor(FakeHandler(client)) as executor:
+        futures = [executor.submit(f"q{i}") for i in range(3)]
+
+    for future in futures:
+        with pytest.raises(ClientError, match="AccessDeniedException"):
+            future.result(timeout=5)
+    assert client.calls == 1
+
+
+def test_poll_retries_are_bounded(fast_polling):
+    client = FailingAthenaClient(["ThrottlingException"] * 100)
+    with AthenaQueryExecutor(FakeHandler(client)) as executor:
+        future = executor.submit("q")
+
+    with pytest.raises(ClientError, match="ThrottlingException"):
+        future.result(timeout=5)
+    assert client.calls == athena.MAX_POLL_ATTEMPTS
+
+
+def test_shutdown_without_waiting_still_resolves_queries(fast_polling):
+    client = FailingAthenaClient(["ThrottlingException"])
+    executor = AthenaQueryExecutor(FakeHandler(client))
+    futures = [executor.submit(f"q{i}") for i in range(3)]
+
+    executor.shutdown(wait=False)
+
+    assert [future.result(timeout=5)[0]["query_id"][:2] for future in futures] == [
+        "q0",
+        "q1",
+        "q2",
+    ]
@@ -0,0 +1,59 @@
+import json
+import time
+import boto3
+from aws_utils.athena_cache import AthenaResultCache
+
+KEY = AthenaResultCache.make_key("select 1", "db", "workgroup")
+
+
+def write_disk_entry(directory, entry):
+    with open(directory / f"{KEY}.json", "w") as file:
+        json.dump(entry, file)
+
+
+def write_s3_entry(bucket, entry):
+    boto3.client("s3").put_object(
+        Bucket=bucket, Key=f"athena-cache/{KEY}.json", Body=json.dumps(entry)
+    )
+
+
+def test_expired_disk_entry_falls_through_to_s3(bucket, tmp_path):
+    write_disk_entry(tmp_path, {"expires_at": time.time() - 1, "rows": [{"a": "old"}]})
+    write_s3_entry(bucket, {"expires_at": time.time() + 60, "rows": [{"a": "new"}]})
+    cache = AthenaResultCache(cache_directory=str(tmp_path), s3_bucket=bucket)
+
+    assert cache.get(KEY) == [{"a": "new"}]
+
+
+def test_malformed_disk_entry_falls_through_to_s3(bucket, tmp_path):
+    write_disk_entry(tmp_path, {"rows": [{"a": "old"}]})
+    write_s3_entry(bucket, {"expires_at": time.time() + 60, "rows": [{"a": "new"}]})
+    cache = AthenaResultCache(cache_directory=str(tmp_path), s3_bucket=bucket)
+
+    assert cache.get(KEY) == [{"a": "new"}]
+
+
+def test_expired_entries_in_every_tier_are_a_miss(bucket, tmp_path):
+    write_disk_entry(tmp_path, {"expires_at": time.time() - 1, "rows": []})
+    write_s3_entry(bucket, {"expires_at": time.time() - 1, "rows": []})
+    cache = AthenaResultCache(cache_directory=str(tmp_path), s3_bucket=bucket)
+
+    assert cache.get(KEY) is None
+
+
+def test_callers_cannot_modify_cached_rows(tmp_path):
+    cache = AthenaResultCache(cache_directory=str(tmp_path))
+    rows = [{"a": "1"}]
+    cache.set(KEY, rows)
+    rows[0]["a"] = "changed"
+    rows.append({"a": "2"})
+
+    results = cache.get(KEY)
+    results[0]["a"] = "changed"
+    results.clear()
+
+    assert cache.get(KEY) == [{"a": "1"}]
+    cache.clear()
+    shared = cache.get(KEY)
+    shared.append({"a": "2"})
+    assert cache.get(KEY) == [{"a": "1"}]
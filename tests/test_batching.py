@@ -0,0 +1,47 @@
+import threading
+import time
+from aws_utils.batching import send_in_batches
+
+
+def test_send_in_batches_consumes_entries_lazily():
+    lock = threading.Lock()
+    produced = 0
+    sent = 0
+    max_lead = 0
+
+    def entries():
+        nonlocal produced
+        for i in range(2000):
+            with lock:
+                produced += 1
+            yield f"entry-{i}"
+
+    def send_batch(batch):
+        nonlocal sent, max_lead
+        time.sleep(0.001)
+        with lock:
+            max_lead = max(max_lead, produced - sent)
+            sent += len(batch)
+        return []
+
+    failed = send_in_batches(entries(), len, send_batch, max_workers=2, max_entries=10)
+
+    assert failed == []
+    assert sent == 2000
+    # At most max_workers * 2 batches are in flight, plus the one being packed.
+    assert max_lead <= (2 * 2 + 2) * 10
+
+
+def test_send_in_batches_retries_only_failed_entries():
+    calls = []
+
+    def send_batch(batch):
+        calls.append(list(batch))
+        if len(calls) == 1:
+            return [(1, {"Code": "Throttled", "Message": "slow down"}, True)]
+        return []
+
+    failed = send_in_batches(["a", "b", "c"], len, send_batch, max_entries=10)
+
+    assert failed == []
+    assert calls == [["a", "b", "c"], ["b"]]
@@ -0,0 +1,54 @@
+import pytest
+from aws_utils.events import EventsHandler
+
+
+class FakeEventBridgeClient:
+    """
+    Fails entries whose detail names an error code, once per listed code.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def put_events(self, Entries):
+        self.calls.append([entry["Detail"] for entry in Entries])
+        results = []
+        for entry in Entries:
+            errors = entry["Detail"].strip('"').split(",")
+            code = errors.pop(0) if errors[0] else None
+            entry["Detail"] = '"' + ",".join(errors) + '"'
+            if code:
+                results.append({"ErrorCode": code, "ErrorMessage": code})
+            else:
+                results.append({"EventId": "id"})
+        failed = sum("ErrorCode" in result for result in results)
+        return {"FailedEntryCount": failed, "Entries": results}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr("aws_utils.batching.time.sleep", lambda seconds: None)
+
+
+def test_only_throttled_and_internal_failures_are_retried():
+    handler = EventsHandler()
+    handler.eventbridge_client = FakeEventBridgeClient()
+
+    failed = handler.publish_events(
+        "bus",
+        "source",
+        "Test",
+        [
+            "",
+            "ThrottlingException",
+            "InternalFailure,InternalFailure",
+            "MalformedDetail",
+            "ValidationException",
+        ],
+    )
+
+    assert sorted(failure["ErrorCode"] for failure in failed) == [
+        "MalformedDetail",
+        "ValidationException",
+    ]
+    assert [len(call) for call in handler.eventbridge_client.calls] == [5, 2, 1]
@@ -0,0 +1,244 @@
+import io
+import json
+import boto3
+import pytest
+from aws_utils.glue import GlueHandler
+from aws_utils.partition_sync import PartitionSync
+
+COLUMNS = [{"Name": "value", "Type": "bigint"}]
+
+
+def parquet_bytes(num_rows):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    buffer = io.BytesIO()
+    pq.write_table(pa.table({"value": list(range(num_rows))}), buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def table(bucket):
+    glue_client = boto3.client("glue")
+    glue_client.create_database(DatabaseInput={"Name": "db"})
+    glue_client.create_table(
+        DatabaseName="db",
+        TableInput={
+            "Name": "table",
+            "StorageDescriptor": {"Columns": COLUMNS},
+            "PartitionKeys": [{"Name": "day", "Type": "string"}],
+        },
+    )
+    return bucket
+
+
+def put(bucket, key, body):
+    boto3.client("s3").put_object(Bucket=bucket, Key=key, Body=body)
+
+
+def get_parameters(day):
+    partition = boto3.client("glue").get_partition(
+        DatabaseName="db", TableName="table", PartitionValues=[day]
+    )
+    return partition["Partition"]["StorageDescriptor"]["Parameters"]
+
+
+def test_partition_statistics_count_parquet_records(table):
+    put(table, "db/table/day=1/a.parquet", parquet_bytes(3))
+    put(table, "db/table/day=1/b.parquet", parquet_bytes(4))
+    put(table, "db/table/day=1/_SUCCESS", b"")
+
+    statistics = GlueHandler().get_partition_statistics(table, "db/table/day=1/")
+
+    assert statistics["objectCount"] == "2"
+    assert statistics["recordCount"] == "7"
+
+
+def test_mixed_format_partition_is_registered_without_record_count(table):
+    parquet = parquet_bytes(3)
+    put(table, "db/table/day=1/a.parquet", parquet)
+    put(table, "db/table/day=1/b.csv", b"value\n1\n2\n")
+    put(table, "db/table/day=2/a.parquet", parquet)
+
+    result = GlueHandler().add_partitions_to_glue(
+        "db", "table", table, [{"day": "1"}, {"day": "2"}], compute_statistics=True
+    )
+
+    assert sorted(result["created"]) == [["1"], ["2"]]
+    assert result["failed"] == []
+    mixed = get_parameters("1")
+    assert mixed["objectCount"] == "2"
+    assert mixed["sizeKey"] == str(len(parquet) + len(b"value\n1\n2\n"))
+    assert "recordCount" not in mixed and "averageRecordSize" not in mixed
+    assert get_parameters("2")["recordCount"] == "3"
+
+
+@pytest.fixture
+def events(bucket):
+    glue_client = boto3.client("glue")
+    glue_client.create_database(DatabaseInput={"Name": "db"})
+    glue_client.create_table(
+        DatabaseName="db",
+        TableInput={
+            "Name": "events",
+            "StorageDescriptor": {"Columns": COLUMNS},
+            "PartitionKeys": [
+                {"Name": "year", "Type": "int"},
+                {"Name": "month", "Type": "string"},
+            ],
+        },
+    )
+    return bucket
+
+
+def put_partitions(bucket, *partitions):
+    for year, month in partitions:
+        put(bucket, f"db/events/year={year}/month={month}/a.csv", b"value\n1\n")
+
+
+def create_partitions(*partitions):
+    for values in partitions:
+        boto3.client("glue").create_partition(
+            DatabaseName="db",
+            TableName="events",
+            PartitionInput={"Values": list(values)},
+        )
+
+
+def catalog_partitions():
+    return sorted(GlueHandler().get_partition_values("db", "events", segments=1))
+
+
+def test_get_partition_values_filters_by_expression(events):
+    create_partitions(("2023", "12"), ("2024", "01"))
+    handler = GlueHandler()
+
+    assert handler.get_partition_values("db", "events", segments=1) == {
+        ("2023", "12"),
+        ("2024", "01"),
+    }
+    assert handler.get_partition_values(
+        "db", "events", expression="year >= 2024", segments=1
+    ) == {("2024", "01")}
+
+
+def test_delete_partitions_reports_missing_partitions_as_deleted(events):
+    create_partitions(("2024", "01"), ("2024", "02"))
+
+    result = GlueHandler().delete_partitions_from_glue(
+        "db", "events", [["2024", "01"], ["2030", "01"]]
+    )
+
+    assert sorted(result["deleted"]) == [["2024", "01"], ["2030", "01"]]
+    assert result["failed"] == []
+    assert catalog_partitions() == [("2024", "02")]
+
+
+def test_sync_diff_compares_whole_table(events):
+    put_partitions(events, ("2024", "01"), ("2024", "02"))
+    create_partitions(("2023", "12"), ("2024", "01"))
+
+    difference = PartitionSync(events, "db", "events", segments=1).diff()
+
+    assert difference["missing"] == [["2024", "02"]]
+    assert difference["stale"] == [["2023", "12"]]
+    assert difference["invalid"] == []
+    assert difference["high_water_mark"] == "2024"
+
+
+def test_sync_reconcile_creates_missing_and_deletes_stale(events):
+    put_partitions(events, ("2024", "01"), ("2024", "02"))
+    create_partitions(("2023", "12"), ("2024", "01"))
+
+    result = PartitionSync(events, "db", "events", segments=1).reconcile()
+
+    assert result["created"] == [["2024", "02"]]
+    assert result["deleted"] == [["2023", "12"]]
+    assert result["failed"] == [] and result["unresolved"] == []
+    assert catalog_partitions() == [("2024", "01"), ("2024", "02")]
+
+
+def test_sync_incremental_run_starts_at_checkpoint(events, tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    put_partitions(events, ("2023", "12"), ("2024", "01"))
+    sync = PartitionSync(
+        events, "db", "events", checkpoint_path=checkpoint_path, segments=1
+    )
+    sync.reconcile()
+    with open(checkpoint_path) as file:
+        assert json.load(file)["high_water_mark"] == "2024"
+
+    # Partitions before the checkpoint are left alone by incremental runs.
+    put_partitions(events, ("2022", "06"), ("2024", "02"), ("2025", "01"))
+    result = sync.reconcile()
+
+    assert result["missing"] == [["2024", "02"], ["2025", "01"]]
+    assert result["created"] == [["2024", "02"], ["2025", "01"]]
+    with open(checkpoint_path) as file:
+        assert json.load(file)["high_water_mark"] == "2025"
+    assert sync.diff(full=True)["missing"] == [["2022", "06"]]
+
+
+def test_sync_recreates_partitions_deleted_outside_the_sync(events, tmp_path):
+    put_partitions(events, ("2024", "01"), ("2024", "02"))
+    sync = PartitionSync(
+        events,
+        "db",
+        "events",
+        checkpoint_path=str(tmp_path / "checkpoint.json"),
+        segments=1,
+    )
+    sync.reconcile()
+
+    boto3.client("glue").delete_partition(
+        DatabaseName="db", TableName="events", PartitionValues=["2024", "02"]
+    )
+    result = sync.reconcile()
+
+    assert result["missing"] == [["2024", "02"]]
+    assert result["created"] == [["2024", "02"]]
+    assert result["unresolved"] == []
+    assert catalog_partitions() == [("2024", "01"), ("2024", "02")]
+
+
+def test_sync_checkpoint_does_not_advance_on_failure(events, tmp_path, monkeypatch):
+    checkpoint_path = tmp_path / "checkpoint.json"
+    put_partitions(events, ("2024", "01"))
+    sync = PartitionSync(
+        events, "db", "events", checkpoint_path=str(checkpoint_path), segments=1
+    )
+
+    def fail(database_name, table_name, partition_inputs):
+        return [
+            {
+                "PartitionValues": partition_input["Values"],
+                "ErrorDetail": {"ErrorCode": "InternalServiceException"},
+            }
+            for partition_input in partition_inputs
+        ]
+
+    monkeypatch.setattr(sync.glue_handler, "_batch_create_partitions", fail)
+    result = sync.reconcile()
+
+    assert result["created"] == []
+    assert result["unresolved"] == [["2024", "01"]]
+    assert [failure["Values"] for failure in result["failed"]] == [["2024", "01"]]
+    assert not checkpoint_path.exists()
+
+
+def test_sync_reports_values_that_do_not_fit_the_key_type(events, tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    put_partitions(events, ("2024", "01"), ("__HIVE_DEFAULT_PARTITION__", "01"))
+    sync = PartitionSync(
+        events, "db", "events", checkpoint_path=checkpoint_path, segments=1
+    )
+
+    assert sync.reconcile(dry_run=True)["invalid"] == [
+        ["__HIVE_DEFAULT_PARTITION__", "01"]
+    ]
+    result = sync.reconcile()
+    assert result["created"] == [["2024", "01"]]
+
+    # The incremental run compares the values with the checkpoint.
+    result = sync.reconcile()
+    assert result["missing"] == []
+    assert result["invalid"] == [["__HIVE_DEFAULT_PARTITION__", "01"]]
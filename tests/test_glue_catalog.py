@@ -0,0 +1,51 @@
+import boto3
+import pytest
+from aws_utils.glue_catalog import CatalogSnapshot
+
+
+@pytest.fixture
+def glue_client(aws):
+    client = boto3.client("glue")
+    client.create_database(DatabaseInput={"Name": "db"})
+    client.create_table(
+        DatabaseName="db",
+        TableInput={
+            "Name": "table",
+            "StorageDescriptor": {"Columns": [{"Name": "value", "Type": "bigint"}]},
+            "PartitionKeys": [{"Name": "day", "Type": "string"}],
+        },
+    )
+    for day in ["01", "02", "03"]:
+        client.create_partition(
+            DatabaseName="db",
+            TableName="table",
+            PartitionInput={"Values": [day], "StorageDescriptor": {"Columns": []}},
+        )
+    return client
+
+
+def test_refresh_prunes_deleted_partitions(glue_client):
+    snapshot = CatalogSnapshot(include_partitions=True, partition_segments=1)
+    snapshot.refresh()
+    assert snapshot.get_partitions("db", "table") == [["01"], ["02"], ["03"]]
+
+    glue_client.delete_partition(
+        DatabaseName="db", TableName="table", PartitionValues=["02"]
+    )
+    snapshot.refresh()
+
+    assert snapshot.get_partitions("db", "table") == [["01"], ["03"]]
+    known = snapshot.glue_handler._known_partitions[("db", "table")]
+    assert known == {("01",), ("03",)}
+
+
+def test_refresh_forgets_partitions_of_removed_tables(glue_client):
+    snapshot = CatalogSnapshot(include_partitions=True, partition_segments=1)
+    snapshot.refresh()
+
+    glue_client.delete_table(DatabaseName="db", Name="table")
+    counts = snapshot.refresh()
+
+    assert counts["removed"] == 1
+    assert snapshot.list_tables("db") == []
+    assert ("db", "table") not in snapshot.glue_handler._known_partitions
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from aws_utils import iam
+
+
+@pytest.fixture
+def provider(tmp_path, monkeypatch):
+    provider = iam.AssumedRoleCredentialProvider(
+        "dev", "admin-key", "admin-secret", cache_directory=str(tmp_path)
+    )
+    calls = []
+
+    def assume_role(self):
+        calls.append(1)
+        expiry = datetime.now(timezone.utc) + timedelta(hours=1)
+        return {
+            "access_key": f"key-{len(calls)}",
+            "secret_key": "secret",
+            "token": "token",
+            "expiry_time": expiry.isoformat(),
+        }
+
+    monkeypatch.setattr(iam.AssumedRoleCredentialProvider, "_assume_role", assume_role)
+    provider.calls = calls
+    return provider
+
+
+def test_cached_credentials_are_reused_across_providers(provider, tmp_path):
+    first = provider.fetch_credentials()
+    other = iam.AssumedRoleCredentialProvider(
+        "dev", "admin-key", "admin-secret", cache_directory=str(tmp_path)
+    )
+
+    assert other.fetch_credentials() == first
+    assert len(provider.calls) == 1
+
+
+def test_session_credentials_refresh_before_expiry(provider):
+    credentials = provider.get_session().get_credentials()
+    assert credentials.get_frozen_credentials().access_key == "key-1"
+
+    # Credentials within botocore's refresh window are refreshed on next use, and
+    # the provider no longer reuses cached credentials that close to expiry.
+    credentials._expiry_time = datetime.now(timezone.utc) + timedelta(minutes=5)
+    provider.refresh_margin_seconds = 2 * 3600
+
+    assert credentials.get_frozen_credentials().access_key == "key-2"
+    assert len(provider.calls) == 2
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        '{"access_key": "key", "secret_key": "secret", "token": "token"}',
+        '{"access_key": "key", "expiry_time": "soon"}',
+        '{"access_key": "key", "expiry_time": "2030-01-01T00:00:00"}',
+        '["key"]',
+        '{"access_key": "ke',
+    ],
+)
+def test_unreadable_cache_files_are_refetched(provider, content):
+    with open(provider.cache_path, "w") as file:
+        file.write(content)
+
+    assert provider.fetch_credentials()["access_key"] == "key-1"
+    assert len(provider.calls) == 1
+
+
+def test_cache_is_specific_to_the_admin_access_key(provider, tmp_path):
+    provider.fetch_credentials()
+    other = iam.AssumedRoleCredentialProvider(
+        "dev", "other-admin-key", "admin-secret", cache_directory=str(tmp_path)
+    )
+
+    assert other.cache_path != provider.cache_path
+    assert other.fetch_credentials()["access_key"] == "key-2"
+    assert len(provider.calls) == 2
@@ -0,0 +1,24 @@
+import json
+import pkgutil
+import subprocess
+import sys
+import pytest
+import aws_utils
+
+HEAVY_MODULES = ("boto3", "botocore", "jsonschema", "fastjsonschema", "pyarrow")
+MODULES = ["aws_utils"] + [
+    f"aws_utils.{info.name}" for info in pkgutil.iter_modules(aws_utils.__path__)
+]
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_import_does_not_load_heavy_modules(module):
+    code = (
+        f"import json, sys, {module}; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert json.loads(result.stdout) == []
@@ -0,0 +1,84 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from aws_utils.logs import BufferedLogWriter, LogsHandler
+
+
+@pytest.fixture
+def host_timezone(monkeypatch):
+    def set_timezone(name):
+        monkeypatch.setenv("TZ", name)
+        time.tzset()
+
+    yield set_timezone
+    monkeypatch.delenv("TZ", raising=False)
+    time.tzset()
+
+
+@pytest.mark.parametrize("timezone_name", ["UTC", "America/New_York"])
+def test_get_logs_treats_naive_datetimes_as_host_local_time(
+    bucket, host_timezone, timezone_name
+):
+    host_timezone(timezone_name)
+    handler = LogsHandler()
+    for i in range(3):
+        handler.log_action(bucket, "project", f"action-{i}", "user")
+
+    now = datetime.now()
+    logs = handler.get_logs(
+        bucket, "project", now - timedelta(minutes=1), now + timedelta(minutes=1)
+    )
+
+    assert sorted(log["action"] for log in logs) == ["action-0", "action-1", "action-2"]
+
+
+def test_get_logs_accepts_aware_datetimes(bucket):
+    handler = LogsHandler()
+    handler.log_action(bucket, "project", "action", "user")
+
+    now = datetime.now().astimezone()
+    logs = handler.get_logs(
+        bucket, "project", now - timedelta(minutes=1), now + timedelta(minutes=1)
+    )
+
+    assert [log["action"] for log in logs] == ["action"]
+
+
+class SlowS3Handler:
+    """
+    Records uploads, blocking the first one until released.
+    """
+
+    def __init__(self):
+        self.uploads = []
+        self.release = threading.Event()
+
+    def upload_generic_file_to_s3(self, bucket_name, file_key, file_data):
+        if not self.uploads:
+            self.uploads.append(None)
+            self.release.wait(timeout=5)
+        self.uploads.append((file_key, file_data))
+
+
+def test_late_flush_does_not_widen_a_batch():
+    s3_handler = SlowS3Handler()
+    writer = BufferedLogWriter(s3_handler, max_age_seconds=0.1)
+    writer.add("bucket", "first", {"timestamp": "t0", "id": 0})
+    while not s3_handler.uploads:
+        time.sleep(0.01)
+
+    # The flush thread is blocked, so this buffer expires without being flushed.
+    writer.add("bucket", "second", {"timestamp": "t1", "id": 1})
+    time.sleep(0.3)
+    writer.add("bucket", "second", {"timestamp": "t2", "id": 2})
+    s3_handler.release.set()
+    writer.close()
+
+    batches = [
+        [json.loads(line)["id"] for line in body.decode().splitlines()]
+        for key, body in s3_handler.uploads[1:]
+        if key.startswith("logs/second/")
+    ]
+    assert batches == [[1], [2]]
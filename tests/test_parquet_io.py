@@ -0,0 +1,135 @@
+import boto3
+import pytest
+from aws_utils.s3 import S3Handler
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def make_table(num_rows):
+    return pa.table(
+        {
+            "id": list(range(num_rows)),
+            "name": [f"name-{i}" for i in range(num_rows)],
+            "score": [i / 2 for i in range(num_rows)],
+        }
+    )
+
+
+@pytest.fixture
+def handler(bucket):
+    return S3Handler()
+
+
+@pytest.fixture
+def parquet_key(handler, bucket):
+    handler.write_parquet_to_s3(
+        bucket, "data.parquet", make_table(30), row_group_size=10
+    )
+    return "data.parquet"
+
+
+def test_read_parquet_table_selects_columns(handler, bucket, parquet_key):
+    table = handler.read_parquet_table(bucket, parquet_key, columns=["name", "id"])
+
+    assert table.column_names == ["name", "id"]
+    assert table.num_rows == 30
+
+
+def test_read_parquet_table_filters_rows(handler, bucket, parquet_key):
+    table = handler.read_parquet_table(
+        bucket,
+        parquet_key,
+        columns=["name"],
+        filters=[("id", ">=", 5), ("id", "in", [3, 5, 12, 27])],
+    )
+
+    assert table.column_names == ["name"]
+    assert table.column("name").to_pylist() == ["name-5", "name-12", "name-27"]
+
+
+def test_read_parquet_table_skips_row_groups_that_cannot_match(
+    handler, bucket, parquet_key
+):
+    body = boto3.client("s3").get_object(Bucket=bucket, Key=parquet_key)["Body"]
+    metadata = pq.ParquetFile(pa.BufferReader(body.read())).metadata
+    last_group = metadata.row_group(2)
+    first_byte = min(
+        last_group.column(i).dictionary_page_offset
+        or last_group.column(i).data_page_offset
+        for i in range(last_group.num_columns)
+    )
+    transfer = handler.transfer
+    ranges = []
+    get_range = transfer.get_range
+
+    def record_range(bucket_name, object_key, start, end, etag=None):
+        ranges.append((start, end))
+        return get_range(bucket_name, object_key, start, end, etag)
+
+    transfer.get_range = record_range
+    table = handler.read_parquet_table(bucket, parquet_key, filters=[("id", ">", 24)])
+
+    assert table.column("id").to_pylist() == [25, 26, 27, 28, 29]
+    assert ranges and all(start >= first_byte for start, _ in ranges)
+
+
+def test_read_parquet_table_rejects_unknown_operators(handler, bucket, parquet_key):
+    with pytest.raises(ValueError, match="like"):
+        handler.read_parquet_table(bucket, parquet_key, filters=[("name", "like", "a")])
+
+
+def test_read_parquet_columns_returns_arrays(handler, bucket, parquet_key):
+    np = pytest.importorskip("numpy")
+
+    columns = handler.read_parquet_columns(
+        bucket, parquet_key, columns=["id"], row_groups=[1]
+    )
+
+    assert list(columns) == ["id"]
+    assert isinstance(columns["id"], np.ndarray)
+    assert columns["id"].tolist() == list(range(10, 20))
+
+
+def test_write_parquet_to_s3_streams_batches(handler, bucket):
+    batches = (
+        pa.record_batch([pa.array([i, i + 1])], names=["value"]) for i in (0, 2, 4)
+    )
+
+    handler.write_parquet_to_s3(bucket, "batches.parquet", batches)
+
+    table = handler.read_parquet_table(bucket, "batches.parquet")
+    assert table.column("value").to_pylist() == [0, 1, 2, 3, 4, 5]
+
+
+def test_write_parquet_to_s3_requires_a_schema_for_empty_data(handler, bucket):
+    with pytest.raises(ValueError):
+        handler.write_parquet_to_s3(bucket, "empty.parquet", [])
+
+    schema = pa.schema([("value", pa.int64())])
+    handler.write_parquet_to_s3(bucket, "empty.parquet", [], schema=schema)
+    table = handler.read_parquet_table(bucket, "empty.parquet")
+    assert table.num_rows == 0 and table.schema.names == ["value"]
+
+
+def test_parquet_writer_writes_row_groups(handler, bucket):
+    table = make_table(6)
+    with handler.open_parquet_writer(bucket, "groups.parquet", table.schema) as writer:
+        writer.write(table.slice(0, 2))
+        writer.write(table.slice(2, 4), row_group_size=2)
+
+    body = boto3.client("s3").get_object(Bucket=bucket, Key="groups.parquet")["Body"]
+    written = pq.ParquetFile(pa.BufferReader(body.read()))
+    assert written.metadata.num_row_groups == 3
+    assert written.read().equals(table)
+
+
+def test_parquet_writer_aborts_on_error(handler, bucket):
+    table = make_table(3)
+    with pytest.raises(RuntimeError):
+        with handler.open_parquet_writer(bucket, "aborted.parquet", table.schema) as w:
+            w.write(table)
+            raise RuntimeError("interrupted")
+
+    listing = boto3.client("s3").list_objects_v2(Bucket=bucket)
+    assert "Contents" not in listing
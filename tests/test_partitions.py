@@ -0,0 +1,100 @@
+from datetime import date
+import boto3
+from aws_utils.partitions import PartitionReader, date_range_predicate
+from aws_utils.s3 import S3Handler
+
+
+class CountingHandler(S3Handler):
+    def __init__(self):
+        super().__init__()
+        self.listed = []
+
+    def list_common_prefixes(self, bucket_name, prefix, delimiter="/"):
+        self.listed.append(prefix)
+        return super().list_common_prefixes(bucket_name, prefix, delimiter)
+
+
+def put_objects(bucket, keys):
+    s3_client = boto3.client("s3")
+    for key in keys:
+        s3_client.put_object(Bucket=bucket, Key=key, Body=key.encode())
+
+
+def make_reader(bucket, partition_keys):
+    handler = CountingHandler()
+    reader = PartitionReader(
+        bucket, "db", "table", partition_keys, s3_handler=handler, max_workers=2
+    )
+    return reader, handler
+
+
+def test_date_range_predicate_prunes_partial_values():
+    predicate = date_range_predicate(date(2024, 1, 30), date(2024, 2, 2))
+
+    assert predicate({"year": "2024"})
+    assert not predicate({"year": "2023"})
+    assert predicate({"year": "2024", "month": "02", "day": "02"})
+    assert not predicate({"year": "2024", "month": "02", "day": "03"})
+    assert not predicate({"year": "__HIVE_DEFAULT_PARTITION__"})
+
+    iso_predicate = date_range_predicate(date(2024, 1, 1), date(2024, 1, 31), ("dt",))
+    assert iso_predicate({"dt": "2024-01-31"})
+    assert not iso_predicate({"dt": "2024-02-01"})
+    assert not iso_predicate({"dt": "__HIVE_DEFAULT_PARTITION__"})
+
+
+def test_list_partitions_prunes_with_the_predicate(bucket):
+    put_objects(
+        bucket,
+        [
+            f"db/table/year={year}/month={month}/a.csv"
+            for year in ("2023", "2024", "__HIVE_DEFAULT_PARTITION__")
+            for month in ("01", "02")
+        ],
+    )
+    reader, handler = make_reader(bucket, ["year", "month"])
+
+    partitions = reader.list_partitions(
+        date_range_predicate(date(2024, 2, 1), date(2024, 3, 1), ("year", "month"))
+    )
+
+    assert partitions == [
+        ({"year": "2024", "month": "02"}, "db/table/year=2024/month=02/")
+    ]
+    assert sorted(handler.listed) == ["db/table/", "db/table/year=2024/"]
+
+
+def test_list_partitions_turns_candidate_values_into_prefixes(bucket):
+    put_objects(
+        bucket,
+        [
+            f"db/table/region={region}/day={day}/a.csv"
+            for region in ("eu", "us", "ap")
+            for day in ("1", "2")
+        ],
+    )
+    reader, handler = make_reader(bucket, ["region", "day"])
+
+    partitions = reader.list_partitions(values={"region": ["eu", "us"]})
+
+    assert sorted(prefix for _, prefix in partitions) == [
+        "db/table/region=eu/day=1/",
+        "db/table/region=eu/day=2/",
+        "db/table/region=us/day=1/",
+        "db/table/region=us/day=2/",
+    ]
+    assert sorted(handler.listed) == ["db/table/region=eu/", "db/table/region=us/"]
+
+
+def test_iter_object_bytes_downloads_data_files(bucket):
+    keys = [f"db/table/day={day}/part-{part}.csv" for day in "123" for part in "ab"]
+    put_objects(bucket, keys + ["db/table/day=1/_SUCCESS", "db/table/day=2/.hidden"])
+    reader, _ = make_reader(bucket, ["day"])
+
+    files = list(reader.iter_object_bytes(values={"day": [1, 3]}))
+
+    assert sorted((values["day"], key, data) for values, key, data in files) == [
+        (key.split("/")[2][4:], key, key.encode())
+        for key in sorted(keys)
+        if "day=2" not in key
+    ]
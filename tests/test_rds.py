@@ -0,0 +1,41 @@
+import boto3
+from aws_utils.rds import RDSHandler
+
+
+def create_instance(identifier):
+    boto3.client("rds").create_db_instance(
+        DBInstanceIdentifier=identifier,
+        DBInstanceClass="db.t3.micro",
+        Engine="postgres",
+        MasterUsername="admin",
+        MasterUserPassword="password123",
+        AllocatedStorage=20,
+    )
+
+
+def test_lookups_are_cached_up_to_max_entries(aws):
+    for identifier in ("db-a", "db-b", "db-c"):
+        create_instance(identifier)
+    handler = RDSHandler(max_entries=2)
+
+    results = handler.get_rds_instances_by_identifiers(
+        ["db-a", "db-b", "db-c", "db-missing"]
+    )
+
+    assert results["db-c"]["DBInstanceIdentifier"] == "db-c"
+    assert results["db-missing"] is None
+    assert len(handler._instances) == 2
+
+
+class UnusedClient:
+    def __getattr__(self, name):
+        raise AssertionError(f"Unexpected RDS call: {name}")
+
+
+def test_cached_lookup_does_not_call_rds(aws):
+    create_instance("db-a")
+    handler = RDSHandler()
+    instance = handler.get_rds_instance_by_identifier("db-a")
+    handler.rds_client = UnusedClient()
+
+    assert handler.get_rds_instance_by_identifier("db-a") == instance
@@ -0,0 +1,59 @@
+from aws_utils import routing
+from aws_utils.routing import RoutingTable
+
+
+def test_prefixes_are_matched_literally():
+    table = RoutingTable.from_config(
+        {
+            "star": {"prefixes": ["raw/*/"]},
+            "question": {"prefixes": ["raw/what?/"]},
+            "brace": {"prefixes": ["raw/{id}/"]},
+            "plain": {"prefixes": ["raw/"]},
+        }
+    )
+
+    assert table.match("raw/*/file.csv") == ["star", "plain"]
+    assert table.match("raw/what?/file.csv") == ["question", "plain"]
+    assert table.match("raw/{id}/file.csv") == ["brace", "plain"]
+    assert table.match("raw/other/file.csv") == ["plain"]
+    assert table.match("raw/whatx/file.csv") == ["plain"]
+
+
+def test_patterns_match_wildcards():
+    table = RoutingTable.from_config(
+        {
+            "daily": {"patterns": ["raw/*/year={year}/month=??/"]},
+            "nested": {"prefixes": ["curated/"], "patterns": ["raw/**/_manifest"]},
+        }
+    )
+
+    assert table.match("raw/sales/year=2024/month=01/a.parquet") == ["daily"]
+    assert table.match("raw/sales/year=2024/day=01/a.parquet") == []
+    assert table.match("raw/a/b/c/_manifest") == ["nested"]
+    assert table.match("curated/a.parquet") == ["nested"]
+
+
+def test_targets_are_returned_in_config_order():
+    table = RoutingTable.from_config(
+        {
+            "first": {"patterns": ["raw/*"]},
+            "second": {"prefixes": ["raw/"]},
+        }
+    )
+
+    assert table.match("raw/file.csv") == ["first", "second"]
+
+
+def test_routing_table_is_found_by_identity(monkeypatch):
+    config = {"first": {"prefixes": ["raw/"]}}
+    table = routing.get_routing_table(config)
+
+    def fail(config):
+        raise AssertionError("config was fingerprinted again")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(routing, "config_fingerprint", fail)
+        assert routing.get_routing_table(config) is table
+
+    # An equal configuration loaded again reuses the compiled table.
+    assert routing.get_routing_table({"first": {"prefixes": ["raw/"]}}) is table
@@ -0,0 +1,287 @@
+import io
+import boto3
+import pytest
+from aws_utils.s3 import S3Handler, S3Utils
+from aws_utils.s3_transfer import MIN_PART_SIZE, S3TransferManager
+
+
+class CountingClient:
+    """
+    Delegates to a real S3 client, counting the calls of each operation.
+    """
+
+    def __init__(self, s3_client):
+        self.s3_client = s3_client
+        self.calls = {}
+
+    def __getattr__(self, name):
+        attribute = getattr(self.s3_client, name)
+
+        def call(*args, **kwargs):
+            self.calls[name] = self.calls.get(name, 0) + 1
+            return attribute(*args, **kwargs)
+
+        return call
+
+
+class FlakyClient:
+    """
+    Delegates to a real S3 client, failing the given operations.
+    """
+
+    def __init__(self, s3_client, **failures):
+        self.s3_client = s3_client
+        self.failures = failures
+
+    def __getattr__(self, name):
+        if self.failures.get(name, 0) > 0:
+
+            def fail(**kwargs):
+                self.failures[name] -= 1
+                raise RuntimeError(f"{name} failed")
+
+            return fail
+        return getattr(self.s3_client, name)
+
+
+@pytest.fixture
+def s3_client(bucket):
+    return boto3.client("s3")
+
+
+@pytest.fixture
+def transfer(s3_client):
+    return S3TransferManager(s3_client, part_size=MIN_PART_SIZE, max_concurrency=4)
+
+
+def payload(size):
+    return bytes(i % 251 for i in range(size))
+
+
+def test_multipart_round_trip(transfer, bucket, tmp_path):
+    data = payload(2 * MIN_PART_SIZE + 1234)
+
+    transfer.upload(bucket, "large.bin", data, ContentType="application/x-test")
+
+    head = transfer.s3_client.head_object(Bucket=bucket, Key="large.bin")
+    assert head["ContentType"] == "application/x-test"
+    assert "-3" in head["ETag"]
+    chunks = list(transfer.iter_chunks(bucket, "large.bin"))
+    assert [len(chunk) for chunk in chunks] == [MIN_PART_SIZE, MIN_PART_SIZE, 1234]
+    assert b"".join(chunks) == data
+    assert transfer.get_range(bucket, "large.bin", 10, 19) == data[10:20]
+    destination = tmp_path / "large.bin"
+    assert transfer.download(bucket, "large.bin", destination) == len(data)
+    assert destination.read_bytes() == data
+
+
+def test_empty_object_round_trip(transfer, bucket):
+    transfer.upload(bucket, "empty.bin", b"")
+
+    assert transfer.download_bytes(bucket, "empty.bin") == b""
+    assert list(transfer.iter_chunks(bucket, "empty.bin")) == []
+
+    with transfer.open_writer(bucket, "empty-writer.bin"):
+        pass
+    assert transfer.download_bytes(bucket, "empty-writer.bin") == b""
+
+
+def test_upload_from_iterable_and_file(transfer, bucket):
+    data = payload(MIN_PART_SIZE + 100)
+    chunks = (data[i : i + 1000_000] for i in range(0, len(data), 1000_000))
+
+    transfer.upload(bucket, "iterable.bin", chunks)
+    transfer.upload(bucket, "file.bin", io.BytesIO(data))
+    transfer.upload(bucket, "text.txt", ["a,b\n", "1,2\n"])
+
+    assert transfer.download_bytes(bucket, "iterable.bin") == data
+    assert transfer.download_bytes(bucket, "file.bin") == data
+    assert transfer.download_bytes(bucket, "text.txt") == b"a,b\n1,2\n"
+
+
+def test_failed_part_aborts_the_upload(s3_client, bucket):
+    transfer = S3TransferManager(
+        FlakyClient(s3_client, upload_part=1), part_size=MIN_PART_SIZE
+    )
+
+    with pytest.raises(RuntimeError, match="upload_part failed"):
+        transfer.upload(bucket, "failed.bin", payload(2 * MIN_PART_SIZE))
+
+    assert s3_client.list_multipart_uploads(Bucket=bucket).get("Uploads", []) == []
+    assert "Contents" not in s3_client.list_objects_v2(Bucket=bucket)
+
+
+def test_writer_can_retry_a_failed_put(s3_client, bucket):
+    transfer = S3TransferManager(
+        FlakyClient(s3_client, put_object=1), part_size=MIN_PART_SIZE
+    )
+    writer = transfer.open_writer(bucket, "retried.bin")
+    writer.write(b"data")
+
+    with pytest.raises(RuntimeError, match="put_object failed"):
+        writer.close()
+    assert not writer.closed
+    writer.close()
+
+    assert writer.closed
+    assert transfer.download_bytes(bucket, "retried.bin") == b"data"
+
+
+def put_keys(s3_client, bucket, keys):
+    for key in keys:
+        s3_client.put_object(Bucket=bucket, Key=key, Body=b"x")
+
+
+def test_iter_objects_follows_continuation_tokens(s3_client, bucket):
+    keys = sorted(f"logs/{i:05d}.json" for i in range(1500))
+    put_keys(s3_client, bucket, keys + ["other/a.json"])
+    handler = S3Handler()
+
+    assert [obj["Key"] for obj in handler.iter_objects(bucket, "logs/")] == keys
+    assert len(handler.list_objects(bucket, "logs/")) == 1500
+    listed = handler.iter_objects(bucket, "logs/", start_after="logs/01200.json")
+    assert [obj["Key"] for obj in listed] == keys[1201:]
+
+
+def test_iter_objects_fans_out_over_directories(s3_client, bucket):
+    keys = [
+        f"table/year={year}/month={month:02d}/part-{part}.parquet"
+        for year in (2023, 2024)
+        for month in range(1, 13)
+        for part in range(3)
+    ]
+    put_keys(s3_client, bucket, keys + ["table/_SUCCESS", "table/year=2024/x.csv"])
+    handler = S3Handler()
+
+    listed = handler.iter_objects(bucket, "table/", fan_out_depth=2, max_workers=4)
+
+    assert sorted(obj["Key"] for obj in listed) == sorted(
+        keys + ["table/_SUCCESS", "table/year=2024/x.csv"]
+    )
+    assert handler.list_common_prefixes(bucket, "table/") == [
+        "table/year=2023/",
+        "table/year=2024/",
+    ]
+
+
+def test_delete_objects_batches_requests(s3_client, bucket):
+    keys = [f"old/{i:05d}" for i in range(2001)]
+    put_keys(s3_client, bucket, keys + ["keep"])
+    handler = S3Handler()
+    handler.s3_client = CountingClient(s3_client)
+
+    handler.delete_objects(bucket, keys)
+
+    assert handler.s3_client.calls["delete_objects"] == 3
+    remaining = s3_client.list_objects_v2(Bucket=bucket)["Contents"]
+    assert [obj["Key"] for obj in remaining] == ["keep"]
+
+
+CSV_DATA = b"id,name,score\n1,a,0.5\n2,b,1.5\n3,c,2.5\n"
+
+
+def test_iter_csv_rows_selects_columns_and_limits(s3_client, bucket):
+    s3_client.put_object(Bucket=bucket, Key="data.csv", Body=CSV_DATA)
+    handler = S3Handler()
+
+    assert list(handler.iter_csv_rows(bucket, "data.csv")) == [
+        ["1", "a", "0.5"],
+        ["2", "b", "1.5"],
+        ["3", "c", "2.5"],
+    ]
+    assert list(handler.iter_csv_rows(bucket, "data.csv", ["score", 0], limit=2)) == [
+        ["0.5", "1"],
+        ["1.5", "2"],
+    ]
+
+
+def test_iter_csv_rows_resumes_from_a_byte_offset(s3_client, bucket):
+    s3_client.put_object(Bucket=bucket, Key="data.csv", Body=CSV_DATA)
+    start_byte = CSV_DATA.index(b"2,b")
+
+    rows = S3Handler().iter_csv_rows(
+        bucket, "data.csv", columns=["name"], start_byte=start_byte
+    )
+
+    assert list(rows) == [["b"], ["c"]]
+
+
+def test_iter_csv_rows_without_header(s3_client, bucket):
+    s3_client.put_object(Bucket=bucket, Key="data.csv", Body=b"1,a\n2,b\n")
+    handler = S3Handler()
+
+    rows = handler.iter_csv_rows(bucket, "data.csv", columns=[1], has_header=False)
+    assert list(rows) == [["a"], ["b"]]
+    with pytest.raises(ValueError, match="by index"):
+        list(handler.iter_csv_rows(bucket, "data.csv", ["id"], has_header=False))
+
+
+def test_iter_csv_rows_rejects_unknown_columns(s3_client, bucket):
+    s3_client.put_object(Bucket=bucket, Key="data.csv", Body=CSV_DATA)
+
+    with pytest.raises(ValueError, match="missing"):
+        list(S3Handler().iter_csv_rows(bucket, "data.csv", columns=["missing"]))
+
+
+def test_iter_jsonl_records(s3_client, bucket):
+    lines = [b'{"id": 1, "name": "a"}', b"", b'{"id": 2}', b'{"id": 3, "name": "c"}']
+    body = b"\n".join(lines) + b"\n"
+    s3_client.put_object(Bucket=bucket, Key="data.jsonl", Body=body)
+    handler = S3Handler()
+
+    assert list(handler.iter_jsonl_records(bucket, "data.jsonl", ["name"], 2)) == [
+        {"name": "a"},
+        {"name": None},
+    ]
+    records = handler.iter_jsonl_records(
+        bucket, "data.jsonl", start_byte=body.index(b'{"id": 3')
+    )
+    assert list(records) == [{"id": 3, "name": "c"}]
+
+
+def test_extract_partition_values_decodes_keys():
+    values, paths, file_name = S3Utils.extract_partition_values(
+        "raw/data.v2/city%3DSt%20Albans/day=2024-01-01%2000%3A00/my%20file.csv"
+    )
+
+    assert values == {"city": "St Albans", "day": "2024-01-01 00:00"}
+    assert paths == ["raw", "data.v2"]
+    assert file_name == "my file.csv"
+    assert S3Utils.extract_partition_values("raw/year=2024/") == (
+        {"year": "2024"},
+        ["raw"],
+        "",
+    )
+
+
+def test_extract_partition_table_builds_columns():
+    table = S3Utils.extract_partition_table(
+        [
+            "raw/v1.0/year=2024/month=01/a%20b.csv",
+            "raw/v1.0/year=2024/month=01/c.csv",
+            "raw/year=2023/region=eu/d.csv",
+        ],
+        schema={"month": int, "year": int, "day": int},
+    )
+
+    assert table == {
+        "month": [1, 1, None],
+        "year": [2024, 2024, 2023],
+        "day": [None, None, None],
+        "region": [None, None, "eu"],
+        "path": ["raw/v1.0", "raw/v1.0", "raw"],
+        "file_name": ["a b.csv", "c.csv", "d.csv"],
+    }
+
+
+def test_extract_partition_table_rejects_invalid_values():
+    with pytest.raises(ValueError, match="'year'"):
+        S3Utils.extract_partition_table(
+            ["raw/year=__HIVE_DEFAULT_PARTITION__/a.csv"], schema={"year": int}
+        )
+
+
+@pytest.mark.parametrize("key", ["raw/path=a/b.csv", "raw/file_name=a/b.csv"])
+def test_extract_partition_table_rejects_metadata_column_names(key):
+    with pytest.raises(ValueError, match="metadata columns"):
+        S3Utils.extract_partition_table([key])
@@ -0,0 +1,61 @@
+import json
+import boto3
+import pytest
+from aws_utils import events
+from aws_utils.s3_router import S3Router
+
+SCHEMA = {
+    "type": "object",
+    "required": ["bucket", "object_key"],
+    "properties": {"object_key": {"type": "string"}},
+}
+CONFIG = {"raw": {"prefixes": ["raw/"], "lambda_name": "loader"}}
+
+
+def s3_record(key):
+    return {"s3": {"bucket": {"name": "bucket"}, "object": {"key": key}}}
+
+
+def sqs_message(message_id, body):
+    return {"messageId": message_id, "body": body}
+
+
+@pytest.fixture
+def event_bus(aws, monkeypatch):
+    monkeypatch.setattr(events.EventsHandler, "get_schema", lambda self, name: SCHEMA)
+    boto3.client("events").create_event_bus(Name="loader-event-bus")
+
+
+def test_malformed_message_fails_only_its_own_message(event_bus):
+    event = {
+        "Records": [
+            sqs_message("good", json.dumps({"Records": [s3_record("raw/a.csv")]})),
+            sqs_message("not-json", "{not json"),
+            sqs_message("no-key", json.dumps({"Records": [{"s3": {}}]})),
+            sqs_message("test-event", json.dumps({"Event": "s3:TestEvent"})),
+        ]
+    }
+
+    response = S3Router.handle_s3_event(event, CONFIG)
+
+    assert response == {
+        "batchItemFailures": [
+            {"itemIdentifier": "not-json"},
+            {"itemIdentifier": "no-key"},
+        ]
+    }
+
+
+def test_split_s3_records_keeps_no_records_of_a_malformed_message():
+    body = json.dumps({"Records": [s3_record("raw/a.csv"), {"s3": {}}]})
+    records, malformed = S3Router.split_s3_records(
+        {"Records": [sqs_message("m1", body)]}
+    )
+
+    assert records == []
+    assert [record["message_id"] for record in malformed] == ["m1"]
+
+
+def test_extract_s3_records_raises_on_malformed_records():
+    with pytest.raises(Exception):
+        S3Router.extract_s3_records({"Records": [sqs_message("m1", "[]")]})
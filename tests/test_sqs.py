@@ -0,0 +1,50 @@
+import boto3
+import pytest
+from aws_utils.sqs import SQSConsumer
+
+
+@pytest.fixture
+def queue(aws):
+    sqs_client = boto3.client("sqs")
+    queue_url = sqs_client.create_queue(QueueName="queue")["QueueUrl"]
+    for i in range(4):
+        sqs_client.send_message(QueueUrl=queue_url, MessageBody=f"message-{i}")
+    return sqs_client, queue_url
+
+
+def make_consumer(sqs_client, queue_url):
+    return SQSConsumer(
+        sqs_client, queue_url, num_pollers=1, max_in_flight=2, wait_time_seconds=0
+    )
+
+
+def test_repeated_acknowledgements_do_not_release_extra_slots(queue):
+    sqs_client, queue_url = queue
+    bodies = []
+    with make_consumer(sqs_client, queue_url) as consumer:
+        for message in consumer:
+            bodies.append(message["Body"])
+            consumer.ack(message)
+            consumer.ack(message)
+            consumer.nack(message)
+
+    assert sorted(bodies) == [f"message-{i}" for i in range(4)]
+    attributes = sqs_client.get_queue_attributes(
+        QueueUrl=queue_url, AttributeNames=["All"]
+    )["Attributes"]
+    assert attributes["ApproximateNumberOfMessages"] == "0"
+    assert attributes["ApproximateNumberOfMessagesNotVisible"] == "0"
+
+
+def test_repeated_releases_do_not_release_extra_slots(queue):
+    sqs_client, queue_url = queue
+    consumer = make_consumer(sqs_client, queue_url)
+    messages = iter(consumer)
+    message = next(messages)
+
+    consumer.nack(message)
+    consumer.nack(message)
+    consumer.ack(message)
+    consumer.close()
+
+    assert consumer._pending_acks == []